@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Generic, List
+from typing import Callable, Dict, Generic, List, Optional, Tuple
 from problem import HeuristicFunction, Problem, S, A, Solution
+import hashlib, json, os
 
 # This is an abstract class for all goal based agents
 class GoalBasedAgent(ABC, Generic[S, A]):
@@ -21,8 +22,129 @@ class HumanAgent(GoalBasedAgent[S, A]):
     def act(self, problem: Problem[S, A], state: S) -> A:
         return self.user_input_fn(problem, state)
 
+# PolicyCache stores the solutions found by the search agents on disk so that they can be reused across runs
+# Each solution is stored in its own file (as JSON) whose name is a hash of:
+#   - the level: the text of the level file (so any change to the level invalidates its solutions)
+#   - the algorithm: a name describing the search function and its parameters (e.g. the heuristic)
+#   - the state from which the search started (its string representation)
+# The actions are not stored directly since they can be arbitrary objects (points, nodes, etc.).
+# Instead, each action is stored as its index in the list of actions returned by "get_actions" for the state
+# in which it was taken, and the solution is decoded by replaying these indices from the initial state.
+# The cache keeps at most "max_entries" solutions and evicts the least recently used ones.
+# The recency of each entry is the modification time of its file, which is updated whenever it is read.
+# The directory is only scanned when the cache is created and when the entries it knows about exceed "max_entries".
+class PolicyCache:
+    EXTENSION = ".policy"
+
+    def __init__(self, directory: str, max_entries: int = 256) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        # The paths of the entries in the directory (as of the last scan plus the entries written since)
+        self.entries = {path for _, path in self._scan()}
+
+    # Returns the key of the solution for the given level, algorithm and initial state
+    @staticmethod
+    def key(level: str, algorithm: str, state: S) -> str:
+        digest = hashlib.sha256()
+        for part in (algorithm, level, str(state)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + PolicyCache.EXTENSION)
+
+    # Returns a tuple (found, solution) where found is False if the key is not in the cache
+    # (the solution itself can be None if the search found no solution)
+    def get(self, key: str, problem: Problem[S, A], state: S):
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                indices = json.load(f)
+            solution = None if indices is None else PolicyCache.decode(problem, state, indices)
+        except (OSError, ValueError, IndexError, TypeError):
+            return False, None
+        # Mark the entry as recently used
+        os.utime(path)
+        return True, solution
+
+    def put(self, key: str, problem: Problem[S, A], state: S, solution: Solution) -> None:
+        indices = None if solution is None else PolicyCache.encode(problem, state, solution)
+        # Write to a temporary file first so that a concurrent reader never sees a partial file
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(indices, f)
+        os.replace(temporary, path)
+        self.entries.add(path)
+        if len(self.entries) > self.max_entries:
+            self.evict()
+
+    # Converts a solution to the list of the indices of its actions
+    @staticmethod
+    def encode(problem: Problem[S, A], state: S, solution: List[A]) -> List[int]:
+        indices = []
+        for action in solution:
+            indices.append(list(problem.get_actions(state)).index(action))
+            state, _ = problem.get_transition(state, action)
+        return indices
+
+    # Converts a list of action indices back to a solution
+    @staticmethod
+    def decode(problem: Problem[S, A], state: S, indices: List[int]) -> List[A]:
+        solution = []
+        for index in indices:
+            action = list(problem.get_actions(state))[index]
+            solution.append(action)
+            state, _ = problem.get_transition(state, action)
+        return solution
+
+    # Returns a list of tuples (modification time, path) for the entries in the directory
+    def _scan(self) -> List[Tuple[int, str]]:
+        return [(entry.stat().st_mtime_ns, entry.path) for entry in os.scandir(self.directory) if entry.name.endswith(PolicyCache.EXTENSION)]
+
+    # Removes the least recently used entries until the cache holds at most "max_entries" solutions
+    # The directory is scanned again since other processes may have added or removed entries
+    def evict(self) -> None:
+        entries = self._scan()
+        self.entries = {path for _, path in entries}
+        if len(entries) <= self.max_entries: return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            self.entries.discard(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for _, path in self._scan():
+            os.remove(path)
+        self.entries.clear()
+
+# A search agent can be given a policy cache with the level text and the algorithm name (check PolicyCache.key)
+# It looks up the cache before searching and stores the solutions it finds in the cache
+class CachedSearchMixin:
+    def use_policy_cache(self, cache: PolicyCache, level: str, algorithm: str) -> None:
+        self.policy_cache = cache
+        self.cache_level = level
+        self.cache_algorithm = algorithm
+
+    # Returns the solution from the cache if it was found, otherwise runs the search and stores its solution
+    def cached_search(self, problem: Problem[S, A], state: S, search: Callable[[], Solution]) -> Solution:
+        cache: Optional[PolicyCache] = getattr(self, "policy_cache", None)
+        if cache is None:
+            return search()
+        key = PolicyCache.key(self.cache_level, self.cache_algorithm, state)
+        found, solution = cache.get(key, problem, state)
+        if not found:
+            solution = search()
+            cache.put(key, problem, state, solution)
+        return solution
+
 # This agent applies an uninformed search algorithm to find the solution to goal for the given state
-class UninformedSearchAgent(GoalBasedAgent[S, A]):
+class UninformedSearchAgent(CachedSearchMixin, GoalBasedAgent[S, A]):
     def __init__(self, search_fn: Callable[[Problem[S, A], S], Solution]) -> None:
         super().__init__()
         self.search_fn = search_fn
@@ -32,7 +154,7 @@ class UninformedSearchAgent(GoalBasedAgent[S, A]):
     def act(self, problem: Problem[S, A], state: S) -> A:
         # This state is not stored in the policy, we need to search for a solution 
         if state not in self.policy:
-            solution = self.search_fn(problem, state)
+            solution = self.cached_search(problem, state, lambda: self.search_fn(problem, state))
             # if no solution was found, we return None
             if solution is None:
                 self.policy[state] = None
@@ -41,11 +163,11 @@ class UninformedSearchAgent(GoalBasedAgent[S, A]):
             current = state
             for action in solution:
                 self.policy[current] = action
-                current = problem.get_successor(current, action)
+                current, _ = problem.get_transition(current, action)
         return self.policy.get(state)
 
 # This agent applies an informed search algorithm to find the solution to goal for the given state
-class InformedSearchAgent(GoalBasedAgent[S, A]):
+class InformedSearchAgent(CachedSearchMixin, GoalBasedAgent[S, A]):
     def __init__(self, search_fn: Callable[[Problem[S, A], S, HeuristicFunction], Solution], heuristic: HeuristicFunction) -> None:
         super().__init__()
         self.search_fn = search_fn
@@ -56,7 +178,7 @@ class InformedSearchAgent(GoalBasedAgent[S, A]):
     def act(self, problem: Problem[S, A], state: S) -> A:
         # This state is not stored in the policy, we need to search for a solution 
         if state not in self.policy:
-            solution = self.search_fn(problem, state, self.heuristic)
+            solution = self.cached_search(problem, state, lambda: self.search_fn(problem, state, self.heuristic))
             # if no solution was found, we return None
             if solution is None:
                 self.policy[state] = None
@@ -65,5 +187,5 @@ class InformedSearchAgent(GoalBasedAgent[S, A]):
             current = state
             for action in solution:
                 self.policy[current] = action
-                current = problem.get_successor(current, action)
+                current, _ = problem.get_transition(current, action)
         return self.policy.get(state)
\ No newline at end of file
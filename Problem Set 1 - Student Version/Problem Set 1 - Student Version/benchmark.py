@@ -0,0 +1,306 @@
+from typing import Any, Callable, Dict, List, Tuple
+from dungeon import DungeonProblem
+from graph import GraphRoutingProblem
+from parking import ParkingProblem
+from problem import Problem, S, A, Solution
+from search_stats import SearchStats
+from helpers import utils
+import argparse, csv, glob, json, multiprocessing, os, queue, sys, time
+
+# This script has two modes:
+#   - By default, it compares the uninformed search functions in "search.py"
+#     against the list-based implementations they replaced (kept below as references)
+#     on every dungeon and parking level
+#   - With "--suite", it runs every search function in "search.py" on every dungeon, parking and graph level,
+#     records the time, the explored nodes and the peak memory of each run, writes them as CSV and/or JSON
+#     and compares them against a stored baseline (a JSON file written by a previous run) to catch regressions
+
+# Reference BFS: the frontier is a list popped from the front and the explored states are stored in a list
+def reference_breadth_first_search(problem: Problem[S, A], initial_state: S) -> Solution:
+    if problem.is_goal(initial_state):
+        return []
+    frontier = [(problem.get_successor(initial_state, action), [action])
+                for action in problem.get_actions(initial_state)]
+    explored = [initial_state]
+    while frontier:
+        state, path = frontier.pop(0)
+        if state in explored: continue
+        if problem.is_goal(state):
+            return path
+        explored.append(state)
+        for action in problem.get_actions(state):
+            frontier.append((problem.get_successor(state, action), path + [action]))
+    return None
+
+# Reference DFS: the explored states are stored in a list
+def reference_depth_first_search(problem: Problem[S, A], initial_state: S) -> Solution:
+    if problem.is_goal(initial_state):
+        return []
+    frontier = [(problem.get_successor(initial_state, action), [action])
+                for action in problem.get_actions(initial_state)]
+    explored = [initial_state]
+    while frontier:
+        state, path = frontier.pop()
+        if state in explored: continue
+        if problem.is_goal(state):
+            return path
+        explored.append(state)
+        for action in problem.get_actions(state):
+            frontier.append((problem.get_successor(state, action), path + [action]))
+    return None
+
+# Runs the search function on the problem "repeat" times and returns the best run time and the solution
+def time_search(search_fn: Callable[[Problem[S, A], S], Solution], problem: Problem[S, A], repeat: int):
+    best, solution = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solution = search_fn(problem, problem.get_initial_state())
+        best = min(best, time.perf_counter() - start)
+    return best, solution
+
+def compare_references(args: argparse.Namespace):
+    from search import BreadthFirstSearch, DepthFirstSearch
+    pairs = [
+        ("bfs", reference_breadth_first_search, BreadthFirstSearch),
+        ("dfs", reference_depth_first_search, DepthFirstSearch),
+    ]
+    loaders = {"dungeons": DungeonProblem.from_file, "parks": ParkingProblem.from_file}
+    levels: List[str] = args.levels
+    if not levels:
+        for folder in loaders:
+            levels += sorted(glob.glob(os.path.join(args.root, folder, "*.txt")))
+    print(f"{'level':<24}{'search':<8}{'reference (s)':>16}{'current (s)':>14}{'speedup':>10}")
+    for level in levels:
+        folder = os.path.basename(os.path.dirname(os.path.abspath(level)))
+        problem = loaders.get(folder, DungeonProblem.from_file)(level)
+        for name, reference_fn, search_fn in pairs:
+            reference_time, reference_solution = time_search(reference_fn, problem, args.repeat)
+            current_time, current_solution = time_search(search_fn, problem, args.repeat)
+            # Both implementations should return the exact same solution
+            if reference_solution != current_solution:
+                print(f"WARNING: {name} returned a different solution on {level}")
+            speedup = reference_time / current_time if current_time > 0 else float('inf')
+            print(f"{level:<24}{name:<8}{reference_time:>16.6f}{current_time:>14.6f}{speedup:>9.2f}x")
+
+# Returns the search functions to run on each kind of level as a dictionary
+# that maps the folder of the levels to a list of tuples (algorithm name, search function with a single signature)
+# Every search function takes the problem, the initial state and the statistics
+def suite_algorithms() -> Dict[str, List[Tuple[str, Callable[[Problem[S, A], S, SearchStats], Solution]]]]:
+    from search import (BreadthFirstSearch, DepthFirstSearch, UniformCostSearch, AStarSearch, BestFirstSearch,
+                        IterativeDeepeningAStarSearch, FrontierCappedAStarSearch,
+                        BidirectionalBreadthFirstSearch, BidirectionalUniformCostSearch)
+    from dungeon_heuristic import weak_heuristic, strong_heuristic
+    from parking import parking_heuristic
+    from graph import graphrouting_heuristic
+    uninformed = lambda search_fn: lambda problem, state, stats: search_fn(problem, state, stats=stats)
+    informed = lambda search_fn, heuristic: lambda problem, state, stats: search_fn(problem, state, heuristic, stats=stats)
+    return {
+        "dungeons": [
+            ("bfs", uninformed(BreadthFirstSearch)),
+            ("dfs", uninformed(DepthFirstSearch)),
+            ("ucs", uninformed(UniformCostSearch)),
+            ("astar-weak", informed(AStarSearch, weak_heuristic)),
+            ("astar-strong", informed(AStarSearch, strong_heuristic)),
+            ("gbfs-strong", informed(BestFirstSearch, strong_heuristic)),
+            ("idastar-strong", informed(IterativeDeepeningAStarSearch, strong_heuristic)),
+            ("fcastar-strong", informed(FrontierCappedAStarSearch, strong_heuristic)),
+        ],
+        "parks": [
+            ("bfs", uninformed(BreadthFirstSearch)),
+            ("dfs", uninformed(DepthFirstSearch)),
+            ("ucs", uninformed(UniformCostSearch)),
+            ("astar", informed(AStarSearch, parking_heuristic)),
+            ("gbfs", informed(BestFirstSearch, parking_heuristic)),
+        ],
+        "graphs": [
+            ("bfs", uninformed(BreadthFirstSearch)),
+            ("dfs", uninformed(DepthFirstSearch)),
+            ("ucs", uninformed(UniformCostSearch)),
+            ("bibfs", uninformed(BidirectionalBreadthFirstSearch)),
+            ("biucs", uninformed(BidirectionalUniformCostSearch)),
+            ("astar", informed(AStarSearch, graphrouting_heuristic)),
+            ("gbfs", informed(BestFirstSearch, graphrouting_heuristic)),
+        ],
+    }
+
+SUITE_LOADERS = {"dungeons": DungeonProblem.from_file, "parks": ParkingProblem.from_file, "graphs": GraphRoutingProblem.from_file}
+SUITE_PATTERNS = {"dungeons": "*.txt", "parks": "*.txt", "graphs": "*.json"}
+SUITE_FIELDS = ["level", "algorithm", "status", "time", "explored", "generated", "max_frontier", "peak_memory", "length", "cost"]
+
+# Runs a single search and returns its record (a dictionary with the SUITE_FIELDS)
+# The search is timed "repeat" times without tracking the memory (tracemalloc slows the search down)
+# then it is run once more with the memory tracking to get the peak memory
+# The explored nodes are counted by the statistics, so the call instrumentation is turned off during the runs
+# (otherwise, every call to GraphRoutingProblem.is_goal is recorded, which adds to the time and the peak memory)
+def run_benchmark(folder: str, level: str, algorithm: str, search_fn, repeat: int) -> Dict[str, Any]:
+    instrumented = utils.call_instrumentation
+    utils.set_call_instrumentation(False)
+    try:
+        return _run_benchmark(folder, level, algorithm, search_fn, repeat)
+    finally:
+        utils.set_call_instrumentation(instrumented)
+
+def _run_benchmark(folder: str, level: str, algorithm: str, search_fn, repeat: int) -> Dict[str, Any]:
+    if repeat < 1:
+        raise ValueError(f"The search must be run at least once, got repeat={repeat}")
+    record: Dict[str, Any] = {"level": level, "algorithm": algorithm}
+    best_time, stats = float('inf'), None
+    for _ in range(repeat):
+        # Every run starts from a freshly loaded problem so that the problem cache does not carry over between runs
+        problem = SUITE_LOADERS[folder](level)
+        stats = SearchStats()
+        solution = search_fn(problem, problem.get_initial_state(), stats)
+        best_time = min(best_time, stats.wall_time)
+    problem = SUITE_LOADERS[folder](level)
+    memory_stats = SearchStats(track_memory=True)
+    search_fn(problem, problem.get_initial_state(), memory_stats)
+    cost = None
+    if solution is not None:
+        state, cost = problem.get_initial_state(), 0
+        for action in solution:
+            cost += problem.get_cost(state, action)
+            state = problem.get_successor(state, action)
+    record.update({
+        "status": "ok" if solution is not None else "no-solution",
+        "time": best_time,
+        "explored": stats.nodes_expanded,
+        "generated": stats.nodes_generated,
+        "max_frontier": stats.max_frontier_size,
+        "peak_memory": memory_stats.peak_memory,
+        "length": None if solution is None else len(solution),
+        "cost": cost,
+    })
+    return record
+
+# Runs "run_benchmark" in a forked process so that a search that takes too long (or runs out of memory)
+# can be stopped without stopping the whole suite
+# The result is polled every POLL_INTERVAL seconds so that a process that dies without a result
+# (e.g. it was killed for using too much memory) is reported as soon as it exits instead of after the whole timeout
+POLL_INTERVAL = 0.1
+
+def run_benchmark_with_timeout(folder: str, level: str, algorithm: str, search_fn, repeat: int, timeout: float) -> Dict[str, Any]:
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return run_benchmark(folder, level, algorithm, search_fn, repeat)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    def worker():
+        try:
+            results.put(run_benchmark(folder, level, algorithm, search_fn, repeat))
+        except Exception as error:
+            results.put({"level": level, "algorithm": algorithm, "status": f"error: {error}"})
+    process = context.Process(target=worker, daemon=True)
+    process.start()
+    deadline = time.monotonic() + timeout
+    record = None
+    while record is None:
+        try:
+            record = results.get(timeout=max(0, min(POLL_INTERVAL, deadline - time.monotonic())))
+        except queue.Empty:
+            if process.exitcode is not None:
+                # The process exited without a result, but a result put right before it exited may still be in the pipe
+                try:
+                    record = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    record = {"level": level, "algorithm": algorithm, "status": "crashed"}
+            elif time.monotonic() >= deadline:
+                record = {"level": level, "algorithm": algorithm, "status": "timeout"}
+    if process.is_alive(): process.terminate()
+    process.join()
+    results.close()
+    return {field: record.get(field) for field in SUITE_FIELDS}
+
+# Compares the records against the baseline records and returns the list of regressions (as messages)
+#   - a run that succeeded in the baseline but not anymore
+#   - a run that explored more nodes or returned a more expensive solution than in the baseline
+#   - a run that is slower or uses more memory than the baseline by more than the given tolerance (relative)
+#     and by more than an absolute margin (so that the noise on very short runs is not reported)
+REGRESSION_MARGINS = {"time": 1e-3, "peak_memory": 4096}
+
+def compare_with_baseline(records: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    # The levels are matched by their normalized paths (e.g. "./dungeons/dungeon1.txt" matches "dungeons/dungeon1.txt")
+    baseline_records = {(os.path.normpath(record["level"]), record["algorithm"]): record for record in baseline}
+    regressions = []
+    for record in records:
+        old = baseline_records.get((os.path.normpath(record["level"]), record["algorithm"]))
+        if old is None: continue
+        name = f"{record['algorithm']} on {record['level']}"
+        if old["status"] == "ok" and record["status"] != "ok":
+            regressions.append(f"{name}: status changed from ok to {record['status']}")
+            continue
+        if record["status"] != "ok" or old["status"] != "ok": continue
+        if record["explored"] > old["explored"]:
+            regressions.append(f"{name}: explored {record['explored']} nodes (baseline: {old['explored']})")
+        if record["cost"] > old["cost"] + 1e-9:
+            regressions.append(f"{name}: solution cost {record['cost']} (baseline: {old['cost']})")
+        for field, margin in REGRESSION_MARGINS.items():
+            if old[field] and record[field] > old[field] * (1 + tolerance) and record[field] - old[field] > margin:
+                regressions.append(f"{name}: {field} {record[field]:.6g} (baseline: {old[field]:.6g}, +{record[field] / old[field] - 1:.0%})")
+    return regressions
+
+def run_suite(args: argparse.Namespace) -> int:
+    algorithms = suite_algorithms()
+    levels: List[Tuple[str, str]] = []
+    if args.levels:
+        levels = [(os.path.basename(os.path.dirname(os.path.abspath(level))), level) for level in args.levels]
+    else:
+        for folder, pattern in SUITE_PATTERNS.items():
+            levels += [(folder, level) for level in sorted(glob.glob(os.path.join(args.root, folder, pattern)))]
+    records = []
+    print(f"{'level':<24}{'algorithm':<16}{'status':<12}{'time (s)':>12}{'explored':>10}{'memory (KB)':>13}{'cost':>10}")
+    for folder, level in levels:
+        if folder not in algorithms:
+            print(f"Skipping {level}: unknown level type '{folder}'")
+            continue
+        for algorithm, search_fn in algorithms[folder]:
+            if args.algorithms and algorithm not in args.algorithms: continue
+            record = run_benchmark_with_timeout(folder, level, algorithm, search_fn, args.repeat, args.timeout)
+            records.append(record)
+            if record["status"] == "ok":
+                print(f"{level:<24}{algorithm:<16}{'ok':<12}{record['time']:>12.6f}{record['explored']:>10}"
+                      f"{record['peak_memory'] / 1024:>13.1f}{record['cost']:>10.2f}")
+            else:
+                print(f"{level:<24}{algorithm:<16}{record['status']:<12}")
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUITE_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(records, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(records, baseline, args.tolerance)
+        if regressions:
+            print(f"Found {len(regressions)} regressions against the baseline:")
+            for regression in regressions:
+                print("  " + regression)
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+def main(args: argparse.Namespace):
+    if args.suite:
+        sys.exit(run_suite(args))
+    compare_references(args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the search functions in 'search.py'")
+    parser.add_argument("levels", nargs="*",
+                        help="paths to the levels to benchmark (defaults to every level in the 'dungeons' and 'parks' folders, and also 'graphs' for the suite)")
+    parser.add_argument("--root", "-r", default=".", help="the folder containing the 'dungeons', 'parks' and 'graphs' folders")
+    parser.add_argument("--repeat", "-n", type=int, default=3, help="the number of runs per search (the best time is reported)")
+    parser.add_argument("--suite", "-s", action="store_true", default=False,
+                        help="run every search function on every level instead of comparing against the reference implementations")
+    parser.add_argument("--algorithms", "-a", nargs="+", default=None, help="only run the given algorithms in the suite (e.g. bfs astar-strong)")
+    parser.add_argument("--timeout", "-t", type=float, default=60, help="the time limit (in seconds) of each search in the suite")
+    parser.add_argument("--csv", default=None, help="write the suite results to the given CSV file")
+    parser.add_argument("--json", default=None, help="write the suite results to the given JSON file (it can be used as a baseline)")
+    parser.add_argument("--baseline", "-b", default=None, help="compare the suite results against a JSON file written by a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="the relative increase in time or memory over the baseline that is reported as a regression")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error(f"--repeat must be at least 1, got {args.repeat}")
+    main(args)
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
-from typing import FrozenSet, Iterable
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from array import array
+from collections import deque
 from enum import Enum
 
-from mathutils import Direction, Point
+from mathutils import Direction, Point, neighbor_table
 from problem import Problem
 from helpers.utils import track_call_count
 
@@ -66,6 +68,39 @@ AllDungeonActions = [
     Direction.LEFT
 ]
 
+# The key under which the neighbor table is stored in the problem cache
+NEIGHBOR_TABLE_KEY = "__neighbor_table__"
+# The key under which the distance matrix is stored in the problem cache
+DISTANCE_MATRIX_KEY = "__distance_matrix__"
+# The distance between two positions that are not connected by any path
+UNREACHABLE_DISTANCE = (2**31 - 1) // 2
+# The distance matrix is a list of rows where each row is a compact array of 32-bit integers
+DistanceMatrix = List[array]
+
+# Computes the shortest path length between every pair of walkable positions in the layout
+# Returns the index of each position and the distance matrix (check DungeonProblem.distance_matrix)
+def compute_distance_matrix(layout: DungeonLayout) -> Tuple[Dict[Point, int], DistanceMatrix]:
+    cells = sorted(layout.walkable, key=lambda point: (point.y, point.x))
+    indices = {point: index for index, point in enumerate(cells)}
+    # For each cell, find the indices of the walkable neighbors
+    neighbors = [[indices[neighbor] for neighbor in (point + direction.to_vector() for direction in Direction) if neighbor in indices]
+                 for point in cells]
+    distances = []
+    for source in range(len(cells)):
+        # Breadth first search from the source to fill its row in the matrix
+        row = array('i', [UNREACHABLE_DISTANCE]) * len(cells)
+        row[source] = 0
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            distance = row[cell] + 1
+            for neighbor in neighbors[cell]:
+                if row[neighbor] == UNREACHABLE_DISTANCE:
+                    row[neighbor] = distance
+                    queue.append(neighbor)
+        distances.append(row)
+    return indices, distances
+
 # This is the implementation of the dungeon problem
 class DungeonProblem(Problem[DungeonState, Direction]):
     # The problem will contain the dungeon layout and the inital state
@@ -81,18 +116,16 @@ class DungeonProblem(Problem[DungeonState, Direction]):
         return len(state.remaining_coins) == 0 and state.player == self.layout.exit
 
     def get_actions(self, state: DungeonState) -> Iterable[Direction]:
-        actions = []
-        for direction in Direction:
-            position = state.player + direction.to_vector()
-            # Disallow walking into walls
-            if position not in self.layout.walkable: continue
-            actions.append(direction)
-        return actions
+        neighbors = self.neighbor_table().get(state.player)
+        if neighbors is None: return []
+        # Disallow walking into walls (the neighbor in the direction of a wall is None)
+        return [direction for direction, neighbor in zip(Direction, neighbors) if neighbor is not None]
 
     def get_successor(self, state: DungeonState, action: Direction) -> DungeonState:
-        player = state.player + action.to_vector()
+        neighbors = self.neighbor_table().get(state.player)
+        player = None if neighbors is None else neighbors[action]
         remaining_coins = state.remaining_coins
-        if player not in self.layout.walkable:
+        if player is None:
             # If we try to walk into a wall, the state does not change
             return state
         if player in remaining_coins:
@@ -104,6 +137,33 @@ class DungeonProblem(Problem[DungeonState, Direction]):
         # All actions have the same cost
         return 1
 
+    # Returns the neighbor table of the walkable positions (check neighbor_table in "mathutils.py")
+    # The table is built once and stored in the problem cache, so a move only needs a dictionary lookup
+    # and the successor positions are shared between all the states instead of being created by every move
+    def neighbor_table(self) -> Dict[Point, Tuple[Optional[Point], ...]]:
+        cache = self.cache()
+        table = cache.get(NEIGHBOR_TABLE_KEY)
+        if table is None:
+            table = cache[NEIGHBOR_TABLE_KEY] = neighbor_table(self.layout.walkable)
+        return table
+
+    # Returns a tuple containing:
+    # 1- A dictionary that maps each walkable position to its index (positions are indexed in reading order)
+    # 2- A matrix where the element [i][j] is the shortest path length between the positions with indices i and j
+    #    (or UNREACHABLE_DISTANCE if there is no path between them)
+    # The matrix is computed once (using a breadth first search from every walkable position)
+    # and it is stored in the problem cache so it persists between calls
+    def distance_matrix(self) -> Tuple[Dict[Point, int], DistanceMatrix]:
+        cache = self.cache()
+        if DISTANCE_MATRIX_KEY not in cache:
+            cache[DISTANCE_MATRIX_KEY] = compute_distance_matrix(self.layout)
+        return cache[DISTANCE_MATRIX_KEY]
+
+    # Returns the shortest path length between two walkable positions
+    def distance(self, p1: Point, p2: Point) -> int:
+        indices, distances = self.distance_matrix()
+        return distances[indices[p1]][indices[p2]]
+
     # Read a dungeon problem from text containing a grid of tiles
     @staticmethod
     def from_text(text: str) -> 'DungeonProblem':
@@ -131,4 +191,137 @@ class DungeonProblem(Problem[DungeonState, Direction]):
     @staticmethod
     def from_file(path: str) -> 'DungeonProblem':
         with open(path, 'r') as f:
-            return DungeonProblem.from_text(f.read())
\ No newline at end of file
+            return DungeonProblem.from_text(f.read())
+
+##############################
+# Compact Dungeon Problem    #
+##############################
+
+# The compact dungeon problem is an alternative encoding of the same problem where:
+#   - Each walkable position is identified by an integer (its cell index)
+#   - The remaining coins are stored as a bitmask where bit 'i' is set if the coin 'i' was not collected yet
+# So a state only contains a reference to the layout and two integers instead of a point and a frozenset of points.
+# This makes the states much smaller in memory and much faster to hash and compare.
+# The compact states still expose "player" and "remaining_coins" so the existing heuristics work on both encodings.
+
+# The compact layout extends the dungeon layout with lookup tables built once per level:
+#   cells:      the position of each cell index
+#   indices:    the cell index of each walkable position
+#   moves:      for each cell, a tuple (indexed by direction) containing the cell reached by moving in this direction
+#               or -1 if this direction leads into a wall
+#   actions:    for each cell, the list of directions that do not lead into a wall
+#   coin_bits:  for each cell, the bit of the coin at this cell (or 0 if the cell was not initially a coin)
+#   coins:      the position of each coin bit index
+#   exit_cell:  the cell index of the exit
+#   coin_sets:  the positions of the remaining coins of each coin bitmask (filled on demand since there are 2^coins masks)
+#   source:     the dungeon layout it was built from (layouts are compared by pointers,
+#               so the dungeon states converted back from compact states must reference this layout)
+@dataclass(eq=False, frozen=True)
+class CompactDungeonLayout(DungeonLayout):
+    __slots__ = ("cells", "indices", "moves", "actions", "coin_bits", "coins", "exit_cell", "coin_sets", "source")
+    cells: Tuple[Point, ...]
+    indices: Dict[Point, int]
+    moves: Tuple[Tuple[int, ...], ...]
+    actions: Tuple[Tuple[Direction, ...], ...]
+    coin_bits: Tuple[int, ...]
+    coins: Tuple[Point, ...]
+    exit_cell: int
+    coin_sets: Dict[int, FrozenSet[Point]]
+    source: DungeonLayout
+
+    # Build the compact layout of a dungeon layout where the coin bits are assigned to the given coins
+    @staticmethod
+    def from_layout(layout: DungeonLayout, coins: Iterable[Point]) -> 'CompactDungeonLayout':
+        # Sort the cells in reading order (row by row) so that the encoding is deterministic
+        cells = tuple(sorted(layout.walkable, key=lambda point: (point.y, point.x)))
+        indices = {point: index for index, point in enumerate(cells)}
+        moves = tuple(tuple(indices.get(point + direction.to_vector(), -1) for direction in Direction) for point in cells)
+        actions = tuple(tuple(direction for direction in Direction if cell_moves[direction] != -1) for cell_moves in moves)
+        coins = tuple(sorted(coins, key=lambda point: (point.y, point.x)))
+        coin_bits = [0] * len(cells)
+        for bit, coin in enumerate(coins):
+            coin_bits[indices[coin]] = 1 << bit
+        return CompactDungeonLayout(layout.width, layout.height, layout.walkable, layout.exit,
+                                    cells, indices, moves, actions, tuple(coin_bits), coins, indices[layout.exit], {}, layout)
+
+# For the compact dungeon state, we use dataclass with frozen=True similar to the dungeon state
+# It contains the player cell index and the bitmask of the remaining coins
+@dataclass(frozen=True)
+class CompactDungeonState:
+    __slots__ = ("layout", "cell", "coins")
+    layout: CompactDungeonLayout
+    cell: int
+    coins: int
+
+    # The player position (to be interchangeable with DungeonState)
+    @property
+    def player(self) -> Point:
+        return self.layout.cells[self.cell]
+
+    # The positions of the remaining coins (to be interchangeable with DungeonState)
+    # The set is built once per bitmask and shared by all the states with the same remaining coins
+    @property
+    def remaining_coins(self) -> FrozenSet[Point]:
+        coins, coin_sets = self.coins, self.layout.coin_sets
+        remaining_coins = coin_sets.get(coins)
+        if remaining_coins is None:
+            remaining_coins = coin_sets[coins] = frozenset(coin for bit, coin in enumerate(self.layout.coins) if coins >> bit & 1)
+        return remaining_coins
+
+    # Convert a compact state to a dungeon state of the dungeon problem the compact problem was built from
+    def to_state(self) -> DungeonState:
+        return DungeonState(self.layout.source, self.player, self.remaining_coins)
+
+    # Convert a dungeon state to a compact state
+    @staticmethod
+    def from_state(layout: CompactDungeonLayout, state: DungeonState) -> 'CompactDungeonState':
+        coins = 0
+        for coin in state.remaining_coins:
+            coins |= layout.coin_bits[layout.indices[coin]]
+        return CompactDungeonState(layout, layout.indices[state.player], coins)
+
+    def __str__(self) -> str:
+        return str(self.to_state())
+
+# This is the implementation of the dungeon problem using the compact state encoding
+# It can be used anywhere the dungeon problem is used since it solves the same problem using the same actions
+class CompactDungeonProblem(DungeonProblem):
+    layout: CompactDungeonLayout
+    initial_state: CompactDungeonState
+
+    # We use @track_call_count to track the number of times this function was called to count the number of explored nodes
+    @track_call_count
+    def is_goal(self, state: CompactDungeonState) -> bool:
+        return state.coins == 0 and state.cell == self.layout.exit_cell
+
+    def get_actions(self, state: CompactDungeonState) -> Iterable[Direction]:
+        return self.layout.actions[state.cell]
+
+    def get_successor(self, state: CompactDungeonState, action: Direction) -> CompactDungeonState:
+        layout = self.layout
+        cell = layout.moves[state.cell][action]
+        if cell == -1:
+            # If we try to walk into a wall, the state does not change
+            return state
+        # If we walk over a coin, we take it (clearing its bit does nothing if it was already taken)
+        return CompactDungeonState(layout, cell, state.coins & ~layout.coin_bits[cell])
+
+    # Create a compact dungeon problem equivalent to the given dungeon problem
+    @staticmethod
+    def from_problem(problem: DungeonProblem) -> 'CompactDungeonProblem':
+        initial_state = problem.get_initial_state()
+        compact = CompactDungeonProblem()
+        compact.layout = CompactDungeonLayout.from_layout(problem.layout, initial_state.remaining_coins)
+        compact.initial_state = CompactDungeonState.from_state(compact.layout, initial_state)
+        return compact
+
+    # Read a compact dungeon problem from text containing a grid of tiles
+    @staticmethod
+    def from_text(text: str) -> 'CompactDungeonProblem':
+        return CompactDungeonProblem.from_problem(DungeonProblem.from_text(text))
+
+    # Read a compact dungeon problem from file containing a grid of tiles
+    @staticmethod
+    def from_file(path: str) -> 'CompactDungeonProblem':
+        with open(path, 'r') as f:
+            return CompactDungeonProblem.from_text(f.read())
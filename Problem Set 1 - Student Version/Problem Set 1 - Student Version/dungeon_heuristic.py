@@ -1,19 +1,106 @@
-from dungeon import DungeonProblem, DungeonState
-from mathutils import Direction, Point, euclidean_distance, manhattan_distance
+from typing import FrozenSet, Hashable, List, Optional, Sequence
+from dungeon import CompactDungeonState, DungeonProblem, DungeonState, UNREACHABLE_DISTANCE
+from jump_point_search import walk_distance
+from mathutils import Point, euclidean_distance
+from problem import batched
 from helpers import utils
 
+# numpy is optional: it is only used by the batched heuristics, so without it the states are evaluated one at a time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# This is the batched version of the weak heuristic which computes the distances of all the states at once
+def weak_heuristic_batch(problem: DungeonProblem, states: List[DungeonState]) -> List[float]:
+    players = np.array([tuple(state.player) for state in states], dtype=np.float64)
+    exit = problem.layout.exit
+    dx, dy = players[:, 0] - exit.x, players[:, 1] - exit.y
+    # The same operations as euclidean_distance so that both versions return the exact same values
+    return np.sqrt(dx * dx + dy * dy).tolist()
+
 # This heuristic returns the distance between the player and the exit as an estimate for the path cost
 # While it is consistent, it does a bad job at estimating the actual cost thus the search will explore a lot of nodes before finding a goal
+@batched(weak_heuristic_batch if np is not None else None)
 def weak_heuristic(problem: DungeonProblem, state: DungeonState):
     return euclidean_distance(state.player, problem.layout.exit)
 
 #TODO: Import any modules and write any functions you want to use
 
+# Returns the weight of the minimum spanning tree of a complete graph given its distance matrix (using Prim's algorithm)
+def minimum_spanning_tree_weight(distances: Sequence[Sequence[int]]) -> int:
+    count = len(distances)
+    if count <= 1: return 0
+    # The distance between each node outside the tree and the tree
+    best = {node: distances[0][node] for node in range(1, count)}
+    weight = 0
+    while best:
+        nearest = min(best, key=best.__getitem__)
+        weight += best.pop(nearest)
+        row = distances[nearest]
+        for node, distance in best.items():
+            if row[node] < distance:
+                best[node] = row[node]
+    return weight
+
+# Returns the key under which the values that only depend on the remaining coins of a state are cached
+# For compact states, this is the coin bitmask which is cheaper to hash and compare than the set of coins
+def remaining_coins_key(state: DungeonState) -> Hashable:
+    return state.coins if isinstance(state, CompactDungeonState) else state.remaining_coins
+
+# Returns a lower bound for the length of any path that starts at a coin, visits all the given coins then ends at the exit
+# Since any such path connects all the coins and the exit, it is longer than (or equal to) their minimum spanning tree
+# The result is cached in the problem cache for each set of remaining coins (under coins_key if given, check remaining_coins_key)
+def coins_lower_bound(problem: DungeonProblem, remaining_coins: FrozenSet[Point], coins_key: Optional[Hashable] = None) -> int:
+    cache = problem.cache()
+    key = ("coins_lower_bound", remaining_coins if coins_key is None else coins_key)
+    if key not in cache:
+        indices, distances = problem.distance_matrix()
+        targets = [indices[coin] for coin in remaining_coins]
+        targets.append(indices[problem.layout.exit])
+        cache[key] = minimum_spanning_tree_weight([[distances[i][j] for j in targets] for i in targets])
+    return cache[key]
+
+# This heuristic is the distance (along the maze) from the player to the nearest coin or exit
+# plus the weight of the minimum spanning tree of the remaining coins and the exit.
+# It is admissible since the player has to walk to one of these points first then connect all of them.
+# It is consistent since a move changes the first term by at most 1 (the action cost) and
+# collecting a coin decreases the second term by at most the distance between the collected coin and the nearest point.
 def strong_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
-    #TODO: ADD YOUR CODE HERE
     #IMPORTANT: DO NOT USE "problem.is_goal" HERE.
     # Calling it here will mess up the tracking of the explored nodes count
     # which is considered the number of is_goal calls during the search
     #NOTE: you can use problem.cache() to get a dictionary in which you can store information that will persist between calls of this function
     # This could be useful if you want to store the results heavy computations that can be cached and used across multiple calls of this function
-    return manhattan_distance(state.player, problem.layout.exit)
\ No newline at end of file
+    remaining_coins = state.remaining_coins
+    indices, distances = problem.distance_matrix()
+    targets = [indices[coin] for coin in remaining_coins]
+    targets.append(indices[problem.layout.exit])
+    row = distances[indices[state.player]]
+    nearest = min(row[target] for target in targets)
+    return nearest + coins_lower_bound(problem, remaining_coins, remaining_coins_key(state))
+
+# Returns the length of the shortest walk between two positions found by jump point search (check "jump_point_search.py")
+# or UNREACHABLE_DISTANCE if there is no path between them
+def jump_point_distance(problem: DungeonProblem, p1: Point, p2: Point) -> int:
+    distance = walk_distance(problem, p1, p2)
+    return UNREACHABLE_DISTANCE if distance is None else distance
+
+# This is the same lower bound as coins_lower_bound, but the distances between the coins and the exit are found by jump point search
+def jump_point_coins_lower_bound(problem: DungeonProblem, remaining_coins: FrozenSet[Point], coins_key: Optional[Hashable] = None) -> int:
+    cache = problem.cache()
+    key = ("jump_point_coins_lower_bound", remaining_coins if coins_key is None else coins_key)
+    if key not in cache:
+        targets = [*remaining_coins, problem.layout.exit]
+        distances = [[jump_point_distance(problem, p1, p2) for p2 in targets] for p1 in targets]
+        cache[key] = minimum_spanning_tree_weight(distances)
+    return cache[key]
+
+# This heuristic computes the same value as the strong heuristic, but it finds the distances by jump point search
+# between the needed pairs of positions instead of computing the distance matrix between all the walkable positions.
+# The distance matrix takes time and memory quadratic in the number of walkable positions, so this heuristic
+# is meant for large maps where the matrix does not fit in memory (on small maps, the strong heuristic is faster).
+def jump_point_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
+    remaining_coins = state.remaining_coins
+    nearest = min(jump_point_distance(problem, state.player, target) for target in [*remaining_coins, problem.layout.exit])
+    return nearest + jump_point_coins_lower_bound(problem, remaining_coins, remaining_coins_key(state))
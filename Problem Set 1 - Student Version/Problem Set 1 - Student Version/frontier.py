@@ -0,0 +1,119 @@
+from typing import Any, Dict, Generic, List, Optional, Tuple
+from array import array
+from itertools import count
+import heapq
+
+from problem import S, A
+
+# This file contains the frontier data structures shared by the search functions in "search.py"
+
+# PriorityFrontier is a binary heap (priority queue) of states
+# It is used by the cost-based and informed searches (UCS, A* and Greedy Best First Search)
+# Each entry in the heap is a tuple (priority, counter, state, data) where:
+#   - priority is the value by which the states are ordered (least first)
+#   - counter is an increasing number used to break ties between equal priorities in insertion order (FIFO)
+#     this reproduces the exact expansion order of a stable sort followed by popping the first item
+#   - data is any extra information the search function wants to attach to the state (node index, cost, etc.)
+# Instead of removing or updating entries inside the heap (decrease-key), we use lazy deletion:
+#   we remember the best priority pushed for each state and skip any outdated entry when it is popped
+class PriorityFrontier(Generic[S]):
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, S, Any]] = []
+        self._counter = count()
+        # The entry holding the best priority of every state that is currently waiting in the frontier
+        self._best: Dict[S, Tuple[float, int, S, Any]] = {}
+
+    # Returns the number of states waiting in the frontier (outdated entries are not counted)
+    def __len__(self) -> int:
+        return len(self._best)
+
+    def __bool__(self) -> bool:
+        return len(self._best) != 0
+
+    def __contains__(self, state: S) -> bool:
+        return state in self._best
+
+    # Returns the best priority of the given state if it is in the frontier, otherwise None
+    def priority(self, state: S) -> Optional[float]:
+        entry = self._best.get(state)
+        return None if entry is None else entry[0]
+
+    # Adds the state to the frontier with the given priority and returns True if it was added.
+    # If the state is already in the frontier with a lower or equal priority, nothing is added and False is returned,
+    # since the older entry would be popped first anyway (it has a lower priority or an earlier counter).
+    # If the state is already in the frontier with a higher priority, its priority is decreased (decrease-key)
+    # by pushing a new entry and leaving the old one to be lazily deleted.
+    def push(self, state: S, priority: float, data: Any = None) -> bool:
+        best = self._best.get(state)
+        if best is not None and best[0] <= priority:
+            return False
+        entry = (priority, next(self._counter), state, data)
+        self._best[state] = entry
+        heapq.heappush(self._heap, entry)
+        return True
+
+    # Removes and returns the tuple (state, priority, data) with the least priority
+    # If two states have the same priority, the one that was pushed first is returned first.
+    # Raises IndexError if the frontier is empty.
+    def pop(self) -> Tuple[S, float, Any]:
+        heap, best = self._heap, self._best
+        while heap:
+            entry = heapq.heappop(heap)
+            priority, _, state, data = entry
+            # Skip the outdated entries (the state was popped before or its priority was decreased later)
+            if best.get(state) is not entry: continue
+            del best[state]
+            return state, priority, data
+        raise IndexError("pop from an empty frontier")
+
+    # Returns the least priority in the frontier without removing its state (or None if the frontier is empty)
+    def peek(self) -> Optional[float]:
+        heap, best = self._heap, self._best
+        # Remove the outdated entries from the top of the heap
+        while heap and best.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    # Keeps only the "size" states with the least priorities and removes the rest (and all the outdated entries)
+    # States with equal priorities keep their insertion order. Returns the number of removed states.
+    def prune(self, size: int) -> int:
+        entries = sorted(self._best.values())
+        removed = entries[size:]
+        for entry in removed:
+            del self._best[entry[2]]
+        # A sorted list is already a valid heap
+        self._heap = entries[:size]
+        return len(removed)
+
+# NodeStore stores the search tree as parent pointers so that the search functions do not need to copy
+# the path (list of actions) for every generated successor.
+# Each node is identified by its index in the store and it holds the index of its parent node and the action
+# that was applied on the parent to reach it. The root node (the initial state) is not stored and is represented by ROOT.
+# The parents are stored in an array of integers and the actions are stored in a list, both indexed by the node index.
+# The path to a node is only reconstructed once (when a goal is found) by following the parent pointers back to the root.
+class NodeStore(Generic[A]):
+    ROOT = -1
+
+    def __init__(self) -> None:
+        self._parents = array('l')
+        self._actions: List[A] = []
+
+    # Returns the number of stored nodes
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    # Adds a node whose parent is the node with the given index and returns the index of the new node
+    def add(self, parent: int, action: A) -> int:
+        self._parents.append(parent)
+        self._actions.append(action)
+        return len(self._actions) - 1
+
+    # Returns the sequence of actions from the root to the node with the given index
+    def path(self, index: int) -> List[A]:
+        parents, actions = self._parents, self._actions
+        path = []
+        while index != NodeStore.ROOT:
+            path.append(actions[index])
+            index = parents[index]
+        path.reverse()
+        return path
@@ -0,0 +1,185 @@
+from typing import Dict, Iterator, List, Set, Tuple
+from collections import deque
+from helpers.mt19937 import RandomGenerator
+from dungeon import DungeonTile
+from graph import CSRGraphRoutingProblem
+import argparse, heapq, json, math, os
+
+# numpy is optional: it speeds up the nearest neighbor search of the graph generator (the generated levels are the same without it)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# This script generates random levels to test how the search functions scale with the size of the problem
+# The levels use the exact formats read by DungeonProblem.from_text, ParkingProblem.from_text and GraphRoutingProblem.from_file
+# The generation is seeded with the project's RandomGenerator so the same seed always generates the same level
+
+Cell = Tuple[int, int]
+
+# Returns a random permutation of the given list (Fisher-Yates shuffle)
+def shuffle(rng: RandomGenerator, items: list) -> list:
+    items = list(items)
+    for i in range(len(items) - 1, 0, -1):
+        j = rng.int(0, i)
+        items[i], items[j] = items[j], items[i]
+    return items
+
+# Generates a grid surrounded by walls where each inner cell is a wall with the probability "density"
+# Only the largest connected region of open cells is kept (the other open cells are turned into walls)
+# so that every cell in the returned set can be reached from every other cell
+def generate_open_cells(rng: RandomGenerator, width: int, height: int, density: float) -> Set[Cell]:
+    cells = {(x, y) for y in range(1, height - 1) for x in range(1, width - 1) if rng.float() >= density}
+    largest: Set[Cell] = set()
+    unvisited = set(cells)
+    while unvisited:
+        start = unvisited.pop()
+        region, frontier = {start}, deque([start])
+        while frontier:
+            x, y = frontier.popleft()
+            for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if neighbor in unvisited:
+                    unvisited.remove(neighbor)
+                    region.add(neighbor)
+                    frontier.append(neighbor)
+        if len(region) > len(largest):
+            largest = region
+    return largest
+
+# Converts a set of open cells and a dictionary of special tiles into the lines of a level
+def render_grid(width: int, height: int, cells: Set[Cell], tiles: Dict[Cell, str]) -> str:
+    lines = []
+    for y in range(height):
+        lines.append(''.join(tiles.get((x, y), '.') if (x, y) in cells else '#' for x in range(width)))
+    return '\n'.join(lines)
+
+# Generates a dungeon with a player, an exit and the given number of coins
+# Since the open cells are connected, the generated dungeon is always solvable
+def generate_dungeon(rng: RandomGenerator, width: int, height: int, coins: int, density: float) -> str:
+    cells = generate_open_cells(rng, width, height, density)
+    if len(cells) < coins + 2:
+        raise ValueError(f"The dungeon has {len(cells)} open cells which cannot fit {coins} coins, a player and an exit")
+    # Sort the cells before shuffling since the iteration order of a set is not guaranteed
+    chosen = shuffle(rng, sorted(cells))[:coins + 2]
+    tiles = {chosen[0]: DungeonTile.PLAYER.value, chosen[1]: DungeonTile.EXIT.value}
+    for cell in chosen[2:]:
+        tiles[cell] = DungeonTile.COIN.value
+    return render_grid(width, height, cells, tiles)
+
+# Generates a parking lot with the given number of cars (at most 10) and a slot for each car
+# The open cells are connected, but the level is not guaranteed to be solvable when the cars block each other
+# in narrow passages, so a lower density (more open space) gives more solvable levels
+def generate_parking(rng: RandomGenerator, width: int, height: int, cars: int, density: float) -> str:
+    if not 1 <= cars <= 10:
+        raise ValueError(f"The number of cars must be between 1 and 10, got {cars}")
+    cells = generate_open_cells(rng, width, height, density)
+    if len(cells) < 2 * cars:
+        raise ValueError(f"The parking lot has {len(cells)} open cells which cannot fit {cars} cars and their slots")
+    chosen = shuffle(rng, sorted(cells))[:2 * cars]
+    tiles = {}
+    for index in range(cars):
+        tiles[chosen[index]] = chr(ord('A') + index)
+        tiles[chosen[cars + index]] = str(index)
+    return render_grid(width, height, cells, tiles)
+
+# The maximum number of pairwise distances computed at once by nearest_neighbors (bounds its memory use)
+NEAREST_CHUNK_ELEMENTS = 1 << 22
+
+# Yields each point index with the indices of its "count" nearest other points (sorted by distance then by index)
+# The squared distances are computed with numpy for a chunk of rows at a time, and only the candidates
+# that are not farther than the count-th nearest distance (found with a partial sort) are fully sorted,
+# so this avoids sorting all the other points for every point.
+# Without numpy, the nearest points are selected with a heap (which is much slower on large graphs).
+def nearest_neighbors(positions: List[Cell], count: int) -> Iterator[Tuple[int, List[int]]]:
+    nodes = len(positions)
+    count = min(count, nodes - 1)
+    if count <= 0: return
+    if np is None:
+        for i, (x, y) in enumerate(positions):
+            others = (((x - ox) ** 2 + (y - oy) ** 2, j) for j, (ox, oy) in enumerate(positions) if j != i)
+            yield i, [j for _, j in heapq.nsmallest(count, others)]
+        return
+    points = np.array(positions, dtype=np.int64).reshape(nodes, 2)
+    chunk = max(1, NEAREST_CHUNK_ELEMENTS // nodes)
+    for begin in range(0, nodes, chunk):
+        block = points[begin:begin + chunk]
+        distances = ((block[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+        rows = np.arange(len(block))
+        distances[rows, begin + rows] = np.iinfo(np.int64).max # A point is not its own neighbor
+        kth = np.partition(distances, count - 1, axis=1)[:, count - 1]
+        for row in rows.tolist():
+            # Include all the points tied with the count-th nearest so the ties are broken by index
+            candidates = np.flatnonzero(distances[row] <= kth[row])
+            candidates = candidates[np.lexsort((candidates, distances[row, candidates]))]
+            yield begin + row, candidates[:count].tolist()
+
+# Generates a graph routing problem with the given number of nodes placed randomly in a square of the given size
+# Each node is connected (in both directions) to its "degree" nearest nodes
+# and the nodes are chained in a random order so that the graph is always connected.
+# The start is the first node and the goal is the node farthest from it.
+def generate_graph(rng: RandomGenerator, nodes: int, degree: int, size: int) -> Dict:
+    if nodes < 2:
+        raise ValueError(f"The graph must have at least 2 nodes, got {nodes}")
+    names = [f"n{index}" for index in range(nodes)]
+    positions = [(rng.int(0, size), rng.int(0, size)) for _ in range(nodes)]
+    adjacency: List[Set[int]] = [set() for _ in range(nodes)]
+    def connect(i: int, j: int):
+        adjacency[i].add(j)
+        adjacency[j].add(i)
+    order = shuffle(rng, range(nodes))
+    for i, j in zip(order, order[1:]):
+        connect(i, j)
+    for i, nearest in nearest_neighbors(positions, degree):
+        for j in nearest:
+            connect(i, j)
+    goal = max(range(nodes), key=lambda j: math.dist(positions[0], positions[j]))
+    return {
+        "graph": {
+            names[i]: {
+                "position": list(positions[i]),
+                "adjacent": [names[j] for j in sorted(adjacency[i])]
+            } for i in range(nodes)
+        },
+        "start": names[0],
+        "goal": names[goal]
+    }
+
+def main(args: argparse.Namespace):
+    rng = RandomGenerator(args.seed)
+    if args.kind == "dungeon":
+        text = generate_dungeon(rng, args.width, args.height, args.coins, args.density)
+    elif args.kind == "parking":
+        text = generate_parking(rng, args.width, args.height, args.cars, args.density)
+    elif args.csr:
+        # Huge graphs are written directly in the CSR format (check CSRGraphRoutingProblem)
+        if not args.output:
+            raise ValueError("The output directory must be given to write a graph in the CSR format")
+        CSRGraphRoutingProblem.save(generate_graph(rng, args.nodes, args.degree, args.size), args.output)
+        return
+    else:
+        text = json.dumps(generate_graph(rng, args.nodes, args.degree, args.size), indent=4)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory: os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate random levels for scaling tests")
+    parser.add_argument("kind", choices=["dungeon", "parking", "graph"], help="the kind of level to generate")
+    parser.add_argument("--seed", "-s", type=int, default=0, help="the seed of the random generator")
+    parser.add_argument("--output", "-o", default=None, help="the file to write the level to (prints it if not given)")
+    parser.add_argument("--width", "-W", type=int, default=32, help="the width of the dungeon or parking lot (including the outer walls)")
+    parser.add_argument("--height", "-H", type=int, default=32, help="the height of the dungeon or parking lot (including the outer walls)")
+    parser.add_argument("--density", "-d", type=float, default=0.25, help="the probability that an inner cell is a wall")
+    parser.add_argument("--coins", "-c", type=int, default=4, help="the number of coins in the dungeon")
+    parser.add_argument("--cars", "-k", type=int, default=3, help="the number of cars in the parking lot (at most 10)")
+    parser.add_argument("--nodes", "-n", type=int, default=100, help="the number of nodes in the graph")
+    parser.add_argument("--degree", "-g", type=int, default=3, help="the number of nearest nodes each graph node is connected to")
+    parser.add_argument("--size", "-z", type=int, default=100, help="the nodes of the graph are placed in a square of this size")
+    parser.add_argument("--csr", action="store_true", default=False,
+                        help="write the graph as a CSR directory instead of a JSON file (check CSRGraphRoutingProblem in 'graph.py')")
+    args = parser.parse_args()
+    main(args)
@@ -1,8 +1,15 @@
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 from dataclasses import dataclass
-import json
+import json, os
 
-from problem import Problem
+# numpy is optional: the JSON graphs only need the standard library while the CSR format (see below) needs numpy
+# and without it, the graph routing heuristic evaluates the states one at a time instead of in batches
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from problem import Problem, batched
 from mathutils import Point, euclidean_distance
 from helpers.utils import record_calls
 
@@ -19,6 +26,9 @@ class GraphNode:
     def __str__(self) -> str:
         return self.name
 
+# The key under which the reverse adjacency is stored in the problem cache
+REVERSE_ADJACENCY_KEY = "__reverse_adjacency__"
+
 # This is the implementation of the graph routing problem
 class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
     def __init__(self, start: GraphNode, goal: GraphNode, adjacency: Dict[GraphNode, List[GraphNode]]) -> None:
@@ -31,6 +41,9 @@ class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
         return self.start
     
     # We use @record_calls to track the arguments with which this function is called to retrieve the traversal order
+    # Every call is recorded (not a bounded or sampled window, check record_calls in "helpers/utils.py") since the grader
+    # compares the whole traversal order and play_graph prints it. When the traversal is not needed (e.g. when benchmarking
+    # huge graphs), the recording is turned off with set_call_instrumentation(False) or INSTRUMENT_CALLS=0 instead.
     @record_calls
     def is_goal(self, state: GraphNode) -> bool:
         return state == self.goal
@@ -43,13 +56,37 @@ class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
     def get_successor(self, state: GraphNode, action: GraphNode) -> GraphNode:
         return action
     
+    # This problem has a single goal state, so it can be searched backward from the goal (e.g. by bidirectional search)
+    def get_goal_state(self) -> GraphNode:
+        return self.goal
+
+    # Returns the reverse adjacency which maps each node to the list of nodes that have an edge into it
+    # It is built on the first call and stored in the problem cache
+    def reverse_adjacency(self) -> Dict[GraphNode, List[GraphNode]]:
+        cache = self.cache()
+        if REVERSE_ADJACENCY_KEY not in cache:
+            reverse: Dict[GraphNode, List[GraphNode]] = {}
+            for node, adjacent in self.adjacency.items():
+                for neighbor in adjacent:
+                    reverse.setdefault(neighbor, []).append(node)
+            cache[REVERSE_ADJACENCY_KEY] = reverse
+        return cache[REVERSE_ADJACENCY_KEY]
+
+    # Returns a list of tuples (predecessor, action) where applying the action on the predecessor leads to the given state
+    # Since the action is the next node, the action is always the given state
+    def get_predecessors(self, state: GraphNode) -> Iterable[Tuple[GraphNode, GraphNode]]:
+        return [(predecessor, state) for predecessor in self.reverse_adjacency().get(state, [])]
+
     # The cost of an action is the distance between the current node and the next node 
     def get_cost(self, state: GraphNode, action: GraphNode) -> float:
         return euclidean_distance(state.position, action.position)
     
     # Read a graph routing problem from file
+    # If the path is a directory, it is read as a CSR graph (check CSRGraphRoutingProblem)
     @staticmethod
     def from_file(path: str) -> 'GraphRoutingProblem':
+        if os.path.isdir(path):
+            return CSRGraphRoutingProblem.from_directory(path)
         problem_def: Dict[str, Dict] = json.load(open(path, 'r'))
         graph_def: Dict[str, Dict] = problem_def.get("graph", {})
         node_dict = {name: GraphNode(name, Point(*item.get("position", [0,0]))) for name, item in graph_def.items()}
@@ -62,5 +99,185 @@ class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
         goal = node_dict[problem_def.get("goal", "")]
         return GraphRoutingProblem(start, goal, adjacency)
 
+##############################
+# CSR Graph Routing Problem  #
+##############################
+
+# Loading a huge graph from JSON is slow and memory hungry since the whole file is parsed
+# and a GraphNode and an adjacency list are created for every node up front.
+# Instead, a graph can be converted once to a binary Compressed Sparse Row (CSR) format,
+# which is a directory containing:
+#   - "names.bin":             the UTF-8 encoded names of all the nodes concatenated together
+#   - "name_offsets.npy":      an array of shape (N+1,) where the name of node i is names[name_offsets[i]:name_offsets[i+1]]
+#   - "positions.npy":         an array of shape (N, 2) containing the position of each node
+#   - "offsets.npy":           an array of shape (N+1,) where the neighbors of node i are targets[offsets[i]:offsets[i+1]]
+#   - "targets.npy":           an array of shape (E,) containing the neighbor indices of all the nodes
+#   - "reverse_offsets.npy":   the same as "offsets.npy" for the reverse edges (the predecessors of each node)
+#   - "reverse_targets.npy":   the same as "targets.npy" for the reverse edges
+#   - "meta.json":             the names and indices of the start and goal nodes
+# All the arrays (including the names) are memory-mapped when the problem is loaded, so only the parts that are used
+# are read from the disk, and the GraphNodes and adjacency lists are only created for the nodes the search reaches.
+# The reverse edges are stored so that the searches that go backward from the goal (e.g. bidirectional search)
+# are also lazy instead of building the reverse adjacency of the whole graph.
+
+# Raises an ImportError if numpy (which is needed to write and read the CSR format) is not installed
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("The CSR graph format requires numpy (pip install numpy)")
+
+# CSRNames is a read-only sequence of the node names that decodes each name from the memory-mapped files when it is accessed
+class CSRNames(Sequence):
+    def __init__(self, data: 'np.ndarray', offsets: 'np.ndarray') -> None:
+        self.data = data
+        self.offsets = offsets
+
+    def __getitem__(self, index: int) -> str:
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.data[start:end].tobytes().decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+# CSRAdjacency is a read-only mapping from GraphNode to its list of neighbors that is built lazily from the CSR arrays
+# The list of neighbors of each node is built on its first access and cached
+# The forward and reverse adjacencies of a graph share the same nodes (check "reverse")
+class CSRAdjacency(Mapping):
+    def __init__(self, names: Sequence[str], positions: 'np.ndarray', offsets: 'np.ndarray', targets: 'np.ndarray',
+                 nodes: Optional[Dict[int, GraphNode]] = None, node_indices: Optional[Dict[GraphNode, int]] = None) -> None:
+        self.names = names
+        self.positions = positions
+        self.offsets = offsets
+        self.targets = targets
+        self._indices: Optional[Dict[str, int]] = None
+        self._nodes: Dict[int, GraphNode] = {} if nodes is None else nodes
+        self._node_indices: Dict[GraphNode, int] = {} if node_indices is None else node_indices
+        self._neighbors: Dict[GraphNode, List[GraphNode]] = {}
+
+    # Returns an adjacency over the same nodes using other CSR arrays (e.g. the reverse edges)
+    def reverse(self, offsets: 'np.ndarray', targets: 'np.ndarray') -> 'CSRAdjacency':
+        return CSRAdjacency(self.names, self.positions, offsets, targets, self._nodes, self._node_indices)
+
+    # Returns the index of the node with the given name or None if there is no such node
+    # This reads every name to build the name to index map (on the first call), so the problem only uses it
+    # for nodes that were not created by this adjacency (the index of every created node is already known)
+    def index(self, name: str) -> Optional[int]:
+        if self._indices is None:
+            self._indices = {name: index for index, name in enumerate(self.names)}
+        return self._indices.get(name)
+
+    # Returns the node with the given index (each node is created once)
+    def node(self, index: int) -> GraphNode:
+        node = self._nodes.get(index)
+        if node is None:
+            node = GraphNode(self.names[index], Point(*self.positions[index].tolist()))
+            self._nodes[index] = node
+            self._node_indices[node] = index
+        return node
+
+    def __getitem__(self, node: GraphNode) -> List[GraphNode]:
+        neighbors = self._neighbors.get(node)
+        if neighbors is None:
+            index = self._node_indices.get(node)
+            if index is None:
+                index = self.index(node.name)
+                if index is None or self.node(index) != node:
+                    raise KeyError(node)
+            start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+            neighbors = [self.node(target) for target in self.targets[start:end].tolist()]
+            self._neighbors[node] = neighbors
+        return neighbors
+
+    def __iter__(self) -> Iterator[GraphNode]:
+        return (self.node(index) for index in range(len(self.names)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+# CSRGraphRoutingProblem is a graph routing problem whose adjacency is read lazily from a CSR directory
+class CSRGraphRoutingProblem(GraphRoutingProblem):
+    adjacency: CSRAdjacency
+
+    def __init__(self, start: GraphNode, goal: GraphNode, adjacency: CSRAdjacency, reverse: CSRAdjacency) -> None:
+        super().__init__(start, goal, adjacency)
+        self.reverse = reverse
+
+    # The reverse adjacency is read lazily from the reverse CSR arrays
+    def reverse_adjacency(self) -> CSRAdjacency:
+        return self.reverse
+
+    # Converts a JSON graph routing problem to a CSR directory
+    # The neighbors of each node are sorted by name as in GraphRoutingProblem.from_file
+    # so the actions are returned in the same order and the searches traverse the graph in the same order
+    @staticmethod
+    def convert(path: str, directory: str) -> None:
+        with open(path, 'r') as f:
+            problem_def: Dict[str, Dict] = json.load(f)
+        CSRGraphRoutingProblem.save(problem_def, directory)
+
+    # Writes a graph routing problem definition (the content of the JSON file) to a CSR directory
+    @staticmethod
+    def save(problem_def: Dict, directory: str) -> None:
+        require_numpy()
+        graph_def: Dict[str, Dict] = problem_def.get("graph", {})
+        names = list(graph_def.keys())
+        indices = {name: index for index, name in enumerate(names)}
+        index_type = np.int32 if len(names) < 2**31 else np.int64
+        positions = np.array([graph_def[name].get("position", [0, 0]) for name in names]).reshape(len(names), 2)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        targets = []
+        for index, name in enumerate(names):
+            adjacent = [indices[adjacent] for adjacent in sorted(graph_def[name].get("adjacent", [])) if adjacent in indices]
+            targets.extend(adjacent)
+            offsets[index + 1] = offsets[index] + len(adjacent)
+        targets = np.array(targets, dtype=index_type)
+        # The reverse edges are sorted by their target (with a stable sort so the predecessors of each node are in increasing
+        # order of their index, which is the order in which GraphRoutingProblem.reverse_adjacency lists them)
+        sources = np.repeat(np.arange(len(names), dtype=index_type), np.diff(offsets))
+        reverse_targets = sources[np.argsort(targets, kind='stable')]
+        reverse_offsets = np.concatenate(([0], np.cumsum(np.bincount(targets, minlength=len(names))))).astype(np.int64)
+        encoded = [name.encode('utf-8') for name in names]
+        name_offsets = np.concatenate(([0], np.cumsum([len(name) for name in encoded], dtype=np.int64))).astype(np.int64)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "names.bin"), 'wb') as f:
+            f.write(b''.join(encoded))
+        np.save(os.path.join(directory, "name_offsets.npy"), name_offsets)
+        np.save(os.path.join(directory, "positions.npy"), positions)
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        np.save(os.path.join(directory, "targets.npy"), targets)
+        np.save(os.path.join(directory, "reverse_offsets.npy"), reverse_offsets)
+        np.save(os.path.join(directory, "reverse_targets.npy"), reverse_targets)
+        start, goal = problem_def.get("start", ""), problem_def.get("goal", "")
+        with open(os.path.join(directory, "meta.json"), 'w') as f:
+            json.dump({"start": start, "goal": goal, "start_index": indices.get(start, -1), "goal_index": indices.get(goal, -1)}, f)
+
+    # Read a graph routing problem from a CSR directory (the arrays and the names are memory-mapped)
+    # Only the start and goal nodes are created, so loading does not depend on the size of the graph
+    @staticmethod
+    def from_directory(directory: str) -> 'CSRGraphRoutingProblem':
+        require_numpy()
+        with open(os.path.join(directory, "meta.json"), 'r') as f:
+            meta = json.load(f)
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+        names_path = os.path.join(directory, "names.bin")
+        # An empty file cannot be memory-mapped (which happens if all the names are empty or there are no nodes)
+        data = np.memmap(names_path, dtype=np.uint8, mode='r') if os.path.getsize(names_path) else np.zeros(0, dtype=np.uint8)
+        names = CSRNames(data, load("name_offsets.npy"))
+        adjacency = CSRAdjacency(names, load("positions.npy"), load("offsets.npy"), load("targets.npy"))
+        reverse = adjacency.reverse(load("reverse_offsets.npy"), load("reverse_targets.npy"))
+        # Like GraphRoutingProblem.from_file, a start or goal that is not a node of the graph is an error
+        if meta["start_index"] < 0: raise KeyError(meta["start"])
+        if meta["goal_index"] < 0: raise KeyError(meta["goal"])
+        start, goal = adjacency.node(meta["start_index"]), adjacency.node(meta["goal_index"])
+        return CSRGraphRoutingProblem(start, goal, adjacency, reverse)
+
+# This is the batched version of the graph routing heuristic which computes the distances of all the states at once
+def graphrouting_heuristic_batch(problem: GraphRoutingProblem, states: List[GraphNode]) -> List[float]:
+    positions = np.array([tuple(state.position) for state in states], dtype=np.float64)
+    goal = problem.goal.position
+    dx, dy = positions[:, 0] - goal.x, positions[:, 1] - goal.y
+    # The same operations as euclidean_distance so that both versions return the exact same values
+    return np.sqrt(dx * dx + dy * dy).tolist()
+
+@batched(graphrouting_heuristic_batch if np is not None else None)
 def graphrouting_heuristic(problem: GraphRoutingProblem, state: GraphNode) -> float:
     return euclidean_distance(state.position, problem.goal.position)
\ No newline at end of file
@@ -41,32 +41,78 @@ class Arguments:
 def NotImplemented():
     raise NotImplementedError()
 
+# The call instrumentation (track_call_count and record_calls) is used to grade the search functions
+# (the number of explored nodes and the traversal order are retrieved from the calls to "is_goal").
+# Since "is_goal" is called for every explored node, the instrumentation should cost as little as possible:
+#   - The global switch "set_call_instrumentation" turns the counting and recording on or off at runtime.
+#     While it is off, the decorated functions only check a flag before calling the original function.
+#   - If the environment variable "INSTRUMENT_CALLS" is set to "0", the decorators return the original functions
+#     unchanged, so the instrumented problem classes cost nothing (the fetch functions will then return nothing).
+call_instrumentation = os.environ.get("INSTRUMENT_CALLS", "1") != "0"
+
+def set_call_instrumentation(enabled: bool):
+    global call_instrumentation
+    call_instrumentation = enabled
+
 def track_call_count(fn):
+    if os.environ.get("INSTRUMENT_CALLS", "1") == "0": return fn
     def deco(*args, **kwargs):
-        deco.calls += 1
+        if call_instrumentation: deco.calls += 1
         return fn(*args, **kwargs)
     deco.calls = 0
+    deco.__wrapped__ = fn
     return deco
 
 def fetch_tracked_call_count(fn):
     calls = getattr(fn, "calls", 0)
-    setattr(fn, "calls", 0)
+    if hasattr(fn, "calls"): setattr(fn, "calls", 0)
     return calls
 
-def record_calls(fn):
-    def deco(*args, **kwargs):
-        deco.calls.append({
-            "args": args,
-            "kwargs": kwargs
-        })
-        return fn(*args, **kwargs)
-    deco.calls = deque()
+# record_calls stores the arguments of the calls to the decorated function.
+# It can be used directly (@record_calls) or with options (@record_calls(maxlen=..., sample_every=..., count_only=...)):
+#   - maxlen: the calls are stored in a ring buffer that only keeps the last "maxlen" calls (None means unbounded)
+#   - sample_every: only one call out of every "sample_every" calls is recorded
+#   - count_only: the arguments are not recorded, only the number of calls is counted (same as track_call_count)
+# Each call is stored as a compact tuple (args, kwargs) instead of a dictionary.
+# The buffer is bound once to the wrapper (fetching the calls empties it instead of replacing it)
+# so that recording a call only costs a tuple and an append.
+# In sampling mode, the number of calls (including the ones that were not recorded) is available in "total_calls".
+def record_calls(fn = None, *, maxlen: int = None, sample_every: int = 1, count_only: bool = False):
+    if fn is None:
+        return lambda fn: record_calls(fn, maxlen=maxlen, sample_every=sample_every, count_only=count_only)
+    if os.environ.get("INSTRUMENT_CALLS", "1") == "0": return fn
+    if count_only:
+        return track_call_count(fn)
+    calls = deque(maxlen=maxlen)
+    append = calls.append
+    if sample_every == 1:
+        def deco(*args, **kwargs):
+            if call_instrumentation: append((args, kwargs))
+            return fn(*args, **kwargs)
+    else:
+        def deco(*args, **kwargs):
+            if call_instrumentation:
+                deco.total_calls += 1
+                if deco.total_calls % sample_every == 0:
+                    append((args, kwargs))
+            return fn(*args, **kwargs)
+        deco.total_calls = 0
+    deco.calls = calls
+    deco.__wrapped__ = fn
     return deco
 
+# Returns the recorded calls as tuples (args, kwargs) and clears them
+def fetch_recorded_args(fn):
+    calls = getattr(fn, "calls", None)
+    if not isinstance(calls, deque): return deque()
+    recorded = deque(calls)
+    calls.clear()
+    if hasattr(fn, "total_calls"): setattr(fn, "total_calls", 0)
+    return recorded
+
+# Returns the recorded calls as dictionaries {"args": args, "kwargs": kwargs} and clears them
 def fetch_recorded_calls(fn):
-    calls = getattr(fn, "calls", deque())
-    setattr(fn, "calls", deque())
-    return calls
+    return deque({"args": args, "kwargs": kwargs} for args, kwargs in fetch_recorded_args(fn))
 
 def add_call_listener(listener):
     def decorator(fn):
@@ -0,0 +1,142 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from dungeon import DungeonProblem
+from frontier import PriorityFrontier
+from mathutils import Direction, Point
+
+# This file implements Jump Point Search (JPS) for walking between two positions in a dungeon layout
+# Walking (ignoring the coins) is a search on a 4-connected grid where all the moves cost 1.
+# In such a grid, there are many shortest paths between two positions that only differ by the order of their moves,
+# and a regular search (BFS, UCS or A*) expands the positions on all of them.
+# JPS only considers the "canonical" shortest paths which move horizontally first and only turn to a horizontal
+# move after a vertical move when they are forced to (by a wall that blocked the earlier horizontal move).
+# Instead of expanding every position along a straight line, it "jumps" along the line until it reaches
+# a jump point (the goal, or a position where a canonical path can turn) and only these jump points are pushed to the frontier.
+# On open maps, this explores far fewer nodes than A* while still returning a shortest path.
+#
+# The rules used here are:
+#   - Moving horizontally: a vertical turn is always allowed, so a horizontal jump stops at any position
+#     from which a vertical jump finds a jump point.
+#   - Moving vertically: a horizontal turn is only allowed (forced) if the horizontal neighbor is walkable
+#     but the position behind it (in the opposite vertical direction) is a wall, so a vertical jump stops there.
+
+Cell = Tuple[int, int]
+
+# The vector of each direction as a tuple
+_VECTORS = {direction: tuple(direction.to_vector()) for direction in Direction}
+_DIRECTIONS = {vector: direction for direction, vector in _VECTORS.items()}
+
+# The key under which the walkable cells (as tuples) are stored in the problem cache
+WALKABLE_CELLS_KEY = "__walkable_cells__"
+# The key under which the walk distances are stored in the problem cache
+WALK_DISTANCES_KEY = "__walk_distances__"
+
+# Jumps vertically from (x, y) and returns the first jump point or None if it hits a wall
+def _jump_vertical(walkable: FrozenSet[Cell], x: int, y: int, dy: int, goal: Cell) -> Optional[Cell]:
+    while True:
+        y += dy
+        if (x, y) not in walkable: return None
+        if (x, y) == goal: return (x, y)
+        # Check for a forced horizontal neighbor
+        if ((x + 1, y) in walkable and (x + 1, y - dy) not in walkable) or \
+           ((x - 1, y) in walkable and (x - 1, y - dy) not in walkable):
+            return (x, y)
+
+# Jumps horizontally from (x, y) and returns the first jump point or None if it hits a wall
+def _jump_horizontal(walkable: FrozenSet[Cell], x: int, y: int, dx: int, goal: Cell) -> Optional[Cell]:
+    while True:
+        x += dx
+        if (x, y) not in walkable: return None
+        if (x, y) == goal: return (x, y)
+        # A vertical turn is natural, so stop if a vertical jump from here can reach a jump point
+        if _jump_vertical(walkable, x, y, 1, goal) is not None or _jump_vertical(walkable, x, y, -1, goal) is not None:
+            return (x, y)
+
+# Returns the directions (as vectors) to jump towards from a cell given the direction in which it was reached
+def _jump_directions(walkable: FrozenSet[Cell], cell: Cell, direction: Optional[Cell]) -> List[Cell]:
+    if direction is None:
+        return [(1, 0), (0, -1), (-1, 0), (0, 1)]
+    dx, dy = direction
+    if dy == 0:
+        return [(dx, 0), (0, -1), (0, 1)]
+    x, y = cell
+    directions = [(0, dy)]
+    for side in (1, -1):
+        if (x + side, y) in walkable and (x + side, y - dy) not in walkable:
+            directions.append((side, 0))
+    return directions
+
+# Returns the shortest path (as a list of directions) from the start to the goal in the given walkable cells
+# or None if the goal cannot be reached
+# If "expanded" is given (a list), the number of expanded jump points is appended to it
+def jump_point_path(walkable: FrozenSet[Cell], start: Cell, goal: Cell, expanded: Optional[list] = None) -> Optional[List[Direction]]:
+    if start == goal:
+        if expanded is not None: expanded.append(0)
+        return []
+    gx, gy = goal
+    # A* on the jump points with the manhattan distance as the heuristic
+    # Each jump point carries the direction in which it was reached
+    frontier = PriorityFrontier()
+    frontier.push(start, abs(start[0] - gx) + abs(start[1] - gy), (0, None))
+    parents: Dict[Cell, Optional[Cell]] = {start: None}
+    costs: Dict[Cell, int] = {start: 0}
+    explored = set()
+    count = 0
+    found = False
+    while frontier:
+        cell, _, (cost, direction) = frontier.pop()
+        count += 1
+        if cell == goal:
+            found = True
+            break
+        explored.add(cell)
+        x, y = cell
+        for dx, dy in _jump_directions(walkable, cell, direction):
+            if dy == 0:
+                jump_point = _jump_horizontal(walkable, x, y, dx, goal)
+            else:
+                jump_point = _jump_vertical(walkable, x, y, dy, goal)
+            if jump_point is None or jump_point in explored: continue
+            jump_cost = cost + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+            if jump_cost >= costs.get(jump_point, jump_cost + 1): continue
+            costs[jump_point] = jump_cost
+            parents[jump_point] = cell
+            frontier.push(jump_point, jump_cost + abs(jump_point[0] - gx) + abs(jump_point[1] - gy), (jump_cost, (dx, dy)))
+    if expanded is not None: expanded.append(count)
+    if not found: return None
+    # Expand the straight segments between the jump points into single moves
+    path: List[Direction] = []
+    cell = goal
+    while parents[cell] is not None:
+        parent = parents[cell]
+        dx, dy = cell[0] - parent[0], cell[1] - parent[1]
+        length = abs(dx) + abs(dy)
+        path.extend([_DIRECTIONS[(dx // length, dy // length)]] * length)
+        cell = parent
+    path.reverse()
+    return path
+
+# Returns the walkable cells of the dungeon as a set of tuples (it is built once and stored in the problem cache)
+def walkable_cells(problem: DungeonProblem) -> FrozenSet[Cell]:
+    cache = problem.cache()
+    if WALKABLE_CELLS_KEY not in cache:
+        cache[WALKABLE_CELLS_KEY] = frozenset((point.x, point.y) for point in problem.layout.walkable)
+    return cache[WALKABLE_CELLS_KEY]
+
+# Returns the shortest walk (ignoring the coins) from the start to the goal position as a list of directions
+# This solves the "walk to the exit" or "walk to a coin" subproblems of the dungeon
+def walk_path(problem: DungeonProblem, start: Point, goal: Point) -> Optional[List[Direction]]:
+    return jump_point_path(walkable_cells(problem), (start.x, start.y), (goal.x, goal.y))
+
+# Returns the length of the shortest walk between two positions (or None if they are not connected)
+# The distances are stored in the problem cache (in both directions since the walk is reversible)
+# Unlike DungeonProblem.distance, this does not compute the distances between all the pairs of positions
+# so it can be used in heuristics on maps that are too large for the distance matrix.
+# Note that each new pair of positions runs a new search, so a heuristic that queries the distance from
+# every expanded position to the same few targets is faster with the distance matrix when it fits in memory.
+def walk_distance(problem: DungeonProblem, start: Point, goal: Point) -> Optional[int]:
+    distances = problem.cache().setdefault(WALK_DISTANCES_KEY, {})
+    key = (start, goal)
+    if key not in distances:
+        path = walk_path(problem, start, goal)
+        distances[key] = distances[(goal, start)] = None if path is None else len(path)
+    return distances[key]
@@ -1,13 +1,27 @@
-from typing import Any, Dict, Set, Tuple, List
+from typing import Dict, Set, Tuple, List
+from dataclasses import dataclass
+import heapq, math
 from problem import Problem
 from mathutils import Direction, Point
 from helpers import utils
 
-#TODO: (Optional) Instead of Any, you can define a type for the parking state
-ParkingState = Tuple[Point]
+# For the parking state, we use dataclass with frozen=True to automatically implement:
+#   the constructor, the == operator, the hash function and to make the class immutable
+# The state contains the cell index of each car where cars[i] is the cell of car 'i' (check ParkingProblem.cells)
+# It also carries a bitmask of the occupied cells (bit 'c' is set if the cell 'c' contains a car) to check occupancy in O(1).
+# Since the bitmask is computed from the cars, two states are equal if and only if their cars are in the same cells
+# so the cells of the cars is the canonical form of the state.
+@dataclass(frozen=True)
+class ParkingState:
+    __slots__ = ("cars", "occupied")
+    cars: Tuple[int, ...]
+    occupied: int
 # An action of the parking problem is a tuple containing an index 'i' and a direction 'd' where car 'i' should move in the direction 'd'.
 ParkingAction = Tuple[int, Direction]
 
+# The key under which the slot distances are stored in the problem cache
+SLOT_DISTANCES_KEY = "__slot_distances__"
+
 # This is the implementation of the parking problem
 class ParkingProblem(Problem[ParkingState, ParkingAction]):
     passages: Set[Point]    # A set of points which indicate where a car can be (in other words, every position except walls).
@@ -16,49 +30,109 @@ class ParkingProblem(Problem[ParkingState, ParkingAction]):
                             # if a position does not contain a parking slot, it will not be in this dictionary.
     width: int              # The width of the parking lot.
     height: int             # The height of the parking lot.
+    # The following tables are built once from the passages and the slots (check "build_tables"):
+    cells: Tuple[Point]                             # The position of each cell index (the passages in reading order).
+    indices: Dict[Point, int]                       # The cell index of each passage.
+    neighbors: Tuple[Tuple[Tuple[Direction, int]]]  # For each cell, the tuples (direction, neighbor cell) that do not lead into a wall.
+    slot_owners: Tuple[int]                         # For each cell, the index of the car that owns its slot (or -1 if it is not a slot).
+    goal_cells: Tuple[int]                          # The cell of the slot of each car (or -1 if the car has no slot).
+
+    # This function builds the cell tables from the passages and the slots
+    def build_tables(self) -> None:
+        self.cells = tuple(sorted(self.passages, key=lambda point: (point.y, point.x)))
+        self.indices = {point: index for index, point in enumerate(self.cells)}
+        self.neighbors = tuple(
+            tuple((d, self.indices[point + d.to_vector()]) for d in Direction if point + d.to_vector() in self.indices)
+            for point in self.cells)
+        self.slot_owners = tuple(self.slots.get(point, -1) for point in self.cells)
+        owner_cells = {owner: self.indices[point] for point, owner in self.slots.items()}
+        self.goal_cells = tuple(owner_cells.get(i, -1) for i in range(len(self.cars)))
+
+    # This function converts a tuple of car positions to a parking state
+    def to_state(self, positions: Tuple[Point]) -> ParkingState:
+        cars = tuple(self.indices[position] for position in positions)
+        occupied = 0
+        for cell in cars: occupied |= 1 << cell
+        return ParkingState(cars, occupied)
+
+    # This function returns the position of each car in the given state
+    def get_positions(self, state: ParkingState) -> Tuple[Point]:
+        return tuple(self.cells[cell] for cell in state.cars)
+
+    # Returns a table where slot_distances()[i][c] is the least cost for car 'i' to move from the cell 'c' to its own slot
+    # if it was alone in the parking lot (or math.inf if the slot is unreachable).
+    # Entering the slot of another car costs 101 and entering any other cell costs 1, exactly like "get_cost".
+    # The table is computed once (using Dijkstra's algorithm backward from each slot) and stored in the problem cache.
+    def slot_distances(self) -> Tuple[Tuple[float, ...], ...]:
+        cache = self.cache()
+        if SLOT_DISTANCES_KEY not in cache:
+            cache[SLOT_DISTANCES_KEY] = tuple(self._distances_to_cell(i, goal) for i, goal in enumerate(self.goal_cells))
+        return cache[SLOT_DISTANCES_KEY]
+
+    # This is a helper function that computes the least cost for the given car to reach the given cell from every cell
+    def _distances_to_cell(self, car: int, goal: int) -> Tuple[float, ...]:
+        distances = [math.inf] * len(self.cells)
+        if goal == -1: return tuple(distances)
+        # Moving from a cell into its neighbor costs the entering cost of the neighbor.
+        # Since the passages are symmetric, we search backward from the goal where
+        # stepping back from a cell to its neighbor costs the entering cost of the cell.
+        entering_cost = [101 if owner != -1 and owner != car else 1 for owner in self.slot_owners]
+        distances[goal] = 0
+        queue = [(0, goal)]
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if distance > distances[cell]: continue
+            new_distance = distance + entering_cost[cell]
+            for _, neighbor in self.neighbors[cell]:
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    heapq.heappush(queue, (new_distance, neighbor))
+        return tuple(distances)
 
     # This function should return the initial state
     def get_initial_state(self) -> ParkingState:
-        return self.cars
+        return self.to_state(self.cars)
     
     # This function should return True if the given state is a goal. Otherwise, it should return False.
     def is_goal(self, state: ParkingState) -> bool:
-        for i in range(len(state)):
-            # If the car is not in parking spot or other car parking spot return false otherwise return true
-            if state[i] not in self.slots or self.slots[state[i]] != i:
-                return False
-        return True
+        # Every car must be in its own parking slot
+        return state.cars == self.goal_cells
     
     # This function returns a list of all the possible actions that can be applied to the given state
     def get_actions(self, state: ParkingState) -> List[ParkingAction]:
         # Creating a list of tupels
         # [(index, direction), ...]
         actions = []
-        for i in range(len(state)):
-            for d in Direction:
-                # Getting the possible positions 
-                position = state[i] + d.to_vector()
-                # Check if the new position is a valid position
+        occupied, neighbors = state.occupied, self.neighbors
+        for i, cell in enumerate(state.cars):
+            for d, neighbor in neighbors[cell]:
+                # Check if the neighbor cell is free
                 # If yes add it to the list of actions
-                if position in self.passages and position not in state:
-                      actions.append((i, d))
+                if not occupied >> neighbor & 1:
+                    actions.append((i, d))
         # Return the list of possible actions
         return actions
+
+    # This is a helper function that returns the cell reached by moving the given car in the given direction
+    def _target_cell(self, state: ParkingState, action: ParkingAction) -> int:
+        i, direction = action
+        for d, neighbor in self.neighbors[state.cars[i]]:
+            if d == direction: return neighbor
+        raise ValueError(f"Car {i} can not move {direction} into a wall")
     
     # This function returns a new state which is the result of applying the given action to the given state
     def get_successor(self, state: ParkingState, action: ParkingAction) -> ParkingState:
-        ind_child , direction = action
-        new_state = list(state)
-        # Getting the new state by getting successor index from action parameter and the state and prforming action at that state 
-        new_state[ind_child] += direction.to_vector()
-        return tuple(new_state)  
+        ind_child = action[0]
+        cell, new_cell = state.cars[ind_child], self._target_cell(state, action)
+        # Move the car to the new cell and update the occupied cells
+        cars = state.cars[:ind_child] + (new_cell,) + state.cars[ind_child+1:]
+        return ParkingState(cars, state.occupied ^ (1 << cell) ^ (1 << new_cell))
     
     # This function returns the cost of applying the given action to the given state
     def get_cost(self, state: ParkingState, action: ParkingAction) -> float:
-        # Save the new position
-        new_position = state[action[0]] + action[1].to_vector()
+        owner = self.slot_owners[self._target_cell(state, action)]
         # Check if the new position is a parking lot of someone else set the cost to 101 otherwise to 1  
-        if new_position in self.slots and action[0] != self.slots[new_position] :
+        if owner != -1 and owner != action[0]:
             return 101
         else:
             return 1
@@ -87,6 +161,7 @@ class ParkingProblem(Problem[ParkingState, ParkingAction]):
         problem.slots = {position:index for index, position in slots.items()}
         problem.width = width
         problem.height = height
+        problem.build_tables()
         return problem
 
     # Read a parking problem from file containing a grid of tiles
@@ -94,4 +169,11 @@ class ParkingProblem(Problem[ParkingState, ParkingAction]):
     def from_file(path: str) -> 'ParkingProblem':
         with open(path, 'r') as f:
             return ParkingProblem.from_text(f.read())
-    
+
+# This heuristic is an additive pattern database where each pattern is a single car:
+# it sums the least cost for each car to reach its own slot while ignoring the other cars.
+# It is admissible since every action moves a single car and pays the same cost as in the relaxed problem of this car.
+# It is consistent since an action only changes the term of the moved car by at most the cost of the action.
+def parking_heuristic(problem: ParkingProblem, state: ParkingState) -> float:
+    slot_distances = problem.slot_distances()
+    return sum(distances[cell] for distances, cell in zip(slot_distances, state.cars))
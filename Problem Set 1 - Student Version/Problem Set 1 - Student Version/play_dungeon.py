@@ -1,9 +1,11 @@
 from typing import List
-from dungeon import DungeonProblem, Direction, DungeonState, DungeonTile
-from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
+from dungeon import CompactDungeonProblem, DungeonProblem, Direction, DungeonState, DungeonTile
+from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent, PolicyCache
+from portfolio import Portfolio, PortfolioEntry
 from helpers.utils import fetch_tracked_call_count
 from helpers.heuristic_checks import test_heuristic_consistency
-from functools import lru_cache
+from search_stats import SearchStats
+from functools import lru_cache, partial
 import argparse, time
 
 def colored_dungeon(level: str):
@@ -25,6 +27,9 @@ def get_heuristic(name: str):
     if name == "strong":
         from dungeon_heuristic import strong_heuristic
         return strong_heuristic
+    if name == "jps":
+        from dungeon_heuristic import jump_point_heuristic
+        return jump_point_heuristic
     print(f"Requested Heuristic '{name}' is invalid")
     exit(-1)
 
@@ -63,15 +68,46 @@ def create_agent(args: argparse.Namespace):
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
-            DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
+            ProblemType = CompactDungeonProblem if args.compact else DungeonProblem
+            ProblemType.get_successor = test_heuristic_consistency(heuristic)(ProblemType.get_successor)
         return InformedSearchAgent(AStarSearch, heuristic)
+    if agent_type == "idastar":
+        from search import IterativeDeepeningAStarSearch
+        # We cache the heuristic calls since IDA* evaluates the same states in every iteration
+        heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
+        if args.checks:
+            ProblemType = CompactDungeonProblem if args.compact else DungeonProblem
+            ProblemType.get_successor = test_heuristic_consistency(heuristic)(ProblemType.get_successor)
+        return InformedSearchAgent(IterativeDeepeningAStarSearch, heuristic)
+    if agent_type == "fcastar":
+        from search import FrontierCappedAStarSearch
+        heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
+        if args.checks:
+            ProblemType = CompactDungeonProblem if args.compact else DungeonProblem
+            ProblemType.get_successor = test_heuristic_consistency(heuristic)(ProblemType.get_successor)
+        # The frontier size limit selected by the user is bound to the search function
+        search_fn = lambda problem, state, heuristic, **kwargs: FrontierCappedAStarSearch(problem, state, heuristic, max_frontier_size=args.frontier_limit, **kwargs)
+        return InformedSearchAgent(search_fn, heuristic)
+    if agent_type == "portfolio":
+        from search import BreadthFirstSearch, UniformCostSearch, AStarSearch, BestFirstSearch
+        # The portfolio runs these searches in parallel and returns the first solution (check "portfolio.py")
+        weak, strong = lru_cache(2**16)(get_heuristic("weak")), lru_cache(2**16)(get_heuristic("strong"))
+        entries = [
+            PortfolioEntry("bfs", BreadthFirstSearch),
+            PortfolioEntry("ucs", UniformCostSearch, optimal=True),
+            PortfolioEntry("astar-weak", AStarSearch, weak, optimal=True),
+            PortfolioEntry("astar-strong", AStarSearch, strong, optimal=True),
+            PortfolioEntry("gbfs-strong", BestFirstSearch, strong),
+        ]
+        return UninformedSearchAgent(Portfolio(entries, args.optimal))
     if agent_type == "gbfs":
         from search import BestFirstSearch
         # We cache the heuristic calls to speed up the search process if the heuristic is not fast
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
-            DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
+            ProblemType = CompactDungeonProblem if args.compact else DungeonProblem
+            ProblemType.get_successor = test_heuristic_consistency(heuristic)(ProblemType.get_successor)
         return InformedSearchAgent(BestFirstSearch, heuristic)
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
@@ -81,15 +117,28 @@ def main(args: argparse.Namespace):
     if args.ansicolors: state_printer = lambda state: print(colored_dungeon(str(state)))
     start = time.time() # Track run time
     problem = DungeonProblem.from_file(args.level) # create the problem
+    if args.compact: problem = CompactDungeonProblem.from_problem(problem) # If desired by the user, use the compact state encoding
+    ProblemType = type(problem) # The explored nodes are counted on the "is_goal" of the problem class
+    if args.expansion_cache: problem.enable_expansion_cache() # If desired by the user, memoize the successors, costs and heuristics
     state = problem.get_initial_state() # Get the initial state
     print("Initial State:")
     state_printer(state)
     agent = create_agent(args)
+    # If desired by the user, the solutions are stored on disk and reused in the next runs on the same level
+    if args.policy_cache and not isinstance(agent, HumanAgent):
+        # The algorithm name includes every option that can change the solution
+        algorithm = f"{args.agent}:{args.heuristic}:{args.frontier_limit}:{args.compact}:{args.optimal}"
+        with open(args.level, 'r') as f:
+            agent.use_policy_cache(PolicyCache(args.policy_cache, args.policy_cache_size), f.read(), algorithm)
+    # If desired by the user, the search function fills the statistics of every search done by the agent
+    stats = SearchStats(track_memory=args.track_memory) if args.stats else None
+    if stats is not None and not isinstance(agent, HumanAgent):
+        agent.search_fn = partial(agent.search_fn, stats=stats)
     step = 0 # This will store the current step
     total_explored_nodes = 0 # This will store the number of traversed nodes during search
     unsolvable = False # This will store whether the problem is unsolvable or not
     while not problem.is_goal(state):
-        fetch_tracked_call_count(DungeonProblem.is_goal) # Clear the call counter
+        fetch_tracked_call_count(ProblemType.is_goal) # Clear the call counter
         action = agent.act(problem, state) # Request an action from the agent
         # If no solution was found, break
         if action is None:
@@ -97,7 +146,7 @@ def main(args: argparse.Namespace):
             unsolvable = True
             break
         # Get the number of traversed nodes
-        total_explored_nodes += fetch_tracked_call_count(DungeonProblem.is_goal)
+        total_explored_nodes += fetch_tracked_call_count(ProblemType.is_goal)
         # Apply the action to the state
         state = problem.get_successor(state, action)
         step += 1
@@ -115,6 +164,16 @@ def main(args: argparse.Namespace):
     # This was a search agent, display the number of traversed nodes
     if not isinstance(agent, HumanAgent):
         print(f"Search explored {total_explored_nodes} nodes")
+    # If the agent was a portfolio, display the search that found the solution
+    portfolio = getattr(getattr(agent, "search_fn", None), "func", getattr(agent, "search_fn", None)) # Unwrap the statistics partial
+    if isinstance(portfolio, Portfolio):
+        print(f"Portfolio winner: {portfolio.winner}")
+    # If the expansion cache was enabled, display its hit rates
+    if args.expansion_cache:
+        print(f"Expansion Cache: {problem.expansion_cache()}")
+    # If the statistics were requested, display them
+    if stats is not None and not isinstance(agent, HumanAgent):
+        print(f"Search Statistics: {stats}")
     # Finally print the elapsed time for the whole process
     print(f"Elapsed time: {time.time() - start} seconds")
 
@@ -124,13 +183,30 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play Dungeon as Human or AI")
     parser.add_argument("level", help="path to the dungeon to play")
     parser.add_argument("--agent", "-a", default="human",
-                        choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'gbfs'],
+                        choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'idastar', 'fcastar', 'gbfs', 'portfolio'],
                         help="the agent that will play the game")
     parser.add_argument("--heuristic", '-hf', default="zero",
-                        choices=["zero", "weak", "strong"],
-                        help="choose the heuristic to use with A* or Greedy Best First Search")
+                        choices=["zero", "weak", "strong", "jps"],
+                        help="choose the heuristic to use with A* (and its variants) or Greedy Best First Search "
+                             "(jps is the strong heuristic with the distances found by jump point search, for large maps)")
+    parser.add_argument("--frontier-limit", "-fl", type=int, default=10000,
+                        help="the maximum number of states in the frontier of the frontier-capped A* search (fcastar)")
+    parser.add_argument("--optimal", "-op", action="store_true", default=False,
+                        help="make the portfolio agent wait for the first solution of an optimal search instead of any solution")
     parser.add_argument("--checks", "-c", action='store_true', default=False,
                         help="Enable consistency checks for the heuristic")
+    parser.add_argument("--compact", "-cp", action="store_true", default=False,
+                        help="Encode the states as a player cell index and a coin bitmask instead of points and sets of points")
+    parser.add_argument("--expansion-cache", "-ec", action="store_true", default=False,
+                        help="Compute the successor, cost and heuristic of each transition only once and report the cache hit rates")
+    parser.add_argument("--policy-cache", "-pc", default=None, metavar="DIRECTORY",
+                        help="store the solutions in the given directory and reuse them when the same level is played again with the same agent")
+    parser.add_argument("--policy-cache-size", "-pcs", type=int, default=256,
+                        help="the maximum number of solutions kept in the policy cache (the least recently used are evicted)")
+    parser.add_argument("--stats", "-s", action="store_true", default=False,
+                        help="Report the search statistics (generated and expanded nodes, frontier size, duplicates and phase times)")
+    parser.add_argument("--track-memory", "-tm", action="store_true", default=False,
+                        help="Also report the peak memory allocated during the searches (requires --stats and slows the search)")
     parser.add_argument("--ansicolors", "-ac", action="store_true",
                         help="Print the dungeon on the console with ANSI colors (only works on some terminals)")
 
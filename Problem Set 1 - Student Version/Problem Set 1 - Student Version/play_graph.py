@@ -1,8 +1,11 @@
 import time
 from graph import GraphRoutingProblem, GraphNode, graphrouting_heuristic
-from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
-from helpers.utils import fetch_recorded_calls
-import argparse, os, json
+from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent, PolicyCache
+from portfolio import Portfolio, PortfolioEntry
+from helpers.utils import fetch_recorded_args
+from search_stats import SearchStats
+from functools import partial
+import argparse, hashlib, os, json
 
 # Create an agent based on the user selections
 def create_agent(args: argparse.Namespace):
@@ -35,21 +38,52 @@ def create_agent(args: argparse.Namespace):
     if agent_type == "ucs":
         from search import UniformCostSearch
         return UninformedSearchAgent(UniformCostSearch)
+    if agent_type == "bibfs":
+        from search import BidirectionalBreadthFirstSearch
+        return UninformedSearchAgent(BidirectionalBreadthFirstSearch)
+    if agent_type == "biucs":
+        from search import BidirectionalUniformCostSearch
+        return UninformedSearchAgent(BidirectionalUniformCostSearch)
     if agent_type == "astar":
         from search import AStarSearch
         return InformedSearchAgent(AStarSearch, graphrouting_heuristic)
+    if agent_type == "portfolio":
+        from search import BreadthFirstSearch, UniformCostSearch, AStarSearch, BestFirstSearch, BidirectionalUniformCostSearch
+        # The portfolio runs these searches in parallel and returns the first solution (check "portfolio.py")
+        entries = [
+            PortfolioEntry("bfs", BreadthFirstSearch),
+            PortfolioEntry("ucs", UniformCostSearch, optimal=True),
+            PortfolioEntry("biucs", BidirectionalUniformCostSearch, optimal=True),
+            PortfolioEntry("astar", AStarSearch, graphrouting_heuristic, optimal=True),
+            PortfolioEntry("gbfs", BestFirstSearch, graphrouting_heuristic),
+        ]
+        return UninformedSearchAgent(Portfolio(entries, args.optimal))
     if agent_type == "gbfs":
         from search import BestFirstSearch
         return InformedSearchAgent(BestFirstSearch, graphrouting_heuristic)
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
 
+# Returns the text that identifies the graph in the policy cache
+# A graph in the CSR format (a directory) can be huge, so it is identified by a hash of its files instead of its content
+def read_level(path: str) -> str:
+    if not os.path.isdir(path):
+        with open(path, 'r') as f:
+            return f.read()
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
 def main(args: argparse.Namespace):
     start = time.time() # Track run time
     graph_path = args.graph
     problem = GraphRoutingProblem.from_file(graph_path) # create the problem
     # Check if there is a figure for the graph that we can display on the console
-    figure_path = json.load(open(graph_path, 'r')).get("figure")
+    # (A graph in the CSR format is a directory and has no figure)
+    figure_path = None if os.path.isdir(graph_path) else json.load(open(graph_path, 'r')).get("figure")
     figure = None
     if figure_path:
         figure_path = os.path.join(os.path.dirname(graph_path), figure_path)
@@ -61,15 +95,24 @@ def main(args: argparse.Namespace):
         print(figure)
     print("Current Node:", state)
     agent = create_agent(args)
+    # If desired by the user, the solutions are stored on disk and reused in the next runs on the same level
+    if args.policy_cache and not isinstance(agent, HumanAgent):
+        # The algorithm name includes every option that can change the solution
+        algorithm = f"{args.agent}:{args.optimal}"
+        agent.use_policy_cache(PolicyCache(args.policy_cache, args.policy_cache_size), read_level(args.graph), algorithm)
+    # If desired by the user, the search function fills the statistics of every search done by the agent
+    stats = SearchStats() if args.stats else None
+    if stats is not None and not isinstance(agent, HumanAgent):
+        agent.search_fn = partial(agent.search_fn, stats=stats)
     step = 0 # This will store the current step
     path_cost = 0 # This will store the total path cost
     traversed_nodes = [] # This will store all the traversed nodes in order of traversal
     unsolvable = False # This will store whether the problem is unsolvable or not
     while not problem.is_goal(state):
-        fetch_recorded_calls(GraphRoutingProblem.is_goal) # Clear the recorded calls
+        fetch_recorded_args(GraphRoutingProblem.is_goal) # Clear the recorded calls
         action = agent.act(problem, state) # Request an action from the agent
         # Retrieve the traversed nodes
-        traversed_nodes += [call["args"][1].name for call in list(fetch_recorded_calls(GraphRoutingProblem.is_goal))]
+        traversed_nodes += [args[1].name for args, _ in fetch_recorded_args(GraphRoutingProblem.is_goal)]
         # If no solution was found, break
         if action is None:
             print("Agent cannot find a solution, exiting...")
@@ -92,6 +135,13 @@ def main(args: argparse.Namespace):
     # This was a search agent, display the traversed nodes
     if not isinstance(agent, HumanAgent):
         print(f"Traversal Order: {'->'.join(traversed_nodes)}")
+    # If the statistics were requested, display them
+    if stats is not None and not isinstance(agent, HumanAgent):
+        print(f"Search Statistics: {stats}")
+    # If the agent was a portfolio, display the search that found the solution
+    portfolio = getattr(getattr(agent, "search_fn", None), "func", getattr(agent, "search_fn", None)) # Unwrap the statistics partial
+    if isinstance(portfolio, Portfolio):
+        print(f"Portfolio winner: {portfolio.winner}")
     # Finally print the elapsed time for the whole process
     print(f"Elapsed time: {time.time() - start} seconds")
 
@@ -100,8 +150,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play Graph as Human or AI")
     parser.add_argument("graph", help="path to the graph to play")
     parser.add_argument("--agent", "-a", default="human",
-                        choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'gbfs'],
+                        choices=['human', 'bfs', 'dfs', 'ucs', 'bibfs', 'biucs', 'astar', 'gbfs', 'portfolio'],
                         help="the agent that will play the game")
+    parser.add_argument("--optimal", "-op", action="store_true", default=False,
+                        help="make the portfolio agent wait for the first solution of an optimal search instead of any solution")
+    parser.add_argument("--policy-cache", "-pc", default=None, metavar="DIRECTORY",
+                        help="store the solutions in the given directory and reuse them when the same level is played again with the same agent")
+    parser.add_argument("--policy-cache-size", "-pcs", type=int, default=256,
+                        help="the maximum number of solutions kept in the policy cache (the least recently used are evicted)")
+    parser.add_argument("--stats", "-s", action="store_true", default=False,
+                        help="Report the search statistics (generated and expanded nodes, frontier size, duplicates and phase times)")
 
     args = parser.parse_args()
     try:
@@ -0,0 +1,141 @@
+from parking import ParkingProblem, ParkingState, ParkingAction
+from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
+from mathutils import Direction, Point
+from helpers.heuristic_checks import test_heuristic_consistency
+from search_stats import SearchStats
+from functools import lru_cache, partial
+import argparse, time
+
+# Returns the grid representation of the parking lot at the given state
+# The cars are denoted by letters, the free parking slots by digits and the walls by '#'
+def parking_to_str(problem: ParkingProblem, state: ParkingState) -> str:
+    cars = {position: chr(ord('A') + index) for index, position in enumerate(problem.get_positions(state))}
+    def position_to_str(position: Point) -> str:
+        if position not in problem.passages:
+            return '#'
+        if position in cars:
+            return cars[position]
+        if position in problem.slots:
+            return str(problem.slots[position])
+        return '.'
+    return '\n'.join(''.join(position_to_str(Point(x, y)) for x in range(problem.width)) for y in range(problem.height))
+
+# Return the heuristic selected by the user
+def get_heuristic(name: str):
+    if name == "zero":
+        return lambda *_: 0
+    if name == "pattern":
+        from parking import parking_heuristic
+        return parking_heuristic
+    print(f"Requested Heuristic '{name}' is invalid")
+    exit(-1)
+
+# Create an agent based on the user selections
+def create_agent(args: argparse.Namespace):
+    agent_type: str = args.agent
+    if agent_type == "human":
+        # This function reads the action from the user (human)
+        def parking_user_action(problem: ParkingProblem, state: ParkingState) -> ParkingAction:
+            possible_actions = list(problem.get_actions(state))
+            while True:
+                user_input = input("Enter action (car letter then WASD, e.g. 'A d'): ").strip().lower().split()
+                if len(user_input) == 2 and len(user_input[0]) == 1:
+                    car = ord(user_input[0]) - ord('a')
+                    direction = {
+                        'w': Direction.UP,
+                        's': Direction.DOWN,
+                        'a': Direction.LEFT,
+                        'd': Direction.RIGHT
+                    }.get(user_input[1])
+                    if (car, direction) in possible_actions:
+                        return (car, direction)
+                print("Invalid Action")
+        return HumanAgent(parking_user_action)
+    if agent_type == "bfs":
+        from search import BreadthFirstSearch
+        return UninformedSearchAgent(BreadthFirstSearch)
+    if agent_type == "dfs":
+        from search import DepthFirstSearch
+        return UninformedSearchAgent(DepthFirstSearch)
+    if agent_type == "ucs":
+        from search import UniformCostSearch
+        return UninformedSearchAgent(UniformCostSearch)
+    if agent_type in ("astar", "gbfs"):
+        from search import AStarSearch, BestFirstSearch
+        # We cache the heuristic calls to speed up the search process if the heuristic is not fast
+        heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
+        # If desired by the user, we track every transition and check for the heuristic consistency for each transition
+        if args.checks:
+            ParkingProblem.get_successor = test_heuristic_consistency(heuristic)(ParkingProblem.get_successor)
+        return InformedSearchAgent(AStarSearch if agent_type == "astar" else BestFirstSearch, heuristic)
+    print(f"Requested Agent '{agent_type}' is invalid")
+    exit(-1)
+
+def main(args: argparse.Namespace):
+    start = time.time() # Track run time
+    problem = ParkingProblem.from_file(args.level) # create the problem
+    state = problem.get_initial_state() # Get the initial state
+    print("Initial State:")
+    print(parking_to_str(problem, state))
+    agent = create_agent(args)
+    # The parking problem does not track its is_goal calls, so the explored nodes are counted by the search statistics
+    stats = SearchStats() if not isinstance(agent, HumanAgent) else None
+    if stats is not None:
+        agent.search_fn = partial(agent.search_fn, stats=stats)
+    step = 0 # This will store the current step
+    path_cost = 0 # This will store the total path cost
+    unsolvable = False # This will store whether the problem is unsolvable or not
+    while not problem.is_goal(state):
+        action = agent.act(problem, state) # Request an action from the agent
+        # If no solution was found, break
+        if action is None:
+            print("Agent cannot find a solution, exiting...")
+            unsolvable = True
+            break
+        # Get the cost and add it to the path cost
+        cost = problem.get_cost(state, action)
+        path_cost += cost
+        # Apply the action to the state
+        state = problem.get_successor(state, action)
+        step += 1
+        # Print any useful information to the user
+        print("Step:", step)
+        print("Action:", f"{chr(ord('A') + action[0])} {action[1]}", f"(cost: {cost})")
+        print(parking_to_str(problem, state))
+    if not unsolvable:
+        # If desired by the user, we check that the heuristic is zero at the goal state
+        if args.checks and isinstance(agent, InformedSearchAgent):
+            goal_heuristic = agent.heuristic(problem, state)
+            if goal_heuristic != 0:
+                print(f"ERROR: Expected heuristic at goal to be 0, got {goal_heuristic}")
+        print("YOU WON!!")
+    print("Path Cost:", path_cost)
+    # This was a search agent, display the number of explored nodes and (if requested) the other statistics
+    if stats is not None:
+        print(f"Search explored {stats.nodes_expanded} nodes")
+        if args.stats:
+            print(f"Search Statistics: {stats}")
+    # Finally print the elapsed time for the whole process
+    print(f"Elapsed time: {time.time() - start} seconds")
+
+if __name__ == "__main__":
+    # Read the arguments from the command line
+    parser = argparse.ArgumentParser(description="Play Parking as Human or AI")
+    parser.add_argument("level", help="path to the parking lot to play")
+    parser.add_argument("--agent", "-a", default="human",
+                        choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'gbfs'],
+                        help="the agent that will play the game")
+    parser.add_argument("--heuristic", '-hf', default="zero",
+                        choices=["zero", "pattern"],
+                        help="choose the heuristic to use with A* or Greedy Best First Search "
+                             "(pattern sums the least cost of each car to reach its slot alone, check parking_heuristic in 'parking.py')")
+    parser.add_argument("--checks", "-c", action='store_true', default=False,
+                        help="Enable consistency checks for the heuristic")
+    parser.add_argument("--stats", "-s", action="store_true", default=False,
+                        help="Report the search statistics (generated and expanded nodes, frontier size, duplicates and phase times)")
+
+    args = parser.parse_args()
+    try:
+        main(args)
+    except KeyboardInterrupt:
+        print("Goodbye!!")
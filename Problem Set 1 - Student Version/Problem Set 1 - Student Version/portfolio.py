@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from problem import HeuristicFunction, Problem, S, A, Solution
+from agents import PolicyCache
+from search_stats import SearchStats
+from helpers.utils import fetch_recorded_args, fetch_tracked_call_count
+from collections import deque
+import multiprocessing, pickle, queue, time
+
+# A portfolio runs several search algorithms on the same problem at the same time (each in its own process)
+# and returns the solution of the first algorithm that finishes, then cancels (terminates) the rest.
+# Different algorithms win on different problems, so a portfolio is as fast as the best algorithm for each problem
+# (as long as there are enough cores to run them in parallel).
+
+# A portfolio entry is a search function with its heuristic (None for the uninformed search functions)
+#   optimal: whether the search function returns the least cost solution (e.g. UCS or A* with an admissible heuristic)
+@dataclass
+class PortfolioEntry:
+    name: str
+    search_fn: Callable[..., Solution]
+    heuristic: Optional[HeuristicFunction] = None
+    optimal: bool = False
+
+# Portfolio is a search function that can be given to the search agents (it takes the problem and the initial state)
+# If "wait_for_optimal" is True, it returns the first solution found by an optimal entry
+# (the solutions of the other entries are ignored), otherwise it returns the first solution found by any entry.
+# If "timeout" is given (in seconds) and no solution is accepted before it, None is returned.
+# The name of the entry that found the returned solution is stored in "winner".
+#
+# The processes are forked so that the problem, the search functions and the heuristics
+# (which may be lambdas or cached functions) do not have to be pickled.
+# The solutions are sent back as action indices (check PolicyCache.encode) since the actions may not be picklable.
+# The calls to "is_goal" (which count the explored nodes) are made in the worker processes, so each worker sends back
+# its recorded calls (or their count) and those of the winner are added to the instrumentation of this process.
+# A worker that dies without reporting (e.g. killed by the operating system) is dropped instead of being waited for.
+# If forking is not supported on this platform, the entries are run one after the other in this process.
+class Portfolio:
+    # How often (in seconds) the portfolio checks whether a worker died while waiting for the results
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, entries: List[PortfolioEntry], wait_for_optimal: bool = False, timeout: Optional[float] = None) -> None:
+        self.entries = entries
+        self.wait_for_optimal = wait_for_optimal
+        self.timeout = timeout
+        self.winner: Optional[str] = None
+
+    def __call__(self, problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+        self.winner = None
+        if stats is not None: stats.start()
+        if "fork" in multiprocessing.get_all_start_methods():
+            solution, counters = self._run_parallel(problem, initial_state)
+        else:
+            solution, counters = self._run_sequential(problem, initial_state)
+        if stats is not None:
+            stats.mark("search")
+            stats.stop(*counters)
+        return solution
+
+    # Returns True if the result of the given entry can be returned by the portfolio
+    def _accepts(self, entry: PortfolioEntry, solution: Solution) -> bool:
+        return solution is not None and (entry.optimal or not self.wait_for_optimal)
+
+    # Returns True if no entry that is still running could return an accepted solution
+    def _exhausted(self, running: List[int]) -> bool:
+        return not any(self.entries[index].optimal or not self.wait_for_optimal for index in running)
+
+    # Returns (and clears) the instrumented calls to "is_goal" of the problem
+    # It is the list of recorded calls (without the problem argument) if the calls are recorded, or their count otherwise
+    @staticmethod
+    def _fetch_calls(problem: Problem[S, A]):
+        is_goal = type(problem).is_goal
+        if isinstance(getattr(is_goal, "calls", None), deque):
+            return [(args[1:], kwargs) for args, kwargs in fetch_recorded_args(is_goal)]
+        return fetch_tracked_call_count(is_goal)
+
+    # Adds the calls to "is_goal" fetched by _fetch_calls (in this or another process) to the instrumentation of the problem
+    @staticmethod
+    def _restore_calls(problem: Problem[S, A], calls):
+        is_goal = type(problem).is_goal
+        recorded = getattr(is_goal, "calls", None)
+        if isinstance(calls, int):
+            if isinstance(recorded, int): is_goal.calls += calls
+        elif isinstance(recorded, deque):
+            recorded.extend(((problem, *args), kwargs) for args, kwargs in calls)
+
+    # Runs the given entry and returns its solution, the counters of its statistics and its calls to "is_goal"
+    @staticmethod
+    def _search(entry: PortfolioEntry, problem: Problem[S, A], initial_state: S):
+        Portfolio._fetch_calls(problem) # Clear the calls made before the search
+        stats = SearchStats()
+        if entry.heuristic is None:
+            solution = entry.search_fn(problem, initial_state, stats=stats)
+        else:
+            solution = entry.search_fn(problem, initial_state, entry.heuristic, stats=stats)
+        counters = (stats.nodes_generated, stats.nodes_expanded, stats.max_frontier_size, stats.duplicate_pushes)
+        return solution, counters, Portfolio._fetch_calls(problem)
+
+    def _run_sequential(self, problem: Problem[S, A], initial_state: S):
+        for entry in self.entries:
+            solution, counters, calls = Portfolio._search(entry, problem, initial_state)
+            if self._accepts(entry, solution):
+                self.winner = entry.name
+                Portfolio._restore_calls(problem, calls)
+                return solution, counters
+        return None, (0, 0, 0, 0)
+
+    def _run_parallel(self, problem: Problem[S, A], initial_state: S):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+
+        # Each worker sends a tuple (entry index, action indices or None, counters, calls to "is_goal") through the queue
+        # If the search fails with an exception, the worker reports that it found no solution
+        # If the recorded calls cannot be pickled, only their count is sent
+        def worker(index: int):
+            try:
+                solution, counters, calls = Portfolio._search(self.entries[index], problem, initial_state)
+                indices = None if solution is None else PolicyCache.encode(problem, initial_state, solution)
+                try:
+                    pickle.dumps(calls)
+                except Exception:
+                    calls = len(calls)
+            except Exception:
+                indices, counters, calls = None, (0, 0, 0, 0), 0
+            results.put((index, indices, counters, calls))
+
+        processes = [context.Process(target=worker, args=(index,), daemon=True) for index in range(len(self.entries))]
+        for process in processes:
+            process.start()
+        running = list(range(len(self.entries)))
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        solution, counters = None, (0, 0, 0, 0)
+        try:
+            while running and not self._exhausted(running):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0: break
+                # Poll the queue so that the workers that died without reporting are noticed
+                try:
+                    index, indices, entry_counters, calls = results.get(timeout=Portfolio.POLL_INTERVAL if remaining is None else min(remaining, Portfolio.POLL_INTERVAL))
+                except queue.Empty:
+                    # A worker that reported exits normally (with the exit code 0) after its result is written to the queue,
+                    # so a worker that exited with another exit code died before reporting
+                    running = [index for index in running if processes[index].exitcode in (None, 0)]
+                    continue
+                running.remove(index)
+                entry = self.entries[index]
+                entry_solution = None if indices is None else PolicyCache.decode(problem, initial_state, indices)
+                if self._accepts(entry, entry_solution):
+                    self.winner = entry.name
+                    solution, counters = entry_solution, entry_counters
+                    Portfolio._restore_calls(problem, calls)
+                    break
+        finally:
+            # Cancel the entries that are still running
+            for process in processes:
+                if process.is_alive(): process.terminate()
+            for process in processes:
+                process.join()
+            results.close()
+        return solution, counters
@@ -1,11 +1,87 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, Iterable, List, TypeVar, Union
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
 from helpers.utils import CacheContainer, with_cache
 
 # S and A are used for generic typing where S represents the state type and A represents the action type
 S = TypeVar("S")
 A = TypeVar("A")
 
+# The key under which the expansion cache is stored in the problem's cache dictionary
+EXPANSION_CACHE_KEY = "__expansion_cache__"
+
+# ExpansionCache memoizes the transitions (successor state and action cost) of every (state, action) pair
+# and the heuristic value of every state so that each of them is computed only once.
+# Each table holds at most "capacity" entries: when a table is full, its oldest entry is evicted,
+# so the memory used by the cache stays bounded on huge problems. The tables are ordered dictionaries
+# since popping the oldest entry of a plain dictionary walks over the slots left by the previous evictions.
+# It also counts the cache hits and misses to report the hit rates.
+class ExpansionCache:
+    def __init__(self, capacity: int = 1 << 20) -> None:
+        self.capacity = capacity
+        # Maps (state, action) to (successor, cost)
+        self.transitions: 'OrderedDict[Tuple[Any, Any], Tuple[Any, float]]' = OrderedDict()
+        # Maps the key of each heuristic (check heuristic_key) to a table that maps each state to its heuristic value
+        self.heuristics: Dict[Hashable, 'OrderedDict[Any, float]'] = {}
+        # Maps the id of each heuristic object to its table, so heuristic_key is computed once per object
+        # (the object is stored with its table so that its id is not reused by another object)
+        self.heuristic_tables: Dict[int, Tuple['HeuristicFunction', 'OrderedDict[Any, float]']] = {}
+        self.transition_hits = 0
+        self.transition_misses = 0
+        self.heuristic_hits = 0
+        self.heuristic_misses = 0
+
+    # Stores the value of the key in the given table (evicting the oldest entry if the table is full)
+    def store(self, table: OrderedDict, key: Any, value: Any) -> None:
+        if len(table) >= self.capacity:
+            table.popitem(last=False)
+        table[key] = value
+
+    # Returns the table of the heuristic values computed by the given heuristic
+    def heuristic_values(self, heuristic: 'HeuristicFunction') -> 'OrderedDict[Any, float]':
+        entry = self.heuristic_tables.get(id(heuristic))
+        if entry is None:
+            key = heuristic_key(heuristic)
+            values = self.heuristics.get(key)
+            if values is None:
+                values = self.heuristics[key] = OrderedDict()
+            entry = self.heuristic_tables[id(heuristic)] = (heuristic, values)
+        return entry[1]
+
+    # Returns the ratio of transition lookups that were found in the cache
+    def transition_hit_rate(self) -> float:
+        lookups = self.transition_hits + self.transition_misses
+        return self.transition_hits / lookups if lookups else 0.0
+
+    # Returns the ratio of heuristic lookups that were found in the cache
+    def heuristic_hit_rate(self) -> float:
+        lookups = self.heuristic_hits + self.heuristic_misses
+        return self.heuristic_hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"Transitions: {self.transition_hits} hits, {self.transition_misses} misses "
+                f"(hit rate: {self.transition_hit_rate():.2%}) - "
+                f"Heuristics: {self.heuristic_hits} hits, {self.heuristic_misses} misses "
+                f"(hit rate: {self.heuristic_hit_rate():.2%})")
+
+# Returns the key under which the values of a heuristic are cached in the expansion cache
+# Heuristic objects that compute the same function get the same key, so they share their cached values:
+#   - a wrapper that only caches the values (e.g. functools.lru_cache) and the function it wraps
+#   - the lambdas (or nested functions) that are created again on every call with the same code and the same captured values
+# If the captured values are not hashable, the heuristic object itself is used as the key
+def heuristic_key(heuristic: 'HeuristicFunction') -> Hashable:
+    while getattr(heuristic, "__wrapped__", None) is not None:
+        heuristic = heuristic.__wrapped__
+    code = getattr(heuristic, "__code__", None)
+    if code is None: return heuristic
+    try:
+        closure = tuple(cell.cell_contents for cell in heuristic.__closure__ or ())
+        key = (code, heuristic.__defaults__, closure)
+        hash(key)
+    except (TypeError, ValueError):
+        return heuristic
+    return key
+
 # Problem is a generic abstract class for search problems
 # It also implements 'CacheContainer' which allows you to call the "cache" method
 # which returns a dictionary in which you can store any data you want to cache
@@ -34,8 +110,109 @@ class Problem(ABC, Generic[S, A], CacheContainer):
     def get_cost(self, state: S, action: A) -> float:
         return 1.0
 
+    # Enables (or disables) the expansion cache which is used by "get_transition" and "get_heuristic"
+    # The cache is stored in the problem's cache dictionary, so it persists between searches on the same problem
+    # Each table of the cache holds at most "capacity" entries (check ExpansionCache)
+    def enable_expansion_cache(self, enabled: bool = True, capacity: int = 1 << 20) -> None:
+        cache = self.cache()
+        if enabled:
+            cache.setdefault(EXPANSION_CACHE_KEY, ExpansionCache(capacity))
+        else:
+            cache.pop(EXPANSION_CACHE_KEY, None)
+
+    # Returns the expansion cache if it is enabled, otherwise None
+    def expansion_cache(self) -> Optional[ExpansionCache]:
+        return self.cache().get(EXPANSION_CACHE_KEY)
+
+    # Given a state and an action, this function returns the next state and the action cost
+    # If the expansion cache is enabled, they are only computed once for each (state, action) pair
+    def get_transition(self, state: S, action: A) -> Tuple[S, float]:
+        expansion_cache: Optional[ExpansionCache] = self.cache().get(EXPANSION_CACHE_KEY)
+        if expansion_cache is None:
+            return self.get_successor(state, action), self.get_cost(state, action)
+        key = (state, action)
+        transition = expansion_cache.transitions.get(key)
+        if transition is None:
+            expansion_cache.transition_misses += 1
+            transition = (self.get_successor(state, action), self.get_cost(state, action))
+            expansion_cache.store(expansion_cache.transitions, key, transition)
+        else:
+            expansion_cache.transition_hits += 1
+        return transition
+
+    # Given a heuristic function and a state, this function returns the heuristic value of the state
+    # If the expansion cache is enabled, it is only computed once for each state (check heuristic_key)
+    def get_heuristic(self, heuristic: 'HeuristicFunction', state: S) -> float:
+        expansion_cache: Optional[ExpansionCache] = self.cache().get(EXPANSION_CACHE_KEY)
+        if expansion_cache is None:
+            return heuristic(self, state)
+        values = expansion_cache.heuristic_values(heuristic)
+        value = values.get(state)
+        if value is None:
+            expansion_cache.heuristic_misses += 1
+            value = heuristic(self, state)
+            expansion_cache.store(values, state, value)
+        else:
+            expansion_cache.heuristic_hits += 1
+        return value
+
+    # Given a heuristic function and a list of states, this function returns the list of their heuristic values
+    # If the heuristic is batched (check "batched" below) and there are enough states, they are evaluated in a single call
+    # otherwise, the heuristic is called for each state
+    # If the expansion cache is enabled, only the states that are not in the cache are evaluated
+    def get_heuristics(self, heuristic: 'HeuristicFunction', states: List[S]) -> List[float]:
+        if not states: return []
+        expansion_cache: Optional[ExpansionCache] = self.cache().get(EXPANSION_CACHE_KEY)
+        if expansion_cache is None:
+            batch = get_batch_heuristic(heuristic, len(states))
+            return batch(self, states) if batch is not None else [heuristic(self, state) for state in states]
+        cached = expansion_cache.heuristic_values(heuristic)
+        values = [cached.get(state) for state in states]
+        missing = [index for index, value in enumerate(values) if value is None]
+        expansion_cache.heuristic_hits += len(states) - len(missing)
+        expansion_cache.heuristic_misses += len(missing)
+        if missing:
+            missing_states = [states[index] for index in missing]
+            batch = get_batch_heuristic(heuristic, len(missing_states))
+            computed = batch(self, missing_states) if batch is not None else [heuristic(self, state) for state in missing_states]
+            for index, value in zip(missing, computed):
+                values[index] = value
+                expansion_cache.store(cached, states[index], value)
+        return values
+
 # These are type aliases for:
 # A solution which is a list of actions (or None if no solution is found)
 Solution = Union[List[A], None]
 # A heuristic function which estimates the path cost to the goal for a given state with a certain problem
-HeuristicFunction = Callable[[Problem[S, A], S],float]
\ No newline at end of file
+HeuristicFunction = Callable[[Problem[S, A], S],float]
+# A batched heuristic function which estimates the path costs for a list of states at once (e.g. using numpy)
+# It must return a list of floats in the same order as the states
+BatchHeuristicFunction = Callable[[Problem[S, A], List[S]], List[float]]
+
+# This decorator attaches a batched version to a heuristic function, for example:
+#   @batched(lambda problem, states: ...)
+#   def heuristic(problem, state): ...
+# The heuristic can still be called for a single state, while the search functions call the batched version
+# (through Problem.get_heuristics) to evaluate all the successors of an expanded state at once
+# Since a numpy call has a fixed overhead, the batched version is only used for at least "min_size" states
+# (with the default, it is used on graphs with many neighbors but not on the grids where a state has at most 4 successors)
+BATCH_MIN_SIZE = 24
+
+# If batch_fn is None (e.g. when numpy is not installed), the heuristic is left unbatched
+def batched(batch_fn: Optional[BatchHeuristicFunction], min_size: int = BATCH_MIN_SIZE):
+    def decorator(heuristic: HeuristicFunction) -> HeuristicFunction:
+        if batch_fn is None: return heuristic
+        heuristic.batch = batch_fn
+        heuristic.batch_min_size = min_size
+        return heuristic
+    return decorator
+
+# Returns the batched version of the heuristic if it has one and it should be used for the given number of states, otherwise None
+# The heuristic may be wrapped (e.g. by functools.lru_cache), in which case the batched version of the wrapped function is used
+def get_batch_heuristic(heuristic: HeuristicFunction, count: int) -> Optional[BatchHeuristicFunction]:
+    while heuristic is not None:
+        batch = getattr(heuristic, "batch", None)
+        if batch is not None:
+            return batch if count >= heuristic.batch_min_size else None
+        heuristic = getattr(heuristic, "__wrapped__", None)
+    return None
\ No newline at end of file
@@ -1,6 +1,10 @@
+from typing import Optional
 from problem import HeuristicFunction, Problem, S, A, Solution
 from collections import deque
+from frontier import NodeStore, PriorityFrontier
+from search_stats import SearchStats
 from helpers import utils
+import math
 
 #TODO: Import any modules you want to use
 
@@ -12,228 +16,698 @@ from helpers import utils
 # 1. A list of actions which represent the path from the initial state to the final state
 # 2. None if there is no solution
 
-def BreadthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
-    # Checking that initial_state is goal or not
-    if problem.is_goal(initial_state):
-        return []
+# All the search functions also accept an optional SearchStats object (check "search_stats.py")
+# If it is given, the search function fills it with the statistics of the search
 
-    # Creating a list [frontier]
-    # Frontier consists of tuples for each state, and the sequence of actions to reach it.
-    frontier = [(problem.get_successor(initial_state, action), [action])
-                for action in problem.get_actions(initial_state)]
+# This is a helper function that records the counters of a search in the statistics (if they are requested)
+# It is called after the solution is reconstructed and it returns the solution so that it can be returned directly
+def _record(stats: Optional[SearchStats], solution: Solution, generated: int, expanded: int, max_frontier_size: int, duplicates: int) -> Solution:
+    if stats is not None:
+        stats.mark("reconstruction")
+        stats.stop(generated, expanded, max_frontier_size, duplicates)
+    return solution
 
-    # Creating a list for explored states
-    explored = [initial_state]
+def BreadthFirstSearch(problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
+
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    # The path to a state is only reconstructed from it when the goal is found
+    nodes = NodeStore()
+
+    # Creating a deque [frontier] to pop from its front in O(1)
+    # Frontier consists of tuples for each state, and the index of its node in the node store.
+    frontier = deque()
+
+    # Creating a set for reached states (explored states and states that are already in the frontier)
+    # Since the frontier is FIFO, the first time a state is reached is the first time it will be popped,
+    # so any later copy of the same state would be skipped anyway and there is no need to push it.
+    reached = {initial_state}
+    for action in problem.get_actions(initial_state):
+        successor, _ = problem.get_transition(initial_state, action)
+        generated += 1
+        if successor in reached:
+            duplicates += 1
+            continue
+        reached.add(successor)
+        frontier.append((successor, nodes.add(NodeStore.ROOT, action)))
+    if stats is not None: stats.mark("setup")
+
+    # The node of the goal (if it is found)
+    goal_node = None
 
     # Loop till frontier is empty
     while frontier:
-        # For BFS algorithm, we use the frontier list as FIFO (queue)
-        state, path = frontier.pop(0)
-
-        # Checking if this state was explored before
-        # If yes, then skip this iteration
-        if state in explored: continue
+        max_frontier_size = max(max_frontier_size, len(frontier))
+        # For BFS algorithm, we use the frontier deque as FIFO (queue)
+        state, node = frontier.popleft()
 
         # Checking if this state is goal or not
-        # If yes, return the sequence of actions that made me reach this state.
+        # If yes, stop and return the sequence of actions that made me reach this state.
+        expanded += 1
         if problem.is_goal(state):
-            return path
-
-        # Adding this new state to explored states
-        explored.append(state)
+            goal_node = node
+            break
 
         # Looping on all actions that can be took from this state
         actions = problem.get_actions(state)
         for action in actions:
-            # Getting the successor state and the path to it then append it to frontier 
-            new_path = path.copy()
-            new_path.append(action)
-            frontier.append((problem.get_successor(state, action), new_path))
+            # Getting the successor state and its node then append it to frontier
+            successor, _ = problem.get_transition(state, action)
+            generated += 1
+            if successor in reached:
+                duplicates += 1
+                continue
+            reached.add(successor)
+            frontier.append((successor, nodes.add(node, action)))
+    if stats is not None: stats.mark("search")
 
     # Return None if there is no solution. Couldn't reach the goal.
-    return None
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
+
 
+def DepthFirstSearch(problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
 
-def DepthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
     # Checking that initial_state is goal or not
     if problem.is_goal(initial_state):
-        return []
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
 
-    # Creating a list [frontier]
-    # Frontier consists of tuples for each state, and the sequence of actions to reach it.
-    frontier = [(problem.get_successor(initial_state, action), [action])
-                for action in problem.get_actions(initial_state)]
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    nodes = NodeStore()
 
-    # Creating a list for explored states
-    explored = [initial_state]
+    # Creating a deque [frontier]
+    # Frontier consists of tuples for each state, and the index of its node in the node store.
+    frontier = deque((problem.get_transition(initial_state, action)[0], nodes.add(NodeStore.ROOT, action))
+                for action in problem.get_actions(initial_state))
+    generated += len(frontier)
+    if stats is not None: stats.mark("setup")
+
+    # Creating a set for explored states
+    # Unlike BFS, a state can be pushed more than once since the last pushed copy is the first one to be popped
+    explored = {initial_state}
+
+    # The node of the goal (if it is found)
+    goal_node = None
 
     # Loop till frontier is empty
     while frontier:
-        # For BFS algorithm, we use the frontier list as LIFO (stack)
-        state, path = frontier.pop()
+        max_frontier_size = max(max_frontier_size, len(frontier))
+        # For DFS algorithm, we use the frontier deque as LIFO (stack)
+        state, node = frontier.pop()
 
         # Checking if this state was explored before
         # If yes, then skip this iteration
-        if state in explored: continue
+        if state in explored:
+            duplicates += 1
+            continue
 
         # Checking if this state is goal or not
-        # If yes, return the sequence of actions that made me reach this state.
+        # If yes, stop and return the sequence of actions that made me reach this state.
+        expanded += 1
         if problem.is_goal(state):
-            return path
+            goal_node = node
+            break
 
         # Adding this new state to explored states
-        explored.append(state)
+        explored.add(state)
 
         # Looping on all actions that can be took from this state
         actions = problem.get_actions(state)
         for action in actions:
-            # Getting the successor state and the path to it then append it to frontier 
-            new_path = path.copy()
-            new_path.append(action)
-            frontier.append((problem.get_successor(state, action), new_path))
+            # Getting the successor state and its node then append it to frontier
+            successor, _ = problem.get_transition(state, action)
+            generated += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            frontier.append((successor, nodes.add(node, action)))
+    if stats is not None: stats.mark("search")
 
     # Return None if there is no solution. Couldn't reach the goal.
-    return None
-    
-def UniformCostSearch(problem: Problem[S, A], initial_state: S) -> Solution:
-    # Checking that initial_state is goal or not
-    if problem.is_goal(initial_state):
-        return []
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
 
-    # Creating a list [frontier]
-    # Frontier consists of tuples for each state, the sequence of actions to reach it, and the cost(total) to reach it.
-    frontier = [(problem.get_successor(initial_state, action), [action], problem.get_cost(initial_state, action))
-                for action in problem.get_actions(initial_state)]
+def UniformCostSearch(problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
 
-    # Creating a list for explored states
-    explored = [initial_state]
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    nodes = NodeStore()
+
+    # Creating a set for explored states
+    # The initial state is explored before its successors are pushed, so it is not pushed again if it is its own successor
+    explored = {initial_state}
+
+    # Creating a priority queue [frontier] ordered by the cost(total) to reach each state
+    # Each state in the frontier carries the index of its node in the node store.
+    # Ties are broken by insertion order, so states with equal cost are expanded first-in first-out.
+    frontier = PriorityFrontier()
+    for action in problem.get_actions(initial_state):
+        successor, cost = problem.get_transition(initial_state, action)
+        generated += 1
+        if successor in explored:
+            duplicates += 1
+            continue
+        if frontier.push(successor, cost, len(nodes)):
+            nodes.add(NodeStore.ROOT, action)
+        else:
+            duplicates += 1
+    if stats is not None: stats.mark("setup")
+
+    # The node of the goal (if it is found)
+    goal_node = None
 
     # Loop till frontier is empty
     while frontier:
-        # For UCS algorithm, we have to sort frontier list
-        # Sort frontier on each tuple's cost, Least cost is at index 0
-        # Therefore, pop from index 0 after sorting to get the least cost
-        frontier.sort(key=lambda frontier: frontier[2])
-        #will return the element in that list whose third element (frontier[2]) is larger than all of the other second elements
-        state, path, cost = frontier.pop(0)
-
-        # Checking if this state was explored before
-        # If yes, then skip this iteration
-        if state in explored: continue
+        max_frontier_size = max(max_frontier_size, len(frontier))
+        # For UCS algorithm, we pop the state with the least cost from the frontier
+        state, cost, node = frontier.pop()
 
         # Checking if this state is goal or not
-        # If yes, return the sequence of actions that made me reach this state.
+        # If yes, stop and return the sequence of actions that made me reach this state.
+        expanded += 1
         if problem.is_goal(state):
-            return path
+            goal_node = node
+            break
 
         # Adding this new state to explored states
-        explored.append(state)
+        explored.add(state)
 
         # Looping on all actions that can be took from this state
         actions = problem.get_actions(state)
         for action in actions:
-            # Getting the successor state, the path to it, and the cost then append it to frontier 
-            new_path = path.copy()
-            new_path.append(action)
-            frontier.append((problem.get_successor(state, action), new_path, cost + problem.get_cost(state, action)))
+            # Getting the successor state and the cost then push it to frontier
+            # Explored states are never expanded again so there is no need to push them
+            successor, action_cost = problem.get_transition(state, action)
+            generated += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            new_cost = cost + action_cost
+            # A node is only stored if the successor enters the frontier (or its cost is decreased)
+            if frontier.push(successor, new_cost, len(nodes)):
+                nodes.add(node, action)
+            else:
+                duplicates += 1
+    if stats is not None: stats.mark("search")
 
     # Return None if there is no solution. Couldn't reach the goal.
-    return None
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
+
+def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
 
-def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction) -> Solution:
     # Checking that initial_state is goal or not
     if problem.is_goal(initial_state):
-        return []
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    nodes = NodeStore()
+
+    # Creating a set for explored states
+    # The initial state is explored before its successors are pushed, so it is not pushed again if it is its own successor
+    explored = {initial_state}
+
+    # Creating a priority queue [frontier] ordered by the total cost (goal cost + heuristic) of each state
+    # Each state in the frontier carries the index of its node in the node store and its goal cost.
+    frontier = PriorityFrontier()
+    # The heuristics of all the successors are evaluated in a single call (check Problem.get_heuristics)
+    successors = [(action, *problem.get_transition(initial_state, action)) for action in problem.get_actions(initial_state)]
+    generated += len(successors)
+    successors = [(action, successor, g_cost) for action, successor, g_cost in successors if successor not in explored]
+    duplicates += generated - len(successors)
+    heuristics = problem.get_heuristics(heuristic, [successor for _, successor, _ in successors])
+    for (action, successor, g_cost), h_cost in zip(successors, heuristics):
+        if frontier.push(successor, g_cost + h_cost, (len(nodes), g_cost)):
+            nodes.add(NodeStore.ROOT, action)
+        else:
+            duplicates += 1
+    if stats is not None: stats.mark("setup")
+
+    # The node of the goal (if it is found)
+    goal_node = None
+
+    # Loop till frontier doesn't have any state
+    while frontier:
+        max_frontier_size = max(max_frontier_size, len(frontier))
+        # For Astar algorithm, we pop the state with the least total cost from the frontier
+        state, _, (node, g_cost) = frontier.pop()
 
-    # Creating a list [frontier]
-    # Frontier consists of tuples for each state, the sequence of actions to reach it, and the cost(total and goal) to reach it.
-    frontier = [(problem.get_successor(initial_state, action),
-                 [action],
-                 problem.get_cost(initial_state, action) + heuristic(problem,problem.get_successor(initial_state, action)),
-                 problem.get_cost(initial_state, action))
-                for action in problem.get_actions(initial_state)]
+        # Checking if this state is goal or not
+        # If yes, stop and return the sequence of actions that made me reach this state.
+        expanded += 1
+        if problem.is_goal(state):
+            goal_node = node
+            break
 
-    # Creating a list for explored states
-    explored = [initial_state]
+        # Adding this new state to explored states
+        explored.add(state)
 
-    # Loop till frontier doesn't have any tuple
-    while frontier:
-        # For Astar algorithm, we use the sorted frontier list
-        # Sort frontier on each tuple's cost, Least cost is at index 0
-        # Therefore, pop from index 0 after sorting to get the least cost
-        frontier.sort(key=lambda frontier: frontier[2])
-        #will return the element in that list whose third element (frontier[2]) is larger than all of the other second elements
-        state, path, cost, g_cost = frontier.pop(0)
+        # Looping on all actions that can be took from this state
+        actions = problem.get_actions(state)
+        successors = []
+        for action in actions:
+            # Getting the successor state and the action cost
+            successor, action_cost = problem.get_transition(state, action)
+            generated += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            successors.append((action, successor, action_cost))
+        # Evaluating the heuristics of all the successors in a single call then push them to frontier with the (total, goal)cost
+        heuristics = problem.get_heuristics(heuristic, [successor for _, successor, _ in successors])
+        for (action, successor, action_cost), h_cost in zip(successors, heuristics):
+            next_state_g_cost = g_cost + action_cost
+            if frontier.push(successor, next_state_g_cost + h_cost, (len(nodes), next_state_g_cost)):
+                nodes.add(node, action)
+            else:
+                duplicates += 1
+    if stats is not None: stats.mark("search")
 
-        # Checking if this state was explored before
-        # If yes, then skip this iteration
-        if state in explored: continue
+    # Return None if there is no solution. Couldn't reach the goal.
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
+
+def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
+
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    nodes = NodeStore()
+
+    # Creating a set for explored states
+    # The initial state is explored before its successors are pushed, so it is not pushed again if it is its own successor
+    explored = {initial_state}
+
+    # Creating a priority queue [frontier] ordered by the heuristic of each state
+    # Each state in the frontier carries the index of its node in the node store.
+    frontier = PriorityFrontier()
+    # The heuristics of all the successors are evaluated in a single call (check Problem.get_heuristics)
+    successors = [(action, problem.get_transition(initial_state, action)[0]) for action in problem.get_actions(initial_state)]
+    generated += len(successors)
+    successors = [(action, successor) for action, successor in successors if successor not in explored]
+    duplicates += generated - len(successors)
+    heuristics = problem.get_heuristics(heuristic, [successor for _, successor in successors])
+    for (action, successor), h_cost in zip(successors, heuristics):
+        if frontier.push(successor, h_cost, len(nodes)):
+            nodes.add(NodeStore.ROOT, action)
+        else:
+            duplicates += 1
+    if stats is not None: stats.mark("setup")
+
+    # The node of the goal (if it is found)
+    goal_node = None
+
+    # Loop till frontier doesn't have any state
+    while frontier:
+        max_frontier_size = max(max_frontier_size, len(frontier))
+        # For GBFS algorithm, we pop the state with the least heuristic from the frontier
+        state, _, node = frontier.pop()
 
         # Checking if this state is goal or not
-        # If yes, return the sequence of actions that made me reach this state.
+        # If yes, stop and return the sequence of actions that made me reach this state.
+        expanded += 1
         if problem.is_goal(state):
-            return path
+            goal_node = node
+            break
 
         # Adding this new state to explored states
-        explored.append(state)
+        explored.add(state)
 
         # Looping on all actions that can be took from this state
         actions = problem.get_actions(state)
+        successors = []
         for action in actions:
-            # Getting the successor state, the path to it, and the (total, goal)cost then append it to frontier 
-            new_path = path.copy()
-            new_path.append(action)
-
-            next_state_g_cost = g_cost + problem.get_cost(state, action)
-            next_state_cost = next_state_g_cost + heuristic(problem, problem.get_successor(state, action))
-            frontier.append((problem.get_successor(state, action), new_path, next_state_cost, next_state_g_cost))
+            # Getting the successor state
+            successor, _ = problem.get_transition(state, action)
+            generated += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            successors.append((action, successor))
+        # Evaluating the heuristics of all the successors in a single call then push them to frontier
+        heuristics = problem.get_heuristics(heuristic, [successor for _, successor in successors])
+        for (action, successor), h_cost in zip(successors, heuristics):
+            if frontier.push(successor, h_cost, len(nodes)):
+                nodes.add(node, action)
+            else:
+                duplicates += 1
+    if stats is not None: stats.mark("search")
 
     # Return None if there is no solution. Couldn't reach the goal.
-    return None
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
+
+# Iterative Deepening A* (IDA*) runs a depth first search that only expands the states whose total cost
+# (goal cost + heuristic) does not exceed a bound. If no goal is found, the bound is increased to the least
+# total cost that exceeded it and the search is repeated. Like A*, it returns an optimal solution if the heuristic
+# is admissible, but it only keeps the current path in memory (at the price of re-expanding states in every iteration).
+# In the statistics, the frontier size is the length of the current path.
+def IterativeDeepeningAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics (they are accumulated over the iterations)
+    counters = [0, 1, 0, 0]
 
-def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction) -> Solution:
     # Checking that initial_state is goal or not
     if problem.is_goal(initial_state):
-        return []
-
-    # Creating a list [frontier]
-    # Frontier consists of tuples for each state, the sequence of actions to reach it, and the cost(total and goal) to reach it.
-    frontier = [(problem.get_successor(initial_state, action),
-                 [action],
-                 heuristic(problem,problem.get_successor(initial_state, action)))
-                for action in problem.get_actions(initial_state)]
-
-    # Creating a list for explored states
-    explored = [initial_state]
+        return _record(stats, [], *counters)
+
+    bound = problem.get_heuristic(heuristic, initial_state)
+    if stats is not None: stats.mark("setup")
+    while True:
+        path, bound = _bounded_depth_first_search(problem, initial_state, heuristic, bound, counters)
+        # If a goal was found, return the path to it
+        # If no state exceeded the bound, the whole reachable space was searched. Couldn't reach the goal.
+        if path is not None or bound == math.inf:
+            break
+    if stats is not None: stats.mark("search")
+    return _record(stats, path, *counters)
+
+# This is a helper function for IDA* that runs a depth first search limited by the bound on the total cost
+# It returns a tuple containing the path to the goal (or None if it was not found)
+# and the least total cost that exceeded the bound (to be used as the next bound)
+# The counters [generated, expanded, max path length, duplicates] are updated in place
+# The search is iterative (using a stack of action iterators) so that deep paths do not exceed the recursion limit
+def _bounded_depth_first_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, bound: float, counters: list):
+    generated, expanded, max_frontier_size, duplicates = counters
+    # The states, the goal costs and the remaining actions along the current path
+    states, costs, iterators = [initial_state], [0], [iter(problem.get_actions(initial_state))]
+    # The states on the current path (to avoid cycles) and the actions along the current path
+    on_path, path = {initial_state}, []
+    next_bound = math.inf
+    found = False
+    while iterators:
+        action = next(iterators[-1], _NO_ACTION)
+        if action is _NO_ACTION:
+            # All the actions of the last state were tried, so we backtrack
+            iterators.pop()
+            costs.pop()
+            on_path.discard(states.pop())
+            if path: path.pop()
+            continue
+        state = states[-1]
+        successor, cost = problem.get_transition(state, action)
+        generated += 1
+        # Skip the successors that are already on the current path
+        if successor in on_path:
+            duplicates += 1
+            continue
+        g_cost = costs[-1] + cost
+        f_cost = g_cost + problem.get_heuristic(heuristic, successor)
+        # If the total cost exceeds the bound, do not expand the successor but remember the least exceeding cost
+        if f_cost > bound:
+            next_bound = min(next_bound, f_cost)
+            continue
+        path.append(action)
+        max_frontier_size = max(max_frontier_size, len(path))
+        # Checking if this state is goal or not
+        expanded += 1
+        if problem.is_goal(successor):
+            found = True
+            break
+        states.append(successor)
+        costs.append(g_cost)
+        iterators.append(iter(problem.get_actions(successor)))
+        on_path.add(successor)
+    counters[:] = generated, expanded, max_frontier_size, duplicates
+    return (path, bound) if found else (None, next_bound)
+
+# A sentinel to detect that an action iterator is exhausted (None could be a valid action)
+_NO_ACTION = object()
+
+# Frontier-Capped A* is an A* search whose frontier can not exceed "max_frontier_size" states.
+# Whenever the frontier grows beyond this size, the states with the highest total cost are pruned
+# until the frontier is back to "prune_ratio" of the maximum size.
+# This bounds the memory used by the frontier at the price of losing optimality (and completeness)
+# if a pruned state was needed to reach the best solution.
+# Only the frontier is capped: the node store and the explored set still grow with the number of expanded states,
+# so this is not a fully memory-bounded search (like SMA*) which would also forget explored states and parts of the search tree.
+# In the statistics, the pruned states are counted as duplicate pushes.
+def FrontierCappedAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, stats: Optional[SearchStats] = None,
+                              max_frontier_size: int = 10000, prune_ratio: float = 0.5) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, largest_frontier, duplicates = 0, 1, 0, 0
 
-    # Loop till frontier doesn't have any tuple
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, largest_frontier, duplicates)
+
+    # Creating a node store [nodes] which holds the parent and the action of every generated node
+    nodes = NodeStore()
+
+    # Creating a set for explored states
+    # The initial state is explored before its successors are pushed, so it is not pushed again if it is its own successor
+    explored = {initial_state}
+
+    # Creating a priority queue [frontier] ordered by the total cost (goal cost + heuristic) of each state
+    frontier = PriorityFrontier()
+    # The heuristics of all the successors are evaluated in a single call (check Problem.get_heuristics)
+    successors = [(action, *problem.get_transition(initial_state, action)) for action in problem.get_actions(initial_state)]
+    generated += len(successors)
+    successors = [(action, successor, g_cost) for action, successor, g_cost in successors if successor not in explored]
+    duplicates += generated - len(successors)
+    heuristics = problem.get_heuristics(heuristic, [successor for _, successor, _ in successors])
+    for (action, successor, g_cost), h_cost in zip(successors, heuristics):
+        if frontier.push(successor, g_cost + h_cost, (len(nodes), g_cost)):
+            nodes.add(NodeStore.ROOT, action)
+        else:
+            duplicates += 1
+    if stats is not None: stats.mark("setup")
+
+    # The size of the frontier after it is pruned
+    prune_size = max(1, int(max_frontier_size * prune_ratio))
+
+    # The node of the goal (if it is found)
+    goal_node = None
+
+    # Loop till frontier doesn't have any state
     while frontier:
-        # For GBFS algorithm, we use the sorted frontier list
-        # Sort frontier on each tuple's cost, Least cost is at index 0
-        # Therefore, pop from index 0 after sorting to get the least cost
-        frontier.sort(key=lambda frontier: frontier[2])
-        #will return the element in that list whose third element (frontier[2]) is larger than all of the other second elements
-        state, path, h_cost = frontier.pop(0)
+        largest_frontier = max(largest_frontier, len(frontier))
+        # Prune the states with the highest total cost if the frontier is too large
+        if len(frontier) > max_frontier_size:
+            duplicates += frontier.prune(prune_size)
 
-        # Checking if this state was explored before
-        # If yes, then skip this iteration
-        if state in explored: continue
+        state, _, (node, g_cost) = frontier.pop()
 
         # Checking if this state is goal or not
-        # If yes, return the sequence of actions that made me reach this state.
+        expanded += 1
         if problem.is_goal(state):
-            return path
+            goal_node = node
+            break
 
         # Adding this new state to explored states
-        explored.append(state)
+        explored.add(state)
 
         # Looping on all actions that can be took from this state
-        actions = problem.get_actions(state)
-        for action in actions:
-            # Getting the successor state, the path to it, and the (total, goal)cost then append it to frontier 
-            new_path = path.copy()
-            new_path.append(action)
-            frontier.append((problem.get_successor(state, action), new_path, heuristic(problem, problem.get_successor(state, action))))
+        successors = []
+        for action in problem.get_actions(state):
+            successor, action_cost = problem.get_transition(state, action)
+            generated += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            successors.append((action, successor, action_cost))
+        heuristics = problem.get_heuristics(heuristic, [successor for _, successor, _ in successors])
+        for (action, successor, action_cost), h_cost in zip(successors, heuristics):
+            next_state_g_cost = g_cost + action_cost
+            if frontier.push(successor, next_state_g_cost + h_cost, (len(nodes), next_state_g_cost)):
+                nodes.add(node, action)
+            else:
+                duplicates += 1
+    if stats is not None: stats.mark("search")
 
     # Return None if there is no solution. Couldn't reach the goal.
-    return None
\ No newline at end of file
+    solution = None if goal_node is None else nodes.path(goal_node)
+    return _record(stats, solution, generated, expanded, largest_frontier, duplicates)
+
+# Bidirectional search runs two searches at the same time: a forward search from the initial state
+# and a backward search from the goal state, and it stops when they meet in the middle.
+# It requires a problem with a single goal state which implements:
+#   - get_goal_state(): returns the goal state
+#   - get_predecessors(state): returns the pairs (predecessor, action) where applying the action on the predecessor leads to the state
+# (e.g. GraphRoutingProblem)
+# In the statistics, the counters include both searches and the frontier size is the sum of both frontiers.
+
+# This is a helper function to join the forward path (from the initial state to the meeting state)
+# and the backward path (from the meeting state to the goal state) into a single solution
+# The backward node store contains the forward actions from each state to its parent (towards the goal)
+def _join_paths(forward_nodes: NodeStore, forward_node: int, backward_nodes: NodeStore, backward_node: int) -> Solution:
+    backward_path = backward_nodes.path(backward_node)
+    backward_path.reverse()
+    return forward_nodes.path(forward_node) + backward_path
+
+# Bidirectional BFS returns the solution with the least number of actions
+# It expands a whole level at a time from the side with the smaller frontier
+def BidirectionalBreadthFirstSearch(problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
+
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+    goal_state = problem.get_goal_state()
+
+    # For each side, we store the search tree, the reached states (mapped to their node index and depth) and the current level
+    forward_nodes, backward_nodes = NodeStore(), NodeStore()
+    forward_reached = {initial_state: (NodeStore.ROOT, 0)}
+    backward_reached = {goal_state: (NodeStore.ROOT, 0)}
+    forward_level, backward_level = [initial_state], [goal_state]
+    if stats is not None: stats.mark("setup")
+
+    # The best meeting found: (total depth, forward node, backward node)
+    meeting = None
+
+    while forward_level and backward_level and meeting is None:
+        max_frontier_size = max(max_frontier_size, len(forward_level) + len(backward_level))
+        next_level = []
+        if len(forward_level) <= len(backward_level):
+            # Expand the forward level
+            expanded += len(forward_level)
+            for state in forward_level:
+                node, depth = forward_reached[state]
+                for action in problem.get_actions(state):
+                    successor, _ = problem.get_transition(state, action)
+                    generated += 1
+                    if successor in forward_reached:
+                        duplicates += 1
+                        continue
+                    successor_node = forward_nodes.add(node, action)
+                    forward_reached[successor] = (successor_node, depth + 1)
+                    next_level.append(successor)
+                    if successor in backward_reached:
+                        backward_node, backward_depth = backward_reached[successor]
+                        if meeting is None or depth + 1 + backward_depth < meeting[0]:
+                            meeting = (depth + 1 + backward_depth, successor_node, backward_node)
+            forward_level = next_level
+        else:
+            # Expand the backward level
+            expanded += len(backward_level)
+            for state in backward_level:
+                node, depth = backward_reached[state]
+                for predecessor, action in problem.get_predecessors(state):
+                    generated += 1
+                    if predecessor in backward_reached:
+                        duplicates += 1
+                        continue
+                    predecessor_node = backward_nodes.add(node, action)
+                    backward_reached[predecessor] = (predecessor_node, depth + 1)
+                    next_level.append(predecessor)
+                    if predecessor in forward_reached:
+                        forward_node, forward_depth = forward_reached[predecessor]
+                        if meeting is None or depth + 1 + forward_depth < meeting[0]:
+                            meeting = (depth + 1 + forward_depth, forward_node, predecessor_node)
+            backward_level = next_level
+        # Since the whole level was expanded, the best meeting in this level is a shortest solution
+    if stats is not None: stats.mark("search")
+
+    # Return None if there is no solution. The two searches couldn't meet.
+    solution = None
+    if meeting is not None:
+        _, forward_node, backward_node = meeting
+        solution = _join_paths(forward_nodes, forward_node, backward_nodes, backward_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
+
+# Bidirectional UCS returns the solution with the least cost
+# Each iteration expands the least cost state from the side with the smaller frontier
+# It stops once the sum of the least costs in both frontiers can not improve the best meeting found so far
+def BidirectionalUniformCostSearch(problem: Problem[S, A], initial_state: S, stats: Optional[SearchStats] = None) -> Solution:
+    if stats is not None: stats.start()
+    # Counters for the search statistics
+    generated, expanded, max_frontier_size, duplicates = 0, 1, 0, 0
+
+    # Checking that initial_state is goal or not
+    if problem.is_goal(initial_state):
+        return _record(stats, [], generated, expanded, max_frontier_size, duplicates)
+    goal_state = problem.get_goal_state()
+
+    # For each side, we store the search tree, the frontier, the explored states
+    # and the best known cost and node index of every reached state
+    forward_nodes, backward_nodes = NodeStore(), NodeStore()
+    forward_frontier, backward_frontier = PriorityFrontier(), PriorityFrontier()
+    forward_frontier.push(initial_state, 0, NodeStore.ROOT)
+    backward_frontier.push(goal_state, 0, NodeStore.ROOT)
+    forward_explored, backward_explored = set(), set()
+    forward_reached = {initial_state: (0, NodeStore.ROOT)}
+    backward_reached = {goal_state: (0, NodeStore.ROOT)}
+    if stats is not None: stats.mark("setup")
+
+    # The best meeting found so far: (total cost, forward node, backward node)
+    meeting = (math.inf, None, None)
+
+    while forward_frontier and backward_frontier:
+        max_frontier_size = max(max_frontier_size, len(forward_frontier) + len(backward_frontier))
+        # No path through the remaining frontier states can be cheaper than the best meeting
+        if forward_frontier.peek() + backward_frontier.peek() >= meeting[0]:
+            break
+        expanded += 1
+        if len(forward_frontier) <= len(backward_frontier):
+            # Expand the least cost state of the forward search
+            state, cost, node = forward_frontier.pop()
+            forward_explored.add(state)
+            for action in problem.get_actions(state):
+                successor, action_cost = problem.get_transition(state, action)
+                generated += 1
+                if successor in forward_explored:
+                    duplicates += 1
+                    continue
+                new_cost = cost + action_cost
+                if forward_frontier.push(successor, new_cost, len(forward_nodes)):
+                    forward_reached[successor] = (new_cost, forward_nodes.add(node, action))
+                    # Check if this successor was reached by the backward search
+                    if successor in backward_reached:
+                        backward_cost, backward_node = backward_reached[successor]
+                        if new_cost + backward_cost < meeting[0]:
+                            meeting = (new_cost + backward_cost, forward_reached[successor][1], backward_node)
+                else:
+                    duplicates += 1
+        else:
+            # Expand the least cost state of the backward search
+            state, cost, node = backward_frontier.pop()
+            backward_explored.add(state)
+            for predecessor, action in problem.get_predecessors(state):
+                generated += 1
+                if predecessor in backward_explored:
+                    duplicates += 1
+                    continue
+                new_cost = cost + problem.get_cost(predecessor, action)
+                if backward_frontier.push(predecessor, new_cost, len(backward_nodes)):
+                    backward_reached[predecessor] = (new_cost, backward_nodes.add(node, action))
+                    # Check if this predecessor was reached by the forward search
+                    if predecessor in forward_reached:
+                        forward_cost, forward_node = forward_reached[predecessor]
+                        if new_cost + forward_cost < meeting[0]:
+                            meeting = (new_cost + forward_cost, forward_node, backward_reached[predecessor][1])
+                else:
+                    duplicates += 1
+    if stats is not None: stats.mark("search")
+
+    # Return None if there is no solution. The two searches couldn't meet.
+    solution = None
+    if meeting[1] is not None:
+        _, forward_node, backward_node = meeting
+        solution = _join_paths(forward_nodes, forward_node, backward_nodes, backward_node)
+    return _record(stats, solution, generated, expanded, max_frontier_size, duplicates)
@@ -0,0 +1,77 @@
+from dataclasses import dataclass, field
+from typing import Dict
+import time, tracemalloc
+
+# SearchStats collects statistics about search runs
+# Every search function in "search.py" accepts an optional "stats" argument and fills it if it is given.
+# The statistics accumulate over all the searches that receive the same object (e.g. all the searches done by an agent)
+# so call "reset" to clear them.
+#   nodes_generated:    the number of successors generated (transitions computed)
+#   nodes_expanded:     the number of states that were goal tested and expanded (the explored nodes)
+#   max_frontier_size:  the maximum number of states in the frontier at once
+#   duplicate_pushes:   the number of generated successors that were discarded since they were already reached
+#                       (or had a better entry in the frontier)
+#   peak_memory:        the peak memory (in bytes) allocated during a search (only if track_memory is True)
+#   wall_time:          the total time (in seconds) spent in searches
+#   phase_times:        the total time (in seconds) spent in each phase of the searches:
+#                       "setup" (creating the initial frontier), "search" (the main loop)
+#                       and "reconstruction" (building the solution from the search tree)
+@dataclass
+class SearchStats:
+    track_memory: bool = False
+    searches: int = 0
+    nodes_generated: int = 0
+    nodes_expanded: int = 0
+    max_frontier_size: int = 0
+    duplicate_pushes: int = 0
+    peak_memory: int = 0
+    wall_time: float = 0.0
+    phase_times: Dict[str, float] = field(default_factory=dict)
+
+    def reset(self) -> None:
+        self.searches = 0
+        self.nodes_generated = 0
+        self.nodes_expanded = 0
+        self.max_frontier_size = 0
+        self.duplicate_pushes = 0
+        self.peak_memory = 0
+        self.wall_time = 0.0
+        self.phase_times = {}
+
+    # Called by the search function when it starts
+    def start(self) -> None:
+        self._started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._start = self._last_mark = time.perf_counter()
+
+    # Called by the search function at the end of each phase to add its elapsed time
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    # Called by the search function when it ends with its counters
+    def stop(self, generated: int, expanded: int, max_frontier_size: int, duplicates: int) -> None:
+        self.wall_time += time.perf_counter() - self._start
+        self.searches += 1
+        self.nodes_generated += generated
+        self.nodes_expanded += expanded
+        self.max_frontier_size = max(self.max_frontier_size, max_frontier_size)
+        self.duplicate_pushes += duplicates
+        if self.track_memory:
+            self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    def __str__(self) -> str:
+        phases = ', '.join(f'{phase}: {elapsed:.6f}s' for phase, elapsed in self.phase_times.items())
+        text = (f"Searches: {self.searches}, Generated: {self.nodes_generated}, Expanded: {self.nodes_expanded}, "
+                f"Max Frontier: {self.max_frontier_size}, Duplicate Pushes: {self.duplicate_pushes}, "
+                f"Wall Time: {self.wall_time:.6f}s ({phases})")
+        if self.track_memory:
+            text += f", Peak Memory: {self.peak_memory} bytes"
+        return text
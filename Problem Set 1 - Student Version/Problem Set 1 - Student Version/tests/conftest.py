@@ -0,0 +1,10 @@
+import os, sys
+
+# The tests import the modules of the problem set directly (like the autograder and the play scripts do),
+# so the problem set folder is added to the import path. Run them from the problem set folder with:
+#   python -m pytest tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+# The levels are read with paths relative to the problem set folder (e.g. "dungeons/dungeon1.txt")
+os.chdir(ROOT)
@@ -0,0 +1,56 @@
+import glob
+from collections import deque
+import pytest
+from dungeon import CompactDungeonProblem, CompactDungeonState, DungeonProblem
+from dungeon_heuristic import strong_heuristic, weak_heuristic
+from search import AStarSearch, BreadthFirstSearch, UniformCostSearch
+
+LEVELS = sorted(glob.glob("dungeons/*.txt"))
+SMALL_LEVELS = [f"dungeons/dungeon{index}.txt" for index in range(1, 4)]
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_compact_states_follow_the_same_transitions(level):
+    # The compact problem is built from the dungeon problem so that the converted states share its layout
+    problem = DungeonProblem.from_file(level)
+    compact = CompactDungeonProblem.from_problem(problem)
+    initial_state = problem.get_initial_state()
+    assert CompactDungeonState.from_state(compact.layout, initial_state) == compact.get_initial_state()
+    seen, queue = {initial_state}, deque([(initial_state, compact.get_initial_state())])
+    while queue and len(seen) < 3000:
+        state, compact_state = queue.popleft()
+        assert compact_state.to_state() == state
+        assert compact_state.player == state.player and compact_state.remaining_coins == state.remaining_coins
+        assert compact.is_goal(compact_state) == problem.is_goal(state)
+        assert strong_heuristic(compact, compact_state) == strong_heuristic(problem, state)
+        assert weak_heuristic(compact, compact_state) == weak_heuristic(problem, state)
+        assert list(compact.get_actions(compact_state)) == list(problem.get_actions(state))
+        for action in problem.get_actions(state):
+            successor, compact_successor = problem.get_successor(state, action), compact.get_successor(compact_state, action)
+            assert compact.get_cost(compact_state, action) == problem.get_cost(state, action)
+            if successor not in seen:
+                seen.add(successor)
+                queue.append((successor, compact_successor))
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_compact_problem_returns_the_same_solutions(level):
+    problem, compact = DungeonProblem.from_file(level), CompactDungeonProblem.from_file(level)
+    # The larger levels are intractable for the uninformed searches, so they are only solved by A*
+    if level in SMALL_LEVELS:
+        for search_fn in (BreadthFirstSearch, UniformCostSearch):
+            assert search_fn(compact, compact.get_initial_state()) == search_fn(problem, problem.get_initial_state())
+    assert AStarSearch(compact, compact.get_initial_state(), strong_heuristic) == \
+           AStarSearch(problem, problem.get_initial_state(), strong_heuristic)
+
+def test_compact_states_are_hashable_values():
+    compact = CompactDungeonProblem.from_file(LEVELS[0])
+    state = compact.get_initial_state()
+    copy = CompactDungeonState(state.layout, state.cell, state.coins)
+    assert copy == state and hash(copy) == hash(state) and len({copy, state}) == 1
+
+def test_states_with_the_same_coins_share_their_coin_set():
+    compact = CompactDungeonProblem.from_file(LEVELS[0])
+    state = compact.get_initial_state()
+    successors = [compact.get_successor(state, action) for action in compact.get_actions(state)]
+    for successor in successors:
+        if successor.coins == state.coins:
+            assert successor.remaining_coins is state.remaining_coins
@@ -0,0 +1,105 @@
+import pytest
+from frontier import NodeStore, PriorityFrontier
+from problem import Problem
+from search import AStarSearch, BestFirstSearch, FrontierCappedAStarSearch, UniformCostSearch
+from search_stats import SearchStats
+
+def pop_all(frontier: PriorityFrontier):
+    popped = []
+    while frontier:
+        popped.append(frontier.pop())
+    return popped
+
+def test_pop_returns_the_least_priority_first():
+    frontier = PriorityFrontier()
+    for state, priority in [("c", 3), ("a", 1), ("d", 4), ("b", 2)]:
+        assert frontier.push(state, priority)
+    assert [state for state, _, _ in pop_all(frontier)] == ["a", "b", "c", "d"]
+
+def test_equal_priorities_are_popped_in_insertion_order():
+    frontier = PriorityFrontier()
+    for state in ["x", "y", "z"]:
+        frontier.push(state, 1)
+    frontier.push("w", 0)
+    assert [state for state, _, _ in pop_all(frontier)] == ["w", "x", "y", "z"]
+
+def test_push_keeps_the_best_priority_of_a_state():
+    frontier = PriorityFrontier()
+    assert frontier.push("a", 5, "first")
+    # A worse or equal priority is rejected
+    assert not frontier.push("a", 5, "equal")
+    assert not frontier.push("a", 7, "worse")
+    # A better priority replaces the old entry (decrease-key) and the old entry is never popped
+    assert frontier.push("a", 2, "better")
+    frontier.push("b", 3)
+    assert len(frontier) == 2
+    assert frontier.priority("a") == 2 and frontier.peek() == 2
+    assert pop_all(frontier) == [("a", 2, "better"), ("b", 3, None)]
+
+def test_a_popped_state_can_be_pushed_again():
+    frontier = PriorityFrontier()
+    frontier.push("a", 1)
+    frontier.pop()
+    assert "a" not in frontier
+    assert frontier.push("a", 4)
+    assert frontier.pop() == ("a", 4, None)
+
+def test_pop_from_an_empty_frontier_raises():
+    frontier = PriorityFrontier()
+    assert frontier.peek() is None
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+def test_prune_keeps_the_least_priorities_in_order():
+    frontier = PriorityFrontier()
+    for state, priority in [("a", 3), ("b", 1), ("c", 3), ("d", 2), ("e", 5), ("f", 3)]:
+        frontier.push(state, priority)
+    frontier.push("e", 0) # decrease-key leaves an outdated entry that prune must drop
+    assert frontier.prune(4) == 2
+    assert len(frontier) == 4
+    # The ties at priority 3 keep their insertion order, so "c" and "f" (pushed after "a") are removed
+    assert [state for state, _, _ in pop_all(frontier)] == ["e", "b", "d", "a"]
+
+def test_node_store_path_follows_the_parents_back_to_the_root():
+    nodes = NodeStore()
+    a = nodes.add(NodeStore.ROOT, "right")
+    b = nodes.add(a, "up")
+    c = nodes.add(NodeStore.ROOT, "left")
+    d = nodes.add(b, "up")
+    assert len(nodes) == 4
+    assert nodes.path(d) == ["right", "up", "up"]
+    assert nodes.path(c) == ["left"]
+    assert nodes.path(NodeStore.ROOT) == []
+
+# A chain 0 -> 1 -> 2 (the goal) where the initial state also has an action that loops back to itself
+class SelfLoopProblem(Problem[int, str]):
+    def __init__(self) -> None:
+        self.goal_tests = []
+
+    def get_initial_state(self) -> int:
+        return 0
+
+    def is_goal(self, state: int) -> bool:
+        self.goal_tests.append(state)
+        return state == 2
+
+    def get_actions(self, state: int):
+        return ["stay", "next"] if state == 0 else ["next"]
+
+    def get_successor(self, state: int, action: str) -> int:
+        return state if action == "stay" else state + 1
+
+    def get_cost(self, state: int, action: str) -> float:
+        return 1
+
+@pytest.mark.parametrize("search", [
+    lambda problem, stats: UniformCostSearch(problem, 0, stats),
+    lambda problem, stats: AStarSearch(problem, 0, lambda problem, state: 0, stats),
+    lambda problem, stats: BestFirstSearch(problem, 0, lambda problem, state: 0, stats),
+    lambda problem, stats: FrontierCappedAStarSearch(problem, 0, lambda problem, state: 0, stats),
+], ids=["ucs", "astar", "gbfs", "fcastar"])
+def test_a_self_loop_does_not_expand_the_initial_state_twice(search):
+    problem, stats = SelfLoopProblem(), SearchStats()
+    assert search(problem, stats) == ["next", "next"]
+    assert problem.goal_tests == [0, 1, 2]
+    assert stats.nodes_expanded == 3 and stats.duplicate_pushes == 1
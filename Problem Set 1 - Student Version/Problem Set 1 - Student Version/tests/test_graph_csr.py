@@ -0,0 +1,60 @@
+import glob, json
+import pytest
+# The CSR format needs numpy, which is an optional dependency of the problem set
+pytest.importorskip("numpy")
+from graph import CSRGraphRoutingProblem, GraphRoutingProblem
+from helpers.utils import fetch_recorded_args
+from search import BidirectionalBreadthFirstSearch, BidirectionalUniformCostSearch, UniformCostSearch
+
+# Runs the search and returns its solution and its traversal order (the names of the nodes passed to is_goal)
+def run(search_fn, problem):
+    fetch_recorded_args(GraphRoutingProblem.is_goal)
+    solution = search_fn(problem, problem.get_initial_state())
+    traversal = [args[1].name for args, _ in fetch_recorded_args(GraphRoutingProblem.is_goal)]
+    return [node.name for node in solution] if solution is not None else None, traversal
+
+@pytest.mark.parametrize("path", sorted(glob.glob("graphs/*.json")))
+def test_csr_graph_matches_the_json_graph(path, tmp_path):
+    CSRGraphRoutingProblem.convert(path, str(tmp_path))
+    problem = GraphRoutingProblem.from_file(path)
+    csr = GraphRoutingProblem.from_file(str(tmp_path))
+    assert isinstance(csr, CSRGraphRoutingProblem)
+    assert csr.start == problem.start and csr.goal == problem.goal
+    for node, neighbors in problem.adjacency.items():
+        assert csr.adjacency[node] == list(neighbors)
+        assert csr.get_predecessors(node) == problem.get_predecessors(node)
+    for search_fn in (UniformCostSearch, BidirectionalBreadthFirstSearch, BidirectionalUniformCostSearch):
+        assert run(search_fn, csr) == run(search_fn, problem)
+
+def test_csr_graph_creates_nodes_lazily(tmp_path):
+    CSRGraphRoutingProblem.convert("graphs/graph1.json", str(tmp_path))
+    problem = CSRGraphRoutingProblem.from_directory(str(tmp_path))
+    # Only the start and goal nodes exist after loading
+    assert len(problem.adjacency._nodes) == 2
+    neighbors = problem.get_actions(problem.start)
+    assert len(problem.adjacency._nodes) == len({problem.start, problem.goal, *neighbors})
+
+def test_csr_round_trips_unusual_names(tmp_path):
+    problem_def = {
+        "graph": {
+            "a\nb": {"position": [1, 2], "adjacent": ["é", ""]},
+            "é": {"position": [3, 4], "adjacent": ["a\nb"]},
+            "": {"position": [5, 6], "adjacent": []},
+        },
+        "start": "a\nb",
+        "goal": "",
+    }
+    CSRGraphRoutingProblem.save(problem_def, str(tmp_path))
+    problem = CSRGraphRoutingProblem.from_directory(str(tmp_path))
+    assert problem.start.name == "a\nb" and problem.goal.name == ""
+    assert [node.name for node in problem.adjacency[problem.start]] == ["", "é"]
+    assert [node.name for node, _ in problem.get_predecessors(problem.goal)] == ["a\nb"]
+    assert sorted(node.name for node in problem.adjacency) == ["", "a\nb", "é"]
+
+def test_csr_empty_graph_round_trips(tmp_path):
+    CSRGraphRoutingProblem.save({"graph": {}}, str(tmp_path))
+    with open(tmp_path / "meta.json") as f:
+        assert json.load(f)["start_index"] == -1
+    # Like the JSON loader, a missing start node is an error
+    with pytest.raises(KeyError):
+        CSRGraphRoutingProblem.from_directory(str(tmp_path))
@@ -0,0 +1,52 @@
+import glob
+from collections import deque
+from dungeon import DungeonProblem
+from jump_point_search import jump_point_path, walk_distance, walk_path, walkable_cells
+from mathutils import Direction, Point
+
+# Returns the length of the shortest walk between two positions found by a breadth first search
+def bfs_distance(problem: DungeonProblem, start: Point, goal: Point):
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        position = queue.popleft()
+        if position == goal: return distances[position]
+        for direction in Direction:
+            neighbor = position + direction.to_vector()
+            if neighbor in problem.layout.walkable and neighbor not in distances:
+                distances[neighbor] = distances[position] + 1
+                queue.append(neighbor)
+    return None
+
+# Returns the position reached by following the path from the start (or None if it walks into a wall)
+def follow(problem: DungeonProblem, start: Point, path):
+    position = start
+    for direction in path:
+        position = position + direction.to_vector()
+        if position not in problem.layout.walkable: return None
+    return position
+
+def test_jump_point_paths_are_shortest_walks():
+    for level in sorted(glob.glob("dungeons/*.txt")):
+        problem = DungeonProblem.from_file(level)
+        start = problem.get_initial_state().player
+        for goal in [problem.layout.exit, *problem.get_initial_state().remaining_coins]:
+            path = walk_path(problem, start, goal)
+            assert follow(problem, start, path) == goal, level
+            assert len(path) == bfs_distance(problem, start, goal), level
+            assert walk_distance(problem, start, goal) == walk_distance(problem, goal, start) == len(path)
+
+def test_jump_point_search_expands_fewer_nodes_on_open_maps():
+    walkable = frozenset((x, y) for x in range(20) for y in range(20))
+    expanded = []
+    path = jump_point_path(walkable, (0, 0), (19, 19), expanded)
+    assert len(path) == 38
+    # A* with the manhattan distance would expand every position on the shortest paths
+    assert expanded[0] < 38
+
+def test_unreachable_and_trivial_walks():
+    walkable = frozenset([(0, 0), (1, 0), (3, 0)])
+    assert jump_point_path(walkable, (0, 0), (3, 0)) is None
+    assert jump_point_path(walkable, (1, 0), (1, 0)) == []
+    problem = DungeonProblem.from_file("dungeons/dungeon1.txt")
+    assert walkable_cells(problem) == frozenset((point.x, point.y) for point in problem.layout.walkable)
@@ -0,0 +1,49 @@
+import glob
+from collections import deque
+from parking import ParkingProblem, parking_heuristic
+from search import UniformCostSearch
+
+# Returns the total cost of the solution
+def solution_cost(problem, solution) -> float:
+    state, cost = problem.get_initial_state(), 0
+    for action in solution:
+        cost += problem.get_cost(state, action)
+        state = problem.get_successor(state, action)
+    assert problem.is_goal(state)
+    return cost
+
+# Returns up to "limit" states reachable from the initial state (in breadth first order)
+def reachable_states(problem, limit: int = 2000):
+    initial_state = problem.get_initial_state()
+    seen, queue = {initial_state}, deque([initial_state])
+    while queue and len(seen) < limit:
+        state = queue.popleft()
+        for action in problem.get_actions(state):
+            successor = problem.get_successor(state, action)
+            if successor not in seen:
+                seen.add(successor)
+                queue.append(successor)
+    return seen
+
+def test_pattern_database_is_admissible():
+    for level in sorted(glob.glob("parks/*.txt")):
+        problem = ParkingProblem.from_file(level)
+        solution = UniformCostSearch(problem, problem.get_initial_state())
+        if solution is None: continue
+        assert parking_heuristic(problem, problem.get_initial_state()) <= solution_cost(problem, solution), level
+
+def test_pattern_database_is_consistent_and_zero_at_the_goal():
+    for level in sorted(glob.glob("parks/*.txt")):
+        problem = ParkingProblem.from_file(level)
+        for state in reachable_states(problem):
+            value = parking_heuristic(problem, state)
+            if problem.is_goal(state):
+                assert value == 0, level
+            for action in problem.get_actions(state):
+                successor = problem.get_successor(state, action)
+                assert value <= problem.get_cost(state, action) + parking_heuristic(problem, successor), level
+
+def test_pattern_database_sums_the_cost_of_each_car_alone():
+    problem = ParkingProblem.from_text("#####\n#A.0#\n#####")
+    # The car walks 2 cells to its slot
+    assert parking_heuristic(problem, problem.get_initial_state()) == 2
@@ -0,0 +1,32 @@
+import os
+from agents import PolicyCache
+from dungeon import DungeonProblem
+from search import BreadthFirstSearch
+
+LEVEL = "dungeons/dungeon1.txt"
+
+def test_policy_cache_keeps_the_most_recent_entries(tmp_path):
+    problem = DungeonProblem.from_file(LEVEL)
+    state = problem.get_initial_state()
+    solution = BreadthFirstSearch(problem, state)
+    cache = PolicyCache(str(tmp_path), max_entries=3)
+    keys = [PolicyCache.key(str(index), "bfs", state) for index in range(5)]
+    for key in keys:
+        cache.put(key, problem, state, solution)
+    assert len(cache.entries) == 3 and len(os.listdir(tmp_path)) == 3
+    assert cache.get(keys[-1], problem, state) == (True, solution)
+    assert cache.get(keys[0], problem, state) == (False, None)
+    # A new cache on the same directory finds the entries written by the previous one
+    assert PolicyCache(str(tmp_path), max_entries=3).entries == cache.entries
+
+def test_policy_cache_only_scans_the_directory_when_it_is_full(tmp_path, monkeypatch):
+    problem = DungeonProblem.from_file(LEVEL)
+    state = problem.get_initial_state()
+    cache = PolicyCache(str(tmp_path), max_entries=4)
+    scans = []
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(True))
+    for index in range(4):
+        cache.put(PolicyCache.key(str(index), "none", state), problem, state, None)
+    assert not scans
+    cache.put(PolicyCache.key("4", "none", state), problem, state, None)
+    assert len(scans) == 1
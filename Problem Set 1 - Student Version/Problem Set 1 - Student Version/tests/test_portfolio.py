@@ -0,0 +1,77 @@
+import os
+from dungeon import DungeonProblem
+from dungeon_heuristic import strong_heuristic
+from helpers.utils import fetch_tracked_call_count
+from portfolio import Portfolio, PortfolioEntry
+from search import AStarSearch, BestFirstSearch, BreadthFirstSearch, UniformCostSearch
+
+# Returns the total cost of the solution
+def solution_cost(problem, solution) -> float:
+    state, cost = problem.get_initial_state(), 0
+    for action in solution:
+        cost += problem.get_cost(state, action)
+        state = problem.get_successor(state, action)
+    assert problem.is_goal(state)
+    return cost
+
+# A search function that kills its worker process without reporting a result
+def crashing_search(problem, initial_state, stats=None):
+    os._exit(1)
+
+# A search function that never finds a solution
+def failing_search(problem, initial_state, stats=None):
+    return None
+
+def test_portfolio_returns_a_valid_solution_and_the_winner():
+    problem = DungeonProblem.from_file("dungeons/dungeon2.txt")
+    portfolio = Portfolio([
+        PortfolioEntry("bfs", BreadthFirstSearch),
+        PortfolioEntry("gbfs-strong", BestFirstSearch, strong_heuristic),
+    ])
+    solution = portfolio(problem, problem.get_initial_state())
+    assert solution is not None
+    solution_cost(problem, solution)
+    assert portfolio.winner in ("bfs", "gbfs-strong")
+
+def test_portfolio_waits_for_an_optimal_solution():
+    problem = DungeonProblem.from_file("dungeons/dungeon3.txt")
+    optimal_cost = solution_cost(problem, UniformCostSearch(problem, problem.get_initial_state()))
+    portfolio = Portfolio([
+        PortfolioEntry("gbfs-strong", BestFirstSearch, strong_heuristic),
+        PortfolioEntry("astar-strong", AStarSearch, strong_heuristic, optimal=True),
+    ], wait_for_optimal=True)
+    solution = portfolio(problem, problem.get_initial_state())
+    assert portfolio.winner == "astar-strong"
+    assert solution_cost(problem, solution) == optimal_cost
+
+def test_portfolio_reports_the_explored_nodes_of_the_winner():
+    problem = DungeonProblem.from_file("dungeons/dungeon2.txt")
+    fetch_tracked_call_count(DungeonProblem.is_goal) # Clear the calls of the previous tests
+    AStarSearch(problem, problem.get_initial_state(), strong_heuristic)
+    expected = fetch_tracked_call_count(DungeonProblem.is_goal)
+    portfolio = Portfolio([PortfolioEntry("astar-strong", AStarSearch, strong_heuristic, optimal=True)])
+    portfolio(problem, problem.get_initial_state())
+    assert fetch_tracked_call_count(DungeonProblem.is_goal) == expected
+
+def test_portfolio_survives_dead_and_failing_workers():
+    problem = DungeonProblem.from_file("dungeons/dungeon1.txt")
+    portfolio = Portfolio([
+        PortfolioEntry("crash", crashing_search, optimal=True),
+        PortfolioEntry("fail", failing_search, optimal=True),
+        PortfolioEntry("ucs", UniformCostSearch, optimal=True),
+    ], wait_for_optimal=True, timeout=60)
+    assert portfolio(problem, problem.get_initial_state()) is not None
+    assert portfolio.winner == "ucs"
+    # Without any working entry, the portfolio returns None instead of waiting forever
+    portfolio = Portfolio([PortfolioEntry("crash", crashing_search), PortfolioEntry("fail", failing_search)])
+    assert portfolio(problem, problem.get_initial_state()) is None
+
+def test_sequential_portfolio_returns_the_first_accepted_solution():
+    problem = DungeonProblem.from_file("dungeons/dungeon1.txt")
+    portfolio = Portfolio([
+        PortfolioEntry("fail", failing_search),
+        PortfolioEntry("bfs", BreadthFirstSearch),
+        PortfolioEntry("ucs", UniformCostSearch, optimal=True),
+    ], wait_for_optimal=True)
+    solution, _ = portfolio._run_sequential(problem, problem.get_initial_state())
+    assert portfolio.winner == "ucs" and solution is not None
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic
+from typing import Callable, Generic, Optional
 from game import HeuristicFunction, Game, S, A
+from transposition import TranspositionTable
 from helpers.mt19937 import RandomGenerator
 
 # This is an abstract class for all agents
@@ -23,18 +24,25 @@ class HumanAgent(Agent[S, A]):
         return self.user_input_fn(game, state)
 
 # The search agent requests the action from a search algorithm
+# If a transposition table is given, it is passed to the search function (which must support it, check "search.py")
+# and it is kept between the moves so the states searched during one move can be reused in the next ones
 class SearchAgent(Agent[S, A]):
     def __init__(self,
         search_fn: Callable[[Game[S, A], S, HeuristicFunction, int], A],
         heuristic: HeuristicFunction = (lambda *_: 0), 
-        search_depth: int = -1) -> None:
+        search_depth: int = -1,
+        transposition_table: Optional[TranspositionTable] = None) -> None:
         super().__init__()
         self.search_fn = search_fn
         self.heuristic = heuristic
         self.search_depth = search_depth
+        self.transposition_table = transposition_table
     
     def act(self, game: Game[S, A], state: S) -> A:
-        _, action = self.search_fn(game, state, self.heuristic, self.search_depth)
+        if self.transposition_table is None:
+            _, action = self.search_fn(game, state, self.heuristic, self.search_depth)
+        else:
+            _, action = self.search_fn(game, state, self.heuristic, self.search_depth, self.transposition_table)
         return action
 
 # The random agent selects actions randomly
@@ -1,13 +1,14 @@
-from dataclasses import dataclass
-from copy import deepcopy
-from typing import Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 from enum import Enum
 
-from mathutils import Direction, Point
-from game import Game
+from mathutils import Direction, Point, neighbor_table
+from game import Game, HeuristicFunction
 from helpers.utils import track_call_count
 from helpers.mt19937 import RandomGenerator
 from agents import Agent
+from transposition import ZobristHasher
 
 # This file contains the definition for the Dungeon Crawler game
 # In this problem, the agent can move Up, Down, Left, Right or stay idle
@@ -29,16 +30,17 @@ class DungeonTile(str, Enum):
 class DungeonLayout:
     width: int
     height: int
-    walkable: Set[Point]
+    walkable: FrozenSet[Point]
     exit: Point
 
     def __deepcopy__(self, memo):
         return self
 
 # The state of a player contains its position, whether it is alive or not and its inventory
-@dataclass
+# The player, its inventory and the monsters are frozen since they are shared between a state and its successors
+@dataclass(frozen=True)
 class Player:
-    @dataclass
+    @dataclass(frozen=True)
     class Inventory:
         daggers: int
         coins: int
@@ -49,32 +51,56 @@ class Player:
     inventory: Inventory
 
 # The state of a monster contains its position and whether it is alive or not
-@dataclass
+@dataclass(frozen=True)
 class Monster:
     position: Point
     alive: bool
 
+# return the turn that follows the given turn (it ignore all the dead monsters)
+def advance_turn(turn: int, monsters: Tuple[Monster, ...]) -> int:
+    while turn < len(monsters):
+        if monsters[turn].alive:
+            return turn+1
+        turn += 1
+    return 0
+
 # This will contain a reference to the dungeon layout and it will contain environment details that change across states such as:
 #   The player location and the locations of the monsters, remaining coins, daggers, key, etc. 
-@dataclass
+# The items and the monsters are stored in immutable containers (frozensets and a tuple)
+# since the successors share the parts of the state that an action does not change (check DungeonGame.get_successor)
+# The state itself is frozen so it cannot be changed after its zobrist key is cached (check DungeonGame.state_key)
+@dataclass(frozen=True)
 class DungeonState:
     time: int
     turn: int
-    layout: DungeonLayout
+    # The layout is shared by all the states of a game, so it is not hashed (it is still compared by ==)
+    layout: DungeonLayout = field(hash=False)
     player: Player
-    coins: Set[Point]
-    daggers: Set[Point]
-    keys: Set[Point]
-    monsters: List[Monster]
+    coins: FrozenSet[Point]
+    daggers: FrozenSet[Point]
+    keys: FrozenSet[Point]
+    monsters: Tuple[Monster, ...]
+    # The zobrist key of the state (check DungeonGame.state_key), None until it is computed
+    # It is not part of the value of the state, so it is the only field that is set after the state is created
+    key: Optional[int] = field(default=None, compare=False, repr=False)
+
+    # Creates a state without the per-field object.__setattr__ calls of the frozen constructor (used by DungeonGame.get_successor)
+    @classmethod
+    def _make(cls, time: int, turn: int, layout: DungeonLayout, player: Player, coins: FrozenSet[Point], daggers: FrozenSet[Point],
+              keys: FrozenSet[Point], monsters: Tuple[Monster, ...], key: Optional[int] = None) -> 'DungeonState':
+        state = object.__new__(cls)
+        fields = state.__dict__
+        fields["time"], fields["turn"], fields["layout"], fields["player"] = time, turn, layout, player
+        fields["coins"], fields["daggers"], fields["keys"], fields["monsters"], fields["key"] = coins, daggers, keys, monsters, key
+        return state
+
+    # Stores the zobrist key of the state (the only field that is set after the state is created)
+    def _cache_key(self, key: int) -> None:
+        object.__setattr__(self, "key", key)
 
     # return the next turn (it ignore all the dead monsters)
     def next_turn(self) -> int:
-        turn = self.turn
-        while turn < len(self.monsters):
-            if self.monsters[turn].alive:
-                return turn+1
-            turn += 1
-        return 0
+        return advance_turn(self.turn, self.monsters)
     
     # The score is 1 point for each coin, 10 points for each monster, -0.1 points for each passing second.
     def score(self) -> int:
@@ -102,6 +128,11 @@ class DungeonState:
         header = f"Inventory: {self.player.inventory.keys} Key(s), {self.player.inventory.daggers} Dagger(s), {self.player.inventory.coins} Coin(s)\n"
         return header + '\n'.join(''.join(position_to_str(Point(x, y)) for x in range(self.layout.width)) for y in range(self.layout.height))
 
+# The key under which the neighbor table is stored in the game cache
+NEIGHBOR_TABLE_KEY = "__neighbor_table__"
+# The key under which the zobrist hasher is stored in the game cache
+ZOBRIST_HASHER_KEY = "__zobrist_hasher__"
+
 # This is the implementation of the dungeon game
 class DungeonGame(Game[DungeonState, Direction]):
     # The problem will contain the dungeon layout and the inital state
@@ -136,72 +167,151 @@ class DungeonGame(Game[DungeonState, Direction]):
         return state.turn
 
     def get_actions(self, state: DungeonState) -> Iterable[Direction]:
+        # The neighbor of a position in the direction of a wall is None (check neighbor_table in "mathutils.py")
+        table = self.neighbor_table(state.layout)
         if state.turn == 0:
             # Find an return actions to be done by the player
-            position_position = state.player.position
-            positions = ((direction, position_position + direction.to_vector()) for direction in Direction)
+            positions = zip(Direction, table[state.player.position])
             # prevent the player from getting into a wall
-            return [direction for direction, position in positions if position in state.layout.walkable]
+            return [direction for direction, position in positions if position is not None]
         else:
             # Find an return actions to be done by a monster
             index = state.turn - 1
             if not state.monsters[index].alive: return []
             monster_locations = {monster.position for i, monster in enumerate(state.monsters) if i != index and monster.alive} 
-            monster_position = state.monsters[index].position
-            positions = ((direction, monster_position + direction.to_vector()) for direction in Direction)
+            positions = zip(Direction, table[state.monsters[index].position])
             # prevent the monster from getting into a wall or another monster
-            return [direction for direction, position in positions if position in state.layout.walkable and position not in monster_locations]
-
+            return [direction for direction, position in positions if position is not None and position not in monster_locations]
+
+    # Returns the neighbor table of the walkable positions in the given layout
+    # The table is built once and stored in the game cache so it persists between calls
+    def neighbor_table(self, layout: DungeonLayout) -> Dict[Point, Tuple[Optional[Point], ...]]:
+        cache = self.cache()
+        table = cache.get(NEIGHBOR_TABLE_KEY)
+        if table is None or table[0] is not layout:
+            table = cache[NEIGHBOR_TABLE_KEY] = (layout, neighbor_table(layout.walkable))
+        return table[1]
+
+    # The successor shares every part of the state that the action does not change with the given state
+    # (e.g. the layout, the sets of items that were not picked up and the monsters that did not move),
+    # and only the changed parts (e.g. the player and its inventory) are created again.
+    # This is much faster than copying the whole state for each successor in a game tree search.
+    # The shared parts are immutable (frozen dataclasses, frozensets and tuples), so a successor cannot modify its parent.
     def get_successor(self, state: DungeonState, action: Direction) -> DungeonState:
-        state = deepcopy(state)
         current_turn = state.turn
+        player, monsters = state.player, state.monsters
+        coins, daggers, keys = state.coins, state.daggers, state.keys
         if current_turn == 0:
             # This action is done by the player
-            new_position = state.player.position + action.to_vector()
-            state.player.position = new_position
-            if new_position in state.coins:
+            new_position = player.position + action.to_vector()
+            alive, inventory = player.alive, player.inventory
+            inventory_daggers, inventory_coins, inventory_keys = inventory.daggers, inventory.coins, inventory.keys
+            if new_position in coins:
                 # If we walk over a coin, we take it
-                state.coins.remove(new_position)
-                state.player.inventory.coins += 1
-            if new_position in state.daggers:
-                # If we walk over a dagger, we take it
-                state.daggers.remove(new_position)
-                state.player.inventory.daggers += 1
-            if new_position in state.keys:
+                coins = coins - {new_position}
+                inventory_coins += 1
+            if new_position in daggers:
                 # If we walk over a dagger, we take it
-                state.keys.remove(new_position)
-                state.player.inventory.keys += 1
+                daggers = daggers - {new_position}
+                inventory_daggers += 1
+            if new_position in keys:
+                # If we walk over a key, we take it
+                keys = keys - {new_position}
+                inventory_keys += 1
             # Find the monsters at the player position
-            monsters_at_player = [monster for monster in state.monsters if monster.position == new_position and monster.alive]
+            monsters_at_player = [index for index, monster in enumerate(monsters) if monster.position == new_position and monster.alive]
             if monsters_at_player:
-                if state.player.inventory.daggers < len(monsters_at_player):
+                if inventory_daggers < len(monsters_at_player):
                     # If we encounter a monster and we don't have a dagger, we die
-                    state.player.inventory.daggers = 0
-                    state.player.alive = False
+                    inventory_daggers = 0
+                    alive = False
                 else:
                     # If we encounter a monster and we have a dagger, we kill it
-                    state.player.inventory.daggers -= len(monsters_at_player)
-                    for monster in monsters_at_player:
-                        monster.alive = False
+                    inventory_daggers -= len(monsters_at_player)
+                    monsters = tuple(Monster(monster.position, False) if index in monsters_at_player else monster
+                                     for index, monster in enumerate(monsters))
+            if (inventory_daggers, inventory_coins, inventory_keys) != (inventory.daggers, inventory.coins, inventory.keys):
+                inventory = Player.Inventory(inventory_daggers, inventory_coins, inventory_keys)
+            player = Player(new_position, alive, inventory)
         else:
             # This action is done by a monster
-            monster = state.monsters[current_turn - 1]
+            index = current_turn - 1
+            monster = monsters[index]
             new_position = monster.position + action.to_vector()
-            monster.position = new_position
-            if new_position == state.player.position:
-                if state.player.inventory.daggers != 0:
+            alive = monster.alive
+            if new_position == player.position:
+                inventory = player.inventory
+                if inventory.daggers != 0:
                     # If we encounter a player and they have a dagger, we die
-                    monster.alive = False
-                    state.player.inventory.daggers -= 1
+                    alive = False
+                    player = Player(player.position, player.alive, Player.Inventory(inventory.daggers - 1, inventory.coins, inventory.keys))
                 else:
                     # If we encounter a player and they don't have a dagger, we eat them
-                    state.player.alive = False
+                    player = Player(player.position, False, inventory)
+            monsters = monsters[:index] + (Monster(new_position, alive),) + monsters[index + 1:]
         # Advance the turn
-        state.turn = state.next_turn()
-        if state.turn == 0:
-            # if the new turn is 0 (the player's turn), we advance the clock 
-            state.time += 1
-        return state
+        turn = advance_turn(current_turn, monsters)
+        # if the new turn is 0 (the player's turn), we advance the clock 
+        time = state.time + 1 if turn == 0 else state.time
+        successor = DungeonState._make(time, turn, state.layout, player, coins, daggers, keys, monsters)
+        if state.key is not None:
+            successor._cache_key(self.successor_key(state, successor))
+        return successor
+
+    # Returns the zobrist hasher of the game (it is created once and stored in the game cache)
+    def zobrist_hasher(self) -> ZobristHasher:
+        cache = self.cache()
+        hasher = cache.get(ZOBRIST_HASHER_KEY)
+        if hasher is None:
+            hasher = cache[ZOBRIST_HASHER_KEY] = ZobristHasher()
+        return hasher
+
+    # Returns the zobrist key of the state (check ZobristHasher in "transposition.py")
+    # The key includes the time since it changes the score (and hence the value) of the state
+    # It is computed from all the features once, then stored in the state and updated incrementally by get_successor
+    def state_key(self, state: DungeonState) -> int:
+        key = state.key
+        if key is not None: return key
+        hasher = self.zobrist_hasher()
+        player, inventory = state.player, state.player.inventory
+        key = hasher[("time", state.time)] ^ hasher[("turn", state.turn)] ^ hasher[("player", player.position, player.alive)]
+        key ^= hasher[("inventory", inventory.daggers, inventory.coins, inventory.keys)]
+        for coin in state.coins: key ^= hasher[("coin", coin)]
+        for dagger in state.daggers: key ^= hasher[("dagger", dagger)]
+        for dungeon_key in state.keys: key ^= hasher[("key", dungeon_key)]
+        for index, monster in enumerate(state.monsters):
+            key ^= hasher[("monster", index, monster.position, monster.alive)]
+        state._cache_key(key)
+        return key
+
+    # Returns the zobrist key of the successor given the key of the state it was generated from
+    # Since XOR is its own inverse, the key is updated by XORing out the features that changed and XORing in their new values.
+    # The successor shares the unchanged parts with the state (check get_successor), so the changed parts are found by identity.
+    def successor_key(self, state: DungeonState, successor: DungeonState) -> int:
+        hasher = self.zobrist_hasher()
+        key = state.key ^ hasher[("turn", state.turn)] ^ hasher[("turn", successor.turn)]
+        if successor.time != state.time:
+            key ^= hasher[("time", state.time)] ^ hasher[("time", successor.time)]
+        player, new_player = state.player, successor.player
+        if new_player is not player:
+            key ^= hasher[("player", player.position, player.alive)] ^ hasher[("player", new_player.position, new_player.alive)]
+            inventory, new_inventory = player.inventory, new_player.inventory
+            if new_inventory is not inventory:
+                key ^= hasher[("inventory", inventory.daggers, inventory.coins, inventory.keys)]
+                key ^= hasher[("inventory", new_inventory.daggers, new_inventory.coins, new_inventory.keys)]
+        # An item can only be removed (picked up by the player)
+        if successor.coins is not state.coins:
+            for coin in state.coins - successor.coins: key ^= hasher[("coin", coin)]
+        if successor.daggers is not state.daggers:
+            for dagger in state.daggers - successor.daggers: key ^= hasher[("dagger", dagger)]
+        if successor.keys is not state.keys:
+            for dungeon_key in state.keys - successor.keys: key ^= hasher[("key", dungeon_key)]
+        if successor.monsters is not state.monsters:
+            for index, (monster, new_monster) in enumerate(zip(state.monsters, successor.monsters)):
+                if new_monster is not monster:
+                    key ^= hasher[("monster", index, monster.position, monster.alive)]
+                    key ^= hasher[("monster", index, new_monster.position, new_monster.alive)]
+        return key
 
     # Read a dungeon problem from text containing a grid of tiles
     @staticmethod
@@ -229,9 +339,9 @@ class DungeonGame(Game[DungeonState, Direction]):
                     elif char == DungeonTile.EXIT:
                         exit = Point(x, y)
         problem = DungeonGame()
-        problem.layout = DungeonLayout(width, height, walkable, exit)
+        problem.layout = DungeonLayout(width, height, frozenset(walkable), exit)
         player = Player(player, True, Player.Inventory(0, 0, 0))
-        problem.initial_state = DungeonState(0, 0, problem.layout, player, coins, daggers, keys, monsters)
+        problem.initial_state = DungeonState(0, 0, problem.layout, player, frozenset(coins), frozenset(daggers), frozenset(keys), tuple(monsters))
         return problem
 
     # Read a dungeon problem from file containing a grid of tiles
@@ -240,6 +350,296 @@ class DungeonGame(Game[DungeonState, Direction]):
         with open(path, 'r') as f:
             return DungeonGame.from_text(f.read())
 
+##########################
+# Compact Dungeon Game   #
+##########################
+
+# The compact dungeon game is an alternative encoding of the same game where:
+#   - Each walkable position is identified by an integer (its cell index)
+#   - Each item (coin, dagger or key) is identified by a bit, and the remaining coins, daggers and keys are stored as bitmasks
+#   - The monsters are stored as a tuple of cell indices and a bitmask of the monsters that are still alive
+# So a compact state is a frozen (immutable) and hashable object that only contains integers and tuples of integers.
+# It can be used as a key in dictionaries (e.g. to memoize heuristic values or in transposition tables)
+# and it is much faster to create, hash and compare than the dungeon state.
+# The compact states still expose "player", "coins", "daggers", "keys", "monsters", "score" and "next_turn"
+# so the existing heuristic (dungeon_heuristic) and agents work on both encodings.
+
+# The compact layout extends the dungeon layout with lookup tables built once per level:
+#   cells:      the position of each cell index
+#   indices:    the cell index of each walkable position
+#   moves:      for each cell, a tuple (indexed by direction) containing the cell reached by moving in this direction
+#               or -1 if this direction leads into a wall (the direction NONE leads to the same cell)
+#   actions:    for each cell, the list of directions that do not lead into a wall
+#   items:      the position of each item bit index
+#   item_bits:  for each cell, the bit of the item at this cell (or 0 if the cell did not initially contain an item)
+#   exit_cell:  the cell index of the exit
+@dataclass(eq=False)
+class CompactDungeonLayout(DungeonLayout):
+    cells: Tuple[Point, ...]
+    indices: Dict[Point, int]
+    moves: Tuple[Tuple[int, ...], ...]
+    actions: Tuple[Tuple[Direction, ...], ...]
+    items: Tuple[Point, ...]
+    item_bits: Tuple[int, ...]
+    exit_cell: int
+
+    # The layout is compared and hashed by identity since there is only one layout per game
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # Build the compact layout of a dungeon layout where the item bits are assigned to the given items
+    @staticmethod
+    def from_layout(layout: DungeonLayout, items: Iterable[Point]) -> 'CompactDungeonLayout':
+        # Sort the cells in reading order (row by row) so that the encoding is deterministic
+        cells = tuple(sorted(layout.walkable, key=lambda point: (point.y, point.x)))
+        indices = {point: index for index, point in enumerate(cells)}
+        moves = tuple(tuple(indices.get(point + direction.to_vector(), -1) for direction in Direction) for point in cells)
+        actions = tuple(tuple(direction for direction in Direction if cell_moves[direction] != -1) for cell_moves in moves)
+        items = tuple(sorted(items, key=lambda point: (point.y, point.x)))
+        item_bits = [0] * len(cells)
+        for bit, item in enumerate(items):
+            item_bits[indices[item]] = 1 << bit
+        return CompactDungeonLayout(layout.width, layout.height, layout.walkable, layout.exit,
+                                    cells, indices, moves, actions, items, tuple(item_bits), indices[layout.exit])
+
+    # Returns the bitmask of the given items
+    def item_mask(self, items: Iterable[Point]) -> int:
+        mask = 0
+        for item in items:
+            mask |= self.item_bits[self.indices[item]]
+        return mask
+
+    # Returns the positions of the items in the given bitmask
+    def item_positions(self, mask: int) -> FrozenSet[Point]:
+        return frozenset(item for bit, item in enumerate(self.items) if mask >> bit & 1)
+
+# The compact dungeon state contains:
+#   time, turn:         the same as in the dungeon state
+#   cell:               the player cell index
+#   alive:              whether the player is alive or not
+#   inventory:          the number of (daggers, coins, keys) carried by the player
+#   coin_mask, dagger_mask, key_mask: the bitmasks of the remaining items
+#   monster_cells:      the cell index of each monster
+#   monsters_alive:     the bitmask of the monsters that are still alive (bit 'i' is for the monster 'i')
+# The layout is compared by identity (check CompactDungeonLayout) so hashing a state does not hash the layout
+@dataclass(frozen=True)
+class CompactDungeonState:
+    __slots__ = ("time", "turn", "layout", "cell", "alive", "inventory", "coin_mask", "dagger_mask", "key_mask",
+                 "monster_cells", "monsters_alive")
+    time: int
+    turn: int
+    layout: CompactDungeonLayout
+    cell: int
+    alive: bool
+    inventory: Tuple[int, int, int]
+    coin_mask: int
+    dagger_mask: int
+    key_mask: int
+    monster_cells: Tuple[int, ...]
+    monsters_alive: int
+
+    # The player (to be interchangeable with DungeonState)
+    @property
+    def player(self) -> Player:
+        return Player(self.layout.cells[self.cell], self.alive, Player.Inventory(*self.inventory))
+
+    # The positions of the remaining items (to be interchangeable with DungeonState)
+    @property
+    def coins(self) -> FrozenSet[Point]:
+        return self.layout.item_positions(self.coin_mask)
+
+    @property
+    def daggers(self) -> FrozenSet[Point]:
+        return self.layout.item_positions(self.dagger_mask)
+
+    @property
+    def keys(self) -> FrozenSet[Point]:
+        return self.layout.item_positions(self.key_mask)
+
+    # The monsters (to be interchangeable with DungeonState)
+    @property
+    def monsters(self) -> Tuple[Monster, ...]:
+        cells, alive = self.layout.cells, self.monsters_alive
+        return tuple(Monster(cells[cell], bool(alive >> index & 1)) for index, cell in enumerate(self.monster_cells))
+
+    # return the next turn (it ignore all the dead monsters)
+    def next_turn(self) -> int:
+        alive = self.monsters_alive >> self.turn
+        if alive == 0: return 0
+        # the next turn belongs to the first monster (starting from the index "turn") that is alive
+        return self.turn + (alive & -alive).bit_length()
+
+    # The score is 1 point for each coin, 10 points for each monster, -0.1 points for each passing second.
+    def score(self) -> int:
+        dead = len(self.monster_cells) - bin(self.monsters_alive).count("1")
+        return self.inventory[1] + 10 * dead - 0.1 * self.time
+
+    # Convert a compact state to a dungeon state
+    def to_state(self) -> DungeonState:
+        return DungeonState(self.time, self.turn, self.layout, self.player, self.coins, self.daggers, self.keys, self.monsters)
+
+    # Convert a dungeon state to a compact state
+    @staticmethod
+    def from_state(layout: CompactDungeonLayout, state: DungeonState) -> 'CompactDungeonState':
+        player, inventory = state.player, state.player.inventory
+        monsters_alive = 0
+        for index, monster in enumerate(state.monsters):
+            if monster.alive: monsters_alive |= 1 << index
+        return CompactDungeonState(
+            state.time, state.turn, layout, layout.indices[player.position], player.alive,
+            (inventory.daggers, inventory.coins, inventory.keys),
+            layout.item_mask(state.coins), layout.item_mask(state.daggers), layout.item_mask(state.keys),
+            tuple(layout.indices[monster.position] for monster in state.monsters), monsters_alive
+        )
+
+    def __str__(self) -> str:
+        return str(self.to_state())
+
+# This is the implementation of the dungeon game using the compact state encoding
+# It can be used anywhere the dungeon game is used since it plays the same game using the same actions
+class CompactDungeonGame(DungeonGame):
+    layout: CompactDungeonLayout
+    initial_state: CompactDungeonState
+
+    @track_call_count
+    def is_terminal(self, state: CompactDungeonState) -> Tuple[bool, Optional[List[float]]]:
+        monster_count = len(state.monster_cells)
+        # if we have a key and we are at the exit, we win
+        INFINITY = 1e8
+        if state.inventory[2] != 0 and state.cell == self.layout.exit_cell:
+            value = INFINITY + state.score() # value = a very high number + the player score
+            # We return the high value for the player and its negative to all the monsters 
+            return True, [value, *(-value for _ in range(monster_count))]
+        # if we are not alive, we lose
+        if not state.alive:
+            # We return a very low value for the player and a very high value to all the monsters
+            return True, [-INFINITY, *(INFINITY for _ in range(monster_count))]
+        return False, None
+
+    def get_actions(self, state: CompactDungeonState) -> Iterable[Direction]:
+        layout = self.layout
+        if state.turn == 0:
+            # prevent the player from getting into a wall
+            return list(layout.actions[state.cell])
+        # Find an return actions to be done by a monster
+        index = state.turn - 1
+        alive = state.monsters_alive
+        if not alive >> index & 1: return []
+        monster_cells = {cell for i, cell in enumerate(state.monster_cells) if i != index and alive >> i & 1}
+        cell = state.monster_cells[index]
+        moves = layout.moves[cell]
+        # prevent the monster from getting into a wall or another monster
+        return [direction for direction in layout.actions[cell] if moves[direction] not in monster_cells]
+
+    # The successors are new frozen states, so the states are never modified in place
+    def get_successor(self, state: CompactDungeonState, action: Direction) -> CompactDungeonState:
+        layout = self.layout
+        current_turn = state.turn
+        cell, alive = state.cell, state.alive
+        inventory_daggers, inventory_coins, inventory_keys = state.inventory
+        coin_mask, dagger_mask, key_mask = state.coin_mask, state.dagger_mask, state.key_mask
+        monster_cells, monsters_alive = state.monster_cells, state.monsters_alive
+        if current_turn == 0:
+            # This action is done by the player
+            cell = layout.moves[cell][action]
+            bit = layout.item_bits[cell]
+            if bit:
+                # If we walk over an item, we take it
+                if coin_mask & bit:
+                    coin_mask &= ~bit
+                    inventory_coins += 1
+                if dagger_mask & bit:
+                    dagger_mask &= ~bit
+                    inventory_daggers += 1
+                if key_mask & bit:
+                    key_mask &= ~bit
+                    inventory_keys += 1
+            # Find the monsters at the player position
+            monsters_at_player = [index for index, monster_cell in enumerate(monster_cells) if monster_cell == cell and monsters_alive >> index & 1]
+            if monsters_at_player:
+                if inventory_daggers < len(monsters_at_player):
+                    # If we encounter a monster and we don't have a dagger, we die
+                    inventory_daggers = 0
+                    alive = False
+                else:
+                    # If we encounter a monster and we have a dagger, we kill it
+                    inventory_daggers -= len(monsters_at_player)
+                    for index in monsters_at_player:
+                        monsters_alive &= ~(1 << index)
+        else:
+            # This action is done by a monster
+            index = current_turn - 1
+            monster_cell = layout.moves[monster_cells[index]][action]
+            monster_cells = monster_cells[:index] + (monster_cell,) + monster_cells[index + 1:]
+            if monster_cell == cell:
+                if inventory_daggers != 0:
+                    # If we encounter a player and they have a dagger, we die
+                    monsters_alive &= ~(1 << index)
+                    inventory_daggers -= 1
+                else:
+                    # If we encounter a player and they don't have a dagger, we eat them
+                    alive = False
+        # Advance the turn (it ignores all the dead monsters)
+        remaining = monsters_alive >> current_turn
+        turn = current_turn + (remaining & -remaining).bit_length() if remaining else 0
+        # if the new turn is 0 (the player's turn), we advance the clock 
+        time = state.time + 1 if turn == 0 else state.time
+        return CompactDungeonState(time, turn, layout, cell, alive, (inventory_daggers, inventory_coins, inventory_keys),
+                                   coin_mask, dagger_mask, key_mask, monster_cells, monsters_alive)
+
+    # The compact states are hashable, so they are their own keys in the transposition tables
+    def state_key(self, state: CompactDungeonState) -> CompactDungeonState:
+        return state
+
+    # Create a compact dungeon game equivalent to the given dungeon game
+    @staticmethod
+    def from_game(game: DungeonGame) -> 'CompactDungeonGame':
+        initial_state = game.get_initial_state()
+        compact = CompactDungeonGame()
+        items = [*initial_state.coins, *initial_state.daggers, *initial_state.keys]
+        compact.layout = CompactDungeonLayout.from_layout(game.layout, items)
+        compact.initial_state = CompactDungeonState.from_state(compact.layout, initial_state)
+        return compact
+
+    # Read a compact dungeon game from text containing a grid of tiles
+    @staticmethod
+    def from_text(text: str) -> 'CompactDungeonGame':
+        return CompactDungeonGame.from_game(DungeonGame.from_text(text))
+
+    # Read a compact dungeon game from file containing a grid of tiles
+    @staticmethod
+    def from_file(path: str) -> 'CompactDungeonGame':
+        with open(path, 'r') as f:
+            return CompactDungeonGame.from_text(f.read())
+
+# The key under which the memoized heuristic values are stored in the game cache
+HEURISTIC_CACHE_KEY = "__heuristic_cache__"
+# The maximum number of values memoized for each heuristic
+HEURISTIC_CACHE_CAPACITY = 1 << 16
+
+# Wraps a heuristic function so that its values are memoized in the game cache
+# This needs hashable states (e.g. the compact dungeon states), and it is useful since the searches evaluate the same states many times
+# (e.g. alpha-beta with move ordering evaluates each child to order the moves, then again when it reaches the depth limit)
+# The states include the time, so the values of the previous moves are never reused: when the memo holds "capacity" values,
+# the oldest value is evicted (like the transposition table) so the memo does not grow for the whole game.
+def memoize_heuristic(heuristic: HeuristicFunction, capacity: int = HEURISTIC_CACHE_CAPACITY) -> HeuristicFunction:
+    def memoized(game: DungeonGame, state: CompactDungeonState, agent: int) -> float:
+        cache = game.cache()
+        values = cache.get((HEURISTIC_CACHE_KEY, heuristic))
+        if values is None:
+            values = cache[(HEURISTIC_CACHE_KEY, heuristic)] = OrderedDict()
+        key = (state, agent)
+        value = values.get(key)
+        if value is None:
+            if len(values) >= capacity:
+                values.popitem(last=False)
+            value = values[key] = heuristic(game, state, agent)
+        return value
+    return memoized
+
 # This agent will control a monster
 class MonsterAgent(Agent):
     rng: RandomGenerator # The random generator used to select a direction
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, Iterable, List, Optional, Tuple, TypeVar, Union
+from typing import Callable, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
 from helpers.utils import CacheContainer, with_cache
 
 # S and A are used for generic typing where S represents the state type and A represents the action type
@@ -48,6 +48,12 @@ class Game(ABC, Generic[S, A], CacheContainer):
     def get_successor(self, state: S, action: A) -> S:
         pass
 
+    # This function returns a hashable key that identifies the given state (used by the transposition tables in "transposition.py")
+    # Two states must have the same key if and only if they are the same state
+    # By default, the state itself is the key, so games whose states are not hashable should override it
+    def state_key(self, state: S) -> Hashable:
+        return state
+
 # A heuristic function which estimates the value of a given state for a certain agent within a certain game.
 # E.g. if the heuristic function returns a high value for a certain agent, it should return low values for their enemies.
 HeuristicFunction = Callable[[Game[S, A], S, int], float]
\ No newline at end of file
@@ -1,41 +1,41 @@
-from dataclasses import dataclass
 from enum import IntEnum
-from typing import Iterator
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 import math
 
 # the class Point will hold a 2D coordinate on a discrete grid
-# We use dataclass with frozen=True to automatically implement:
+# We use a NamedTuple (a subclass of tuple) to automatically implement:
 #   the constructor, the == operator, the hash function and to make the class immutable
 # Now it can be added to sets and used as keys in dictionaries
-@dataclass(frozen=True)
-class Point:
-    __slots__ = ('x', 'y')
+# Since these operations are implemented by the built-in tuple (in C), they are much faster than those of a frozen dataclass
+# which are implemented in python (and the frozen constructor has to go through object.__setattr__ for each field).
+# A point is equal to (and has the same hash as) the tuple (x, y).
+class Point(NamedTuple):
     x: int
     y: int
 
     # The following functions implement the operators +, -, negative and str
+    # They create the result with tuple.__new__ directly to skip the python-level NamedTuple constructor
     def __add__(self, other: 'Point') -> 'Point':
-        return Point(self.x + other.x, self.y + other.y)
+        return _new_tuple(Point, (self[0] + other[0], self[1] + other[1]))
     
     def __sub__(self, other: 'Point') -> 'Point':
-        return Point(self.x - other.x, self.y - other.y)
+        return _new_tuple(Point, (self[0] - other[0], self[1] - other[1]))
     
     def __neg__(self) -> 'Point':
-        return Point(-self.x, -self.y)
+        return _new_tuple(Point, (-self[0], -self[1]))
     
     def __str__(self) -> str:
         return f'({self.x}, {self.y})'
-    
-    # this allow points to be used as iterators such as writing:
-    # x, y = point
-    # to unpack the Point class into its x and y components
-    def __iter__(self) -> Iterator[int]:
-        return iter((self.x, self.y))
-    
+
     # since Point is immutable, the deepcopy should not clone it
     def __deepcopy__(self, memo):
         return self
 
+    # Since a point is a tuple, it can be unpacked into its x and y components by writing:
+    # x, y = point
+
+_new_tuple = tuple.__new__
+
 # This is a helper function to compute the manhattan distance between 2 points
 def manhattan_distance(p1: Point, p2: Point) -> int:
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
@@ -60,11 +60,23 @@ class Direction(IntEnum):
     def to_vector(self) -> Point:
         return Direction._Vectors[self]
 
-# A list where each entry contains the vector pointing in the corresponding direction
-Direction._Vectors = [
+# A tuple where each entry contains the vector pointing in the corresponding direction
+Direction._Vectors = (
     Point( 1,  0),
     Point( 0, -1),
     Point(-1,  0),
     Point( 0,  1),
     Point( 0,  0)
-]
\ No newline at end of file
+)
+
+# Returns a neighbor table for the given points: a dictionary that maps each point to a tuple
+# where the entry at index d is the neighbor of the point in the direction d (or None if the neighbor is not one of the given points)
+# The neighbor in the direction NONE is the point itself
+# The points in the table are interned: every neighbor is the same object as the key of that point in the table,
+# so walking on a grid through the table does not create any new point and only takes a dictionary lookup per move.
+def neighbor_table(points: Iterable[Point]) -> Dict[Point, Tuple[Optional[Point], ...]]:
+    interned = {point: point for point in points}
+    return {
+        point: tuple(interned.get(point + vector) for vector in Direction._Vectors)
+        for point in interned
+    }
@@ -0,0 +1,88 @@
+from typing import Any, Dict, Generic, List, Optional, Tuple
+from game import HeuristicFunction, Game, S, A
+
+# This file contains the move ordering policies used by alphabeta_with_move_ordering (check "search.py")
+# Alpha-beta prunes the most when the best move is searched first at each node, so a move ordering policy
+# sorts the children of each node from the most to the least promising for the agent whose turn it is.
+# The policies can be chained: the killer move and history policies reorder the moves on top of another (base) policy,
+# e.g. HistoryOrdering(KillerMoveOrdering(HeuristicOrdering())).
+# The policies that learn from the cutoffs (killer moves and history) keep what they learned between searches,
+# so the same object can be reused by the iterations of iterative deepening or between the moves of a game.
+
+# A child is a tuple containing the action and the state it leads to
+Child = Tuple[A, S]
+
+# The base class of the move ordering policies, it keeps the moves in the order returned by the game
+class MoveOrdering(Generic[S, A]):
+    # Returns the children of the state sorted from the most to the least promising for the agent
+    #   ply: the number of moves between the root of the search and the state
+    def order(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, agent: int, ply: int, children: List[Child]) -> List[Child]:
+        return children
+
+    # This is called when the move "action" caused a cutoff at the given ply (with the given remaining depth)
+    def cutoff(self, agent: int, ply: int, depth: int, action: A):
+        pass
+
+    # Forgets what was learned from the cutoffs
+    def clear(self):
+        pass
+
+# Sorts the moves by the heuristic value of the state they lead to
+# The value is computed for the player (agent 0), so the player's moves are sorted in descending order
+# and the monsters' moves are sorted in ascending order. The moves with equal values keep their order.
+class HeuristicOrdering(MoveOrdering[S, A]):
+    def order(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, agent: int, ply: int, children: List[Child]) -> List[Child]:
+        values = [heuristic(game, child, 0) for _, child in children]
+        indices = sorted(range(len(children)), key=values.__getitem__, reverse=(agent == 0))
+        return [children[index] for index in indices]
+
+# Killer moves: a move that caused a cutoff is likely to cause a cutoff in the sibling nodes too (at the same ply)
+# since a sibling only differs by the previous move. So the last "slots" moves that caused a cutoff at each ply
+# are searched first (the most recent first), and the rest of the moves are ordered by the base policy.
+class KillerMoveOrdering(MoveOrdering[S, A]):
+    def __init__(self, base: Optional[MoveOrdering[S, A]] = None, slots: int = 2) -> None:
+        self.base = HeuristicOrdering() if base is None else base
+        self.slots = slots
+        self.killers: Dict[int, List[A]] = {}
+
+    def order(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, agent: int, ply: int, children: List[Child]) -> List[Child]:
+        children = self.base.order(game, state, heuristic, agent, ply, children)
+        killers = self.killers.get(ply)
+        if not killers: return children
+        # A killer move is only searched first if it is a legal move in this state
+        first = [child for killer in killers for child in children if child[0] == killer]
+        return first + [child for child in children if child[0] not in killers]
+
+    def cutoff(self, agent: int, ply: int, depth: int, action: A):
+        killers = self.killers.setdefault(ply, [])
+        if action in killers: killers.remove(action)
+        killers.insert(0, action)
+        del killers[self.slots:]
+        self.base.cutoff(agent, ply, depth, action)
+
+    def clear(self):
+        self.killers.clear()
+        self.base.clear()
+
+# History heuristic: each move (for each agent) gets a score that increases whenever it causes a cutoff anywhere in the tree,
+# and the moves are searched in descending order of their scores. A cutoff at a higher remaining depth prunes a larger subtree,
+# so it adds more to the score (depth squared). The moves with equal scores keep the order of the base policy.
+class HistoryOrdering(MoveOrdering[S, A]):
+    def __init__(self, base: Optional[MoveOrdering[S, A]] = None) -> None:
+        self.base = HeuristicOrdering() if base is None else base
+        self.scores: Dict[Tuple[int, Any], int] = {}
+
+    def order(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, agent: int, ply: int, children: List[Child]) -> List[Child]:
+        children = self.base.order(game, state, heuristic, agent, ply, children)
+        scores = self.scores
+        return sorted(children, key=lambda child: -scores.get((agent, child[0]), 0))
+
+    def cutoff(self, agent: int, ply: int, depth: int, action: A):
+        key = (agent, action)
+        # A negative depth means that there is no depth limit, so all the cutoffs count the same
+        self.scores[key] = self.scores.get(key, 0) + (depth * depth if depth > 0 else 1)
+        self.base.cutoff(agent, ply, depth, action)
+
+    def clear(self):
+        self.scores.clear()
+        self.base.clear()
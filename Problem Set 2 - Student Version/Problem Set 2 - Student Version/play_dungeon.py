@@ -1,4 +1,4 @@
-from dungeon import DungeonGame, Direction, DungeonState, DungeonTile, MonsterAgent
+from dungeon import CompactDungeonGame, DungeonGame, Direction, DungeonState, DungeonTile, MonsterAgent
 from agents import HumanAgent, SearchAgent, RandomAgent
 from helpers.utils import fetch_tracked_call_count
 import argparse, time
@@ -17,15 +17,37 @@ def colored_dungeon(level: str):
     return f"{header}\n{level}"
 
 # Return the heuristic selected by the user
-def get_heuristic(name: str):
+# The compact states are hashable, so the heuristic values are memoized when the compact game is used
+def get_heuristic(name: str, compact: bool = False):
     if name == "zero":
         return lambda *_: 0
     if name == "heuristic":
-        from dungeon import dungeon_heuristic
-        return dungeon_heuristic
+        from dungeon import dungeon_heuristic, memoize_heuristic
+        return memoize_heuristic(dungeon_heuristic) if compact else dungeon_heuristic
     print(f"Requested Heuristic '{name}' is invalid")
     exit(-1)
 
+# Create the transposition table requested by the user (or None if it is disabled)
+def create_transposition_table(args: argparse.Namespace):
+    if args.transposition_table <= 0: return None
+    from transposition import TranspositionTable
+    return TranspositionTable(args.transposition_table)
+
+# Create the move ordering policy selected by the user (check "move_ordering.py")
+# The same policy is used for all the moves so the killer moves and history scores are kept between them
+def create_move_ordering(name: str):
+    from move_ordering import HeuristicOrdering, KillerMoveOrdering, HistoryOrdering
+    if name == "heuristic":
+        return HeuristicOrdering()
+    if name == "killer":
+        return KillerMoveOrdering(HeuristicOrdering())
+    if name == "history":
+        return HistoryOrdering(HeuristicOrdering())
+    if name == "killer_history":
+        return HistoryOrdering(KillerMoveOrdering(HeuristicOrdering()))
+    print(f"Requested Move Ordering '{name}' is invalid")
+    exit(-1)
+
 # Create an agent based on the user selections
 def create_agent(args: argparse.Namespace):
     agent_type: str = args.agent
@@ -51,24 +73,34 @@ def create_agent(args: argparse.Namespace):
         return RandomAgent(402)
     if agent_type == "greedy":
         from search import greedy
-        heuristic = get_heuristic(args.heuristic)
+        heuristic = get_heuristic(args.heuristic, args.compact)
         return SearchAgent(greedy, heuristic, -1)
     if agent_type == "minimax":
         from search import minimax
-        heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(minimax, heuristic, args.depth)
+        heuristic = get_heuristic(args.heuristic, args.compact)
+        return SearchAgent(minimax, heuristic, args.depth, create_transposition_table(args))
     if agent_type == "alphabeta":
         from search import alphabeta
-        heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(alphabeta, heuristic, args.depth)
+        heuristic = get_heuristic(args.heuristic, args.compact)
+        return SearchAgent(alphabeta, heuristic, args.depth, create_transposition_table(args))
     if agent_type == "alphabeta_order":
+        from functools import partial
         from search import alphabeta_with_move_ordering
-        heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(alphabeta_with_move_ordering, heuristic, args.depth)
+        heuristic = get_heuristic(args.heuristic, args.compact)
+        search_fn = partial(alphabeta_with_move_ordering, ordering=create_move_ordering(args.ordering))
+        return SearchAgent(search_fn, heuristic, args.depth, create_transposition_table(args))
+    if agent_type == "iterative":
+        from functools import partial
+        from search import alphabeta_with_move_ordering, iterative_deepening
+        heuristic = get_heuristic(args.heuristic, args.compact)
+        search_fn = partial(iterative_deepening, time_budget=args.time_budget if args.time_budget > 0 else None,
+                            search_fn=partial(alphabeta_with_move_ordering, ordering=create_move_ordering(args.ordering)))
+        # Iterative deepening always needs a transposition table to order the moves (it creates one for each move if none is given)
+        return SearchAgent(search_fn, heuristic, args.depth, create_transposition_table(args))
     if agent_type == "expectimax":
         from search import expectimax
-        heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(expectimax, heuristic, args.depth)
+        heuristic = get_heuristic(args.heuristic, args.compact)
+        return SearchAgent(expectimax, heuristic, args.depth, create_transposition_table(args))
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
 
@@ -77,7 +109,7 @@ def main(args: argparse.Namespace):
     if args.ansicolors: state_printer = lambda state: print(colored_dungeon(str(state)))
 
     start = time.time() # Track run time
-    game = DungeonGame.from_file(args.level) # create the game
+    game = (CompactDungeonGame if args.compact else DungeonGame).from_file(args.level) # create the game
     state = game.get_initial_state() # Get the initial state
     print("Initial State:")
     state_printer(state)
@@ -104,18 +136,19 @@ def main(args: argparse.Namespace):
         if args.sleep != 0:
             time.sleep(args.sleep)
 
-        fetch_tracked_call_count(DungeonGame.is_terminal) # Clear the call counter
+        fetch_tracked_call_count(type(game).is_terminal) # Clear the call counter
         
+        turn = game.get_turn(state) # get the current turn
+
         # if this is the turn of the first player, increment the step counter
         if turn == 0: step += 1
 
-        turn = game.get_turn(state) # get the current turn
         agent = agents[turn] # get the agent that will play the current turn
         action = agent.act(game, state) # Request an action from the agent
         
         # Get the number of explored nodes, if the current agent is a search agent
         if isinstance(agent, SearchAgent):
-            print("Explored Nodes:", fetch_tracked_call_count(DungeonGame.is_terminal))
+            print("Explored Nodes:", fetch_tracked_call_count(type(game).is_terminal))
         
         # Apply the action to the state
         state = game.get_successor(state, action)
@@ -133,12 +166,22 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play Dungeon as Human or AI")
     parser.add_argument("level", help="path to the dungeon to play")
     parser.add_argument("--agent", "-a", default="human",
-                        choices=['human', 'greedy', 'random', 'minimax', 'alphabeta', 'alphabeta_order', 'expectimax'],
+                        choices=['human', 'greedy', 'random', 'minimax', 'alphabeta', 'alphabeta_order', 'expectimax', 'iterative'],
                         help="the agent that will play the game")
     parser.add_argument("--heuristic", '-hf', default="zero",
                         choices=["zero", "heuristic"],
                         help="choose the heuristic to use")
     parser.add_argument("--depth", "-d", type=int, default=5, help="How deep the algorithms should search")
+    parser.add_argument("--ordering", "-o", default="heuristic",
+                        choices=["heuristic", "killer", "history", "killer_history"],
+                        help="the move ordering used by the alphabeta_order and iterative agents")
+    parser.add_argument("--time-budget", "-tb", type=float, default=1.0,
+                        help="How much time (seconds) the iterative agent can search for each action (0 means no limit), "
+                             "it searches deeper until the budget expires or it reaches the depth given by --depth (-1 means no depth limit)")
+    parser.add_argument("--transposition-table", "-tt", type=int, default=0,
+                        help="the capacity of the transposition table used by the minimax, alphabeta, alphabeta_order, expectimax and iterative agents (0 disables it)")
+    parser.add_argument("--compact", "-cs", action="store_true",
+                        help="Use the compact (hashable) state encoding and memoize the heuristic values (check CompactDungeonGame in 'dungeon.py')")
     parser.add_argument("--ansicolors", "-ac", action="store_true",
                         help="Print the dungeon on the console with ANSI colors (only works on some terminals)")
     parser.add_argument("--sleep", "-s", type=float, default=0, help="How much time (seconds) to wait between actions")
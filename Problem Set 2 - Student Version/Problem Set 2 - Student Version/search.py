@@ -1,15 +1,20 @@
-from typing import Tuple
+from typing import Optional, Tuple
 from game import HeuristicFunction, Game, S, A
 from helpers.utils import NotImplemented
+from transposition import Bound, TranspositionTable, entry_depth
+from move_ordering import HeuristicOrdering, MoveOrdering
 
 #TODO: Import any modules you want to use
-import math
+import time
 
 # All search functions take a problem, a state, a heuristic function and the maximum search depth.
 # If the maximum search depth is -1, then there should be no depth cutoff (The expansion should not stop before reaching a terminal state) 
 
 # All the search functions should return the expected tree value and the best action to take based on the search results
 
+# Minimax, alphabeta, alphabeta with move ordering and expectimax can optionally take a transposition table (check "transposition.py")
+# to reuse the values of the states that are reached more than once. If it is None (the default), the search is unchanged.
+
 # This is a simple search function that looks 1-step ahead and returns the action that lead to highest heuristic value.
 # This algorithm is bad if the heuristic function is weak. That is why we use minimax search to look ahead for many steps.
 def greedy(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
@@ -29,10 +34,18 @@ def greedy(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth:
 # and if it is > 0, it should be a min node. Also remember that game.is_terminal(s), returns the values
 # for all the agents. So to get the value for the player (which acts at the max nodes), you need to
 # get values[0].
-def minimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+def minimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1,
+            transposition_table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
     #DONE: Write this function
     # With the help of greedy function and the hint, similarly implemented minimax function
 
+    # If the state was already searched at least as deep, reuse its value
+    if transposition_table is not None:
+        key = transposition_table.key(game, state)
+        entry = transposition_table.probe(key)
+        if entry is not None and entry.depth >= entry_depth(max_depth):
+            return entry.value, entry.action
+
     # Get the agent whoes turn it is
     agent = game.get_turn(state)
 
@@ -43,28 +56,64 @@ def minimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth:
 
     # If the depth is 0, return the heuristic value
     if max_depth == 0:
-        return heuristic(game, state, 0), None
-    
-    # Get the actions and states
-    actions_states = [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
-    
-    # If the agent is 0, return the max value and action
-    if agent == 0:
-        value, _, action = max([(minimax(game, state, heuristic, max_depth - 1)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
-        return value, action
-    # If the agent is not 0, return the min value and action
+        value, action = heuristic(game, state, 0), None
     else:
-        value, _, action = min([(minimax(game, state, heuristic, max_depth - 1)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
-        return value, action
+        # Get the actions and states
+        actions_states = [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
+        
+        # If the agent is 0, return the max value and action
+        if agent == 0:
+            value, _, action = max([(minimax(game, state, heuristic, max_depth - 1, transposition_table)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
+        # If the agent is not 0, return the min value and action
+        else:
+            value, _, action = min([(minimax(game, state, heuristic, max_depth - 1, transposition_table)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
+
+    if transposition_table is not None:
+        transposition_table.store(key, entry_depth(max_depth), value, Bound.EXACT, action)
+    return value, action
+
+# Looks up the state with the given key in the transposition table of an alpha-beta search
+# Returns the (possibly narrowed) alpha and beta, and the value and action to return if the search can be skipped (or None, None)
+def probe_transposition_table(table: TranspositionTable, key, alpha: float, beta: float, depth: int):
+    entry = table.probe(key)
+    if entry is None or entry.depth < entry_depth(depth): return alpha, beta, None, None
+    if entry.bound == Bound.EXACT: return alpha, beta, entry.value, entry.action
+    if entry.bound == Bound.LOWER: alpha = max(alpha, entry.value)
+    else: beta = min(beta, entry.value)
+    if beta <= alpha: return alpha, beta, entry.value, entry.action
+    return alpha, beta, None, None
+
+# Stores the result of an alpha-beta search in the transposition table
+# The searches are fail-hard (the returned value is clamped to the window [alpha, beta] that was searched),
+# so a value on the edge of the window is only a bound on the true value
+# except at the leaves (depth 0) where the value is the heuristic (or terminal) value which is not clamped
+def store_transposition_table(table: TranspositionTable, key, alpha: float, beta: float, depth: int, value: float, action):
+    if depth == 0: bound = Bound.EXACT
+    elif value <= alpha: bound = Bound.UPPER
+    elif value >= beta: bound = Bound.LOWER
+    else: bound = Bound.EXACT
+    table.store(key, entry_depth(depth), value, bound, action)
 
 # Apply Alpha Beta pruning and return the tree value and the best action
 # Hint: Read the hint for minimax.
-def alphabeta(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+def alphabeta(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1,
+              transposition_table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
     #DONE: Write this function
     # With the help of greedy function and the hint, similarly implemented alphabeta function
 
     # Create a function to take alpha and beta as parameters
     def alphabetarec(alpha, beta, state, depth):
+        # If the state was already searched at least as deep, reuse its value or narrow the window with its bound
+        if transposition_table is not None:
+            key = transposition_table.key(game, state)
+            alpha, beta, value, action = probe_transposition_table(transposition_table, key, alpha, beta, depth)
+            if value is not None: return value, action
+            value, action = alphabetarec_search(alpha, beta, state, depth)
+            store_transposition_table(transposition_table, key, alpha, beta, depth, value, action)
+            return value, action
+        return alphabetarec_search(alpha, beta, state, depth)
+
+    def alphabetarec_search(alpha, beta, state, depth):
         # Get the agent whoes turn it is
         agent = game.get_turn(state)
 
@@ -101,20 +150,44 @@ def alphabeta(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_dept
                     break
             return beta, beta_action
 
-    return alphabetarec(float('-inf'), float('inf'), state, max_depth)
+    if transposition_table is None:
+        return alphabetarec(float('-inf'), float('inf'), state, max_depth)
+    # The root is always searched with the full window (the table is not probed) so that the best action is always found
+    key = transposition_table.key(game, state)
+    value, action = alphabetarec_search(float('-inf'), float('inf'), state, max_depth)
+    store_transposition_table(transposition_table, key, float('-inf'), float('inf'), max_depth, value, action)
+    return value, action
     
 # Apply Alpha Beta pruning with move ordering and return the tree value and the best action
 # Hint: Read the hint for minimax.
-def alphabeta_with_move_ordering(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+# The moves are ordered by the given move ordering policy (check "move_ordering.py"), by default they are sorted by the heuristic
+# value of the state they lead to (descending for the player and ascending for the monsters).
+# Each successor is computed once and the policy is told about every cutoff so it can learn which moves to search first.
+def alphabeta_with_move_ordering(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1,
+                                 transposition_table: Optional[TranspositionTable] = None,
+                                 ordering: Optional[MoveOrdering] = None) -> Tuple[float, A]:
     #DONE: Write this function
     # Alphabeta with move ordering is basicly the same as alphabeta but sort all actions_states by heuristic
     # IF agent is Player
     #     sort descending
     # else
     #     sort ascending
+    if ordering is None: ordering = HeuristicOrdering()
 
     # Create a function to take alpha and beta as parameters
-    def alphabetarec2(alpha, beta, state, depth):
+    def alphabetarec2(alpha, beta, state, depth, ply):
+        # If the state was already searched at least as deep, reuse its value or narrow the window with its bound
+        if transposition_table is not None:
+            key = transposition_table.key(game, state)
+            alpha, beta, value, action = probe_transposition_table(transposition_table, key, alpha, beta, depth)
+            if value is not None: return value, action
+            value, action = alphabetarec2_search(alpha, beta, state, depth, ply, transposition_table.best_action(key))
+            store_transposition_table(transposition_table, key, alpha, beta, depth, value, action)
+            return value, action
+        return alphabetarec2_search(alpha, beta, state, depth, ply, None)
+
+    # The best action stored in the transposition table (if any) is searched first since it is the most likely to cause a cutoff
+    def alphabetarec2_search(alpha, beta, state, depth, ply, best_action):
         # Get the agent whoes turn it is
         agent = game.get_turn(state)
         # Check if the state is terminal
@@ -126,42 +199,92 @@ def alphabeta_with_move_ordering(game: Game[S, A], state: S, heuristic: Heuristi
         if depth == 0:
             return heuristic(game, state, 0), None
 
-        # Get actions, states and heuristics
-        actions_states = [(action, game.get_successor(state, action), heuristic(game, game.get_successor(state, action), 0))
-                      for action in game.get_actions(state)]
-        
+        # Get the actions and states (each successor is computed once), then order them
+        children = [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
+        children = ordering.order(game, state, heuristic, agent, ply, children)
+        if best_action is not None: children.sort(key=lambda child: child[0] != best_action)
+
         # If the agent is 0, return the max value and action
         if agent == 0:
             alpha_action = None
-            # Sort the actions_states by heuristic
-            actions_states.sort(key=lambda x: x[2], reverse=True)
-            for action, state, heur in actions_states:
-                alpha, alpha_action = max([(alpha, alpha_action), (alphabetarec2(alpha, beta, state, depth - 1)[0], action)], key=lambda x: x[0])
+            for action, child in children:
+                value = alphabetarec2(alpha, beta, child, depth - 1, ply + 1)[0]
+                if value > alpha: alpha, alpha_action = value, action
                 # If beta <= alpha, there is no need to expand the rest of the nodes
                 if beta <= alpha:
+                    ordering.cutoff(agent, ply, depth, action)
                     break
             return alpha, alpha_action
         # If the agent is not 0, return the min value and action
         else:
             beta_action = None
-            # Sort the actions_states by heuristic
-            actions_states.sort(key=lambda x: x[2])
-            for action, state, heur in actions_states:
-                beta, beta_action = min([(beta, beta_action), (alphabetarec2(alpha, beta, state, depth - 1)[0], action)], key=lambda x: x[0])
+            for action, child in children:
+                value = alphabetarec2(alpha, beta, child, depth - 1, ply + 1)[0]
+                if value < beta: beta, beta_action = value, action
                 # If beta <= alpha, there is no need to expand the rest of the nodes
                 if beta <= alpha:
+                    ordering.cutoff(agent, ply, depth, action)
                     break
             return beta, beta_action
 
-    return alphabetarec2(float('-inf'), float('inf'), state, max_depth)
+    if transposition_table is None:
+        return alphabetarec2(float('-inf'), float('inf'), state, max_depth, 0)
+    # The root is always searched with the full window (the table is not probed) so that the best action is always found
+    key = transposition_table.key(game, state)
+    value, action = alphabetarec2_search(float('-inf'), float('inf'), state, max_depth, 0, transposition_table.best_action(key))
+    store_transposition_table(transposition_table, key, float('-inf'), float('inf'), max_depth, value, action)
+    return value, action
+
+# This exception is raised inside a search to interrupt it when its time budget expires
+class SearchTimeout(Exception):
+    pass
+
+# Apply iterative deepening: search with the depths 1, 2, 3, ... until the time budget (in seconds) expires
+# or the maximum depth is reached (if max_depth is -1, there is no maximum depth) and return the result of the deepest completed search.
+# This is an anytime search: a deep setting cannot stall the game since the search stops when the budget expires,
+# and the search goes as deep as the budget allows instead of being limited to a shallow fixed depth.
+# The searches share a transposition table (a new one is created if none is given), so each search tries the best actions found by
+# the previous one first (the principal variation and the best replies below it), which makes alpha-beta prune much more.
+# The search is interrupted by checking the time whenever the heuristic is called, and an interrupted search is discarded.
+# The first search (depth 1) is never interrupted so there is always an action to return.
+# If there is no time budget and no maximum depth, this is the same as calling the search function with no depth limit.
+def iterative_deepening(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1,
+                        transposition_table: Optional[TranspositionTable] = None, time_budget: Optional[float] = 1.0,
+                        search_fn = alphabeta_with_move_ordering) -> Tuple[float, A]:
+    if max_depth == 0 or (time_budget is None and max_depth < 0):
+        return search_fn(game, state, heuristic, max_depth, transposition_table)
+    if transposition_table is None: transposition_table = TranspositionTable()
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    def timed_heuristic(game: Game[S, A], state: S, agent: int) -> float:
+        if time.perf_counter() > deadline: raise SearchTimeout()
+        return heuristic(game, state, agent)
+
+    depth = 1
+    value, action = search_fn(game, state, heuristic, depth, transposition_table)
+    while depth != max_depth and (deadline is None or time.perf_counter() < deadline):
+        depth += 1
+        try:
+            value, action = search_fn(game, state, heuristic if deadline is None else timed_heuristic, depth, transposition_table)
+        except SearchTimeout:
+            break
+    return value, action
 
 # Apply Expectimax search and return the tree value and the best action
 # Hint: Read the hint for minimax, but note that the monsters (turn > 0) do not act as min nodes anymore,
 # they now act as chance nodes (they act randomly).
-def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1,
+               transposition_table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
     #DONE: Write this function
     # With the help of greedy function and the hint, similarly implemented expectimax function
 
+    # If the state was already searched at least as deep, reuse its value
+    if transposition_table is not None:
+        key = transposition_table.key(game, state)
+        entry = transposition_table.probe(key)
+        if entry is not None and entry.depth >= entry_depth(max_depth):
+            return entry.value, entry.action
+
     # Get the agent whoes turn it is
     agent = game.get_turn(state)
     # Check if the state is terminal
@@ -170,15 +293,18 @@ def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_dep
         return values[0], None
     # If the depth is 0, return the heuristic value
     if max_depth == 0:
-        return heuristic(game, state, 0), None
-    # Get the actions and states
-    actions_states = [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
-    # If the agent is 0, return the max value and action
-    if agent == 0:
-        value, _, action = max([(expectimax(game, state, heuristic, max_depth - 1)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
-        return value, action
-    # If the agent is not 0, return the average of the values
+        value, action = heuristic(game, state, 0), None
     else:
-        value = [(expectimax(game, state, heuristic, max_depth - 1)[0], -index, action) for index, (action, state) in enumerate(actions_states)]
-        Avg = sum(a_avg[0] for a_avg in value)/len(value)
-        return Avg, None
\ No newline at end of file
+        # Get the actions and states
+        actions_states = [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
+        # If the agent is 0, return the max value and action
+        if agent == 0:
+            value, _, action = max([(expectimax(game, state, heuristic, max_depth - 1, transposition_table)[0], -index, action) for index, (action, state) in enumerate(actions_states)])
+        # If the agent is not 0, return the average of the values
+        else:
+            values = [(expectimax(game, state, heuristic, max_depth - 1, transposition_table)[0], -index, action) for index, (action, state) in enumerate(actions_states)]
+            value, action = sum(a_avg[0] for a_avg in values)/len(values), None
+
+    if transposition_table is not None:
+        transposition_table.store(key, entry_depth(max_depth), value, Bound.EXACT, action)
+    return value, action
\ No newline at end of file
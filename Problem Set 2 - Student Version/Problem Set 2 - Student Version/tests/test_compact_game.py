@@ -0,0 +1,46 @@
+import glob
+from collections import deque
+import pytest
+from dungeon import CompactDungeonGame, CompactDungeonState, DungeonGame, HEURISTIC_CACHE_KEY, dungeon_heuristic, memoize_heuristic
+
+LEVELS = sorted(glob.glob("dungeons/*.txt"))
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_compact_states_follow_the_same_transitions(level):
+    game = DungeonGame.from_file(level)
+    compact = CompactDungeonGame.from_game(game)
+    queue = deque([(game.get_initial_state(), compact.get_initial_state())])
+    seen = {compact.get_initial_state()}
+    while queue and len(seen) < 2000:
+        state, compact_state = queue.popleft()
+        assert CompactDungeonState.from_state(compact.layout, state) == compact_state
+        assert compact.is_terminal(compact_state) == game.is_terminal(state)
+        assert compact.get_turn(compact_state) == game.get_turn(state)
+        assert compact_state.score() == pytest.approx(state.score())
+        for agent in range(game.agent_count):
+            assert dungeon_heuristic(compact, compact_state, agent) == pytest.approx(dungeon_heuristic(game, state, agent))
+        if game.is_terminal(state)[0]: continue
+        assert list(compact.get_actions(compact_state)) == list(game.get_actions(state))
+        for action in game.get_actions(state):
+            compact_successor = compact.get_successor(compact_state, action)
+            if compact_successor not in seen:
+                seen.add(compact_successor)
+                queue.append((game.get_successor(state, action), compact_successor))
+
+def test_compact_states_are_hashable_values():
+    compact = CompactDungeonGame.from_file(LEVELS[0])
+    state = compact.get_initial_state()
+    copy = CompactDungeonState.from_state(compact.layout, state.to_state())
+    assert copy == state and hash(copy) == hash(state) and len({copy, state}) == 1
+    # The compact game uses the state itself as its transposition table key
+    assert compact.state_key(state) == state
+
+def test_memoized_heuristic_keeps_at_most_its_capacity():
+    compact = CompactDungeonGame.from_file(LEVELS[0])
+    heuristic = memoize_heuristic(dungeon_heuristic, capacity=8)
+    state = compact.get_initial_state()
+    for _ in range(50):
+        assert heuristic(compact, state, 0) == pytest.approx(dungeon_heuristic(compact, state, 0))
+        if compact.is_terminal(state)[0]: break
+        state = compact.get_successor(state, compact.get_actions(state)[0])
+    assert len(compact.cache()[(HEURISTIC_CACHE_KEY, dungeon_heuristic)]) <= 8
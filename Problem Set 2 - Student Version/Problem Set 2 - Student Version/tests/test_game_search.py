@@ -0,0 +1,73 @@
+import glob, random
+from functools import partial
+import pytest
+from dungeon import CompactDungeonGame, DungeonGame, dungeon_heuristic
+from move_ordering import HeuristicOrdering, HistoryOrdering, KillerMoveOrdering
+from search import alphabeta, alphabeta_with_move_ordering, expectimax, iterative_deepening, minimax
+from transposition import TranspositionTable
+
+LEVELS = sorted(glob.glob("dungeons/*.txt"))
+DEPTHS = [1, 2, 3, 4]
+GAMES = {"dungeon": DungeonGame.from_file, "compact": CompactDungeonGame.from_file}
+
+# Each search is called with a new transposition table (or move ordering) so the values cannot leak between the calls
+MINIMAX_SEARCHES = {
+    "alphabeta": lambda: alphabeta,
+    "alphabeta+tt": lambda: partial(alphabeta, transposition_table=TranspositionTable()),
+    "minimax+tt": lambda: partial(minimax, transposition_table=TranspositionTable()),
+    "ordering": lambda: alphabeta_with_move_ordering,
+    "ordering+tt": lambda: partial(alphabeta_with_move_ordering, transposition_table=TranspositionTable()),
+    "killer": lambda: partial(alphabeta_with_move_ordering, ordering=KillerMoveOrdering(HeuristicOrdering())),
+    "history": lambda: partial(alphabeta_with_move_ordering, ordering=HistoryOrdering(HeuristicOrdering())),
+    "killer_history+tt": lambda: partial(alphabeta_with_move_ordering, ordering=HistoryOrdering(KillerMoveOrdering(HeuristicOrdering())),
+                                         transposition_table=TranspositionTable()),
+    "iterative": lambda: partial(iterative_deepening, time_budget=None),
+}
+
+@pytest.mark.parametrize("name", MINIMAX_SEARCHES)
+@pytest.mark.parametrize("depth", DEPTHS)
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("game_type", GAMES)
+def test_searches_return_the_minimax_value(game_type, level, depth, name):
+    game = GAMES[game_type](level)
+    state = game.get_initial_state()
+    expected, _ = minimax(game, state, dungeon_heuristic, depth)
+    value, action = MINIMAX_SEARCHES[name]()(game, state, dungeon_heuristic, depth)
+    assert value == pytest.approx(expected)
+    assert action in game.get_actions(state)
+
+@pytest.mark.parametrize("depth", DEPTHS)
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("game_type", GAMES)
+def test_expectimax_returns_the_same_value_with_a_transposition_table(game_type, level, depth):
+    game = GAMES[game_type](level)
+    state = game.get_initial_state()
+    expected, _ = expectimax(game, state, dungeon_heuristic, depth)
+    value, _ = expectimax(game, state, dungeon_heuristic, depth, TranspositionTable())
+    assert value == pytest.approx(expected)
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_incremental_zobrist_key_matches_a_fresh_key(level):
+    game, rng = DungeonGame.from_file(level), random.Random(0)
+    state = game.get_initial_state()
+    game.state_key(state)
+    for _ in range(2000):
+        terminal, _ = game.is_terminal(state)
+        if terminal:
+            state = game.get_initial_state()
+            continue
+        successor = game.get_successor(state, rng.choice(game.get_actions(state)))
+        # A copy of the successor has no key, so its key is computed from all its features
+        fresh = type(successor)(successor.time, successor.turn, successor.layout, successor.player,
+                                successor.coins, successor.daggers, successor.keys, successor.monsters)
+        assert successor.key == game.state_key(fresh)
+        state = successor
+
+@pytest.mark.parametrize("game_type", GAMES)
+def test_states_are_hashable_dictionary_keys(game_type):
+    game = GAMES[game_type](LEVELS[0])
+    state = game.get_initial_state()
+    successors = {game.get_successor(state, action): action for action in game.get_actions(state)}
+    for action in game.get_actions(state):
+        # A successor generated again is equal to the first one and finds its entry
+        assert successors[game.get_successor(state, action)] == action
@@ -0,0 +1,27 @@
+import copy, glob
+from collections import deque
+import pytest
+from dungeon import DungeonGame
+
+LEVELS = sorted(glob.glob("dungeons/*.txt"))
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_successors_do_not_modify_their_parent(level):
+    game = DungeonGame.from_file(level)
+    seen, queue = {game.get_initial_state()}, deque([game.get_initial_state()])
+    while queue and len(seen) < 2000:
+        state = queue.popleft()
+        if game.is_terminal(state)[0]: continue
+        before = copy.deepcopy(state)
+        successors = [game.get_successor(state, action) for action in game.get_actions(state)]
+        # The successors share the unchanged parts with the parent, so the parent must be left as it was
+        assert state == before
+        for successor in successors:
+            # Only the changed parts are created again
+            assert successor.layout is state.layout
+            if successor.coins == state.coins: assert successor.coins is state.coins
+            # A player move that kills no monster keeps the monsters (a monster move always creates the tuple again)
+            if state.turn == 0 and successor.monsters == state.monsters: assert successor.monsters is state.monsters
+            if successor not in seen:
+                seen.add(successor)
+                queue.append(successor)
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Hashable, Optional
+from game import Game, S
+from helpers.mt19937 import RandomGenerator
+import math
+
+# This file contains the transposition table used by the game search functions (check "search.py")
+# In games, the same state can be reached through different orders of moves (these are called transpositions).
+# For example, in the dungeon, the player moving right then up reaches the same state as moving up then right
+# if nothing else changed on the way. Without a transposition table, the search re-evaluates the whole subtree below
+# that state every time it is reached. The transposition table stores the value found for each state
+# so that the search can reuse it when the same state is reached again with at least the same remaining depth.
+
+# The kind of value stored in a transposition table entry
+# EXACT: the value is the exact (depth-limited) value of the state
+# LOWER: the search was cut off at a max node (fail high), so the true value is at least the stored value
+# UPPER: the search was cut off at a min node or no child beat alpha (fail low), so the true value is at most the stored value
+# Minimax and expectimax only store EXACT entries, while alpha-beta needs the bounds since it does not compute exact values outside its window.
+class Bound(IntEnum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+# An entry in the transposition table
+#   depth: the remaining search depth below the state when it was searched (math.inf if there was no depth limit)
+#   value: the value of the state for the player (agent 0)
+#   bound: the kind of value (check Bound)
+#   action: the best action found at this state (None at leaves), it is also used to order the moves in later searches
+@dataclass
+class TranspositionEntry:
+    __slots__ = ('depth', 'value', 'bound', 'action')
+    depth: float
+    value: float
+    bound: Bound
+    action: Any
+
+# Convert a search depth to the depth stored in an entry (a negative depth means that there is no depth limit)
+def entry_depth(depth: int) -> float:
+    return math.inf if depth < 0 else depth
+
+# A transposition table maps the key of each state (check Game.state_key) to an entry
+# The table has a bounded size:
+# - An entry is only replaced by an entry that was searched at least as deep (depth-preferred replacement)
+#   since deeper entries save more work when they are reused.
+# - When the table is full and a new state is stored, the oldest entry is evicted (dictionaries keep the insertion order).
+# A table should only be shared between searches that use the same search function and heuristic since the values depend on them.
+# It can be kept between the moves of the same game since the states include the turn and the time.
+class TranspositionTable:
+    def __init__(self, capacity: int = 1 << 18) -> None:
+        self.capacity = capacity
+        self.entries: Dict[Hashable, TranspositionEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # Returns the key of the state in the given game
+    def key(self, game: Game[S, Any], state: S) -> Hashable:
+        return game.state_key(state)
+
+    # Returns the entry of the given key or None if the key is not in the table
+    def probe(self, key: Hashable) -> Optional[TranspositionEntry]:
+        entry = self.entries.get(key)
+        if entry is None: self.misses += 1
+        else: self.hits += 1
+        return entry
+
+    # Stores an entry for the given key (unless the table already has a deeper entry for it)
+    def store(self, key: Hashable, depth: float, value: float, bound: Bound, action: Any = None):
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry.depth > depth: return
+            entry.depth, entry.value, entry.bound, entry.action = depth, value, bound, action
+            return
+        if len(self.entries) >= self.capacity:
+            # Evict the oldest entry
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = TranspositionEntry(depth, value, bound, action)
+
+    # Returns the best action stored for the given key or None if there is none
+    # This does not count as a probe since it is only used to order the moves
+    def best_action(self, key: Hashable) -> Any:
+        entry = self.entries.get(key)
+        return None if entry is None else entry.action
+
+    # Removes all the entries and resets the statistics
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    # Returns the ratio of probes that found an entry
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+# Zobrist hashing computes the key of a state as the XOR of a random 64-bit number for each feature of the state
+# (e.g. "the player is at (3, 4)" or "there is a coin at (1, 2)").
+# Two different states get the same key with a negligible probability, so the table does not need to store the states themselves.
+# The random number of each feature is generated the first time the feature is seen,
+# so the features do not have to be known in advance.
+class ZobristHasher:
+    def __init__(self, seed: int = 0) -> None:
+        self.rng = RandomGenerator(seed)
+        self.numbers: Dict[Hashable, int] = {}
+
+    # Returns the random number of the given feature
+    def __getitem__(self, feature: Hashable) -> int:
+        number = self.numbers.get(feature)
+        if number is None:
+            number = self.numbers[feature] = (self.rng.generate() << 32) | self.rng.generate()
+        return number
@@ -106,6 +106,10 @@ class TreeGame(Game[List, str]):
     def get_successor(self, state: TreeNode, action: str) -> TreeNode:
         return state.children[action]
     
+    # The tree nodes are not hashable, but each node has a unique name (its path from the root)
+    def state_key(self, state: TreeNode) -> str:
+        return state.name
+
     # create a tree game from a path to a tree file
     @staticmethod
     def from_file(path: str) -> 'TreeGame':
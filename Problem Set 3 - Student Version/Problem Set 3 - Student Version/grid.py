@@ -1,7 +1,7 @@
 from typing import Dict, List, Optional, Set, Tuple
 from mdp import MarkovDecisionProcess
 from environment import Environment
-from mathutils import Point, Direction
+from mathutils import Point, Direction, neighbor_table
 from helpers.mt19937 import RandomGenerator
 import json
 
@@ -13,6 +13,7 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
     terminals: Set[Point] # A set of positions where the episode would end when the player reaches it
     rewards: Dict[Point, float] # The reward of each position
     noise: float # The action noise, aka the probability of steering left or right of the intended direction
+    neighbor_table: Dict[Point, Tuple[Optional[Point], ...]] # The neighbors of each walkable position in each direction
 
     def __init__(self, 
             size: Tuple[int, int], 
@@ -26,6 +27,8 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
         self.terminals = terminals
         self.rewards = rewards
         self.noise = noise
+        # The neighbors of each walkable position (check neighbor_table in "mathutils.py")
+        self.neighbor_table = neighbor_table(walkable)
 
     # Returns all possible states (where there is no walls)
     def get_states(self) -> List[Point]:
@@ -53,13 +56,22 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
             (action.rotate(3), 0.5 * self.noise)
         ]
         states = {}
+        # The neighbors of the state (a None neighbor is a wall, so the player stays in the same state)
+        neighbors = self.neighbors(state)
         for direction, prob in noisy_actions:
-            next_state = state + direction.to_vector()
-            if next_state not in self.walkable: next_state = state
+            next_state = neighbors[direction] or state
             if next_state in states: states[next_state] += prob
             else: states[next_state] = prob
         return states
     
+    # Returns the neighbors of the given state in each direction (a None neighbor is a wall)
+    def neighbors(self, state: Point) -> Tuple[Optional[Point], ...]:
+        neighbors = self.neighbor_table.get(state)
+        if neighbors is None:
+            # The state is not walkable, so every move leads to a position that is computed directly
+            neighbors = tuple(point if point in self.walkable else None for point in (state + vector for vector in Direction._Vectors))
+        return neighbors
+
     def parse_state(self, string: str) -> Point:
         x, y = eval(string)
         return Point(x, y)